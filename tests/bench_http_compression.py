@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP backend traffic with and without compression.
+Run directly: python tests/bench_http_compression.py [--rounds N] [--mbps M]
+
+A local stand-in MCP server (real sockets, one thread per request) answers
+two tools through HttpMcpClient:
+  write  — the payload travels in the request (file contents for a write tool)
+  read   — the payload comes back in the result (a large directory listing)
+
+Each payload size runs uncompressed, then with gzip (and zstd when the
+zstandard package is installed) on both the request body and the reply.
+Wire bytes are counted by the server. --mbps simulates a link of that
+bandwidth by delaying each transfer by its wire size; 0 measures loopback.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from toolmux.main import BodyCompressor, HttpMcpClient, _zstd_available  # noqa: E402
+
+SIZES = [1024, 16 * 1024, 256 * 1024, 2 * 1024 * 1024]
+
+
+def make_file(n_bytes: int, seed: int = 1) -> str:
+    """Source-like text: repetitive structure, varying names and numbers."""
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < n_bytes:
+        name = "".join(rng.choice("abcdefghijklmnop") for _ in range(rng.randint(4, 12)))
+        line = (f"    def {name}(self, value: int = {rng.randint(0, 99999)}) -> int:  "
+                f"# handles case {rng.randint(0, 999)}\n")
+        lines.append(line)
+        size += len(line)
+    return "".join(lines)[:n_bytes]
+
+
+def make_listing(n_bytes: int, seed: int = 2) -> str:
+    rng = random.Random(seed)
+    entries, size = [], 2
+    while size < n_bytes:
+        entry = {"name": f"src/module_{rng.randint(0, 99)}/file_{rng.randint(0, 999999):06d}.py",
+                 "type": "file", "size": rng.randint(100, 99999),
+                 "modified": f"2026-10-{rng.randint(1, 28):02d}T12:{rng.randint(0, 59):02d}:00Z"}
+        entries.append(entry)
+        size += len(json.dumps(entry)) + 2
+    return json.dumps(entries)
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Minimal Streamable HTTP MCP server; decodes compressed bodies, compresses replies."""
+
+    protocol_version = "HTTP/1.1"
+    reply_encoding = None  # "gzip" / "zstd" / None, set per run
+    mbps = 0.0
+    listing = ""
+    wire = {"sent": 0, "received": 0}
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _link(self, n_bytes: int) -> None:
+        if self.mbps:
+            time.sleep(n_bytes * 8 / (self.mbps * 1e6))
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        self.wire["received"] += len(raw)
+        self._link(len(raw))
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            raw = gzip.decompress(raw)
+        elif encoding == "zstd":
+            import zstandard
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        message = json.loads(raw)
+        if "id" not in message:
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        method = message["method"]
+        if method == "initialize":
+            result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "stand-in", "version": "1"}}
+        elif message["params"]["name"] == "read":
+            result = {"content": [{"type": "text", "text": self.listing}]}
+        else:
+            data = message["params"]["arguments"]["data"]
+            result = {"content": [{"type": "text", "text": f"wrote {len(data)} bytes"}]}
+        body = json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}).encode()
+        headers = {"Content-Type": "application/json"}
+        accepted = self.headers.get("Accept-Encoding", "")
+        if self.reply_encoding and self.reply_encoding in accepted:
+            if self.reply_encoding == "zstd":
+                import zstandard
+                body = zstandard.ZstdCompressor(level=3).compress(body)
+            else:
+                body = gzip.compress(body, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = self.reply_encoding
+        self._link(len(body))
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wire["sent"] += len(body)
+
+
+async def run(base_url: str, encoding, tool: str, payload: str, rounds: int):
+    compression = BodyCompressor(encoding) if encoding else None
+    client = HttpMcpClient(base_url, compression=compression)
+    try:
+        await client.initialize_async()
+        args = {"data": payload} if tool == "write" else {}
+        await client.call_tool_async(tool, args)  # warm up the connection
+        StandIn.wire.update(sent=0, received=0)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            result = await client.call_tool_async(tool, args)
+            assert "error" not in result, result
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+    finally:
+        await client.aclose()
+    wire = (StandIn.wire["sent"] + StandIn.wire["received"]) / rounds
+    return wire, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--mbps", type=float, default=100.0,
+                        help="simulated link bandwidth in Mbit/s (0 = loopback only)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    StandIn.mbps = args.mbps
+
+    encodings = [None, "gzip"] + (["zstd"] if _zstd_available() else [])
+    if not _zstd_available():
+        print("(zstandard not installed — zstd skipped)")
+    link = f"{args.mbps:g} Mbit/s simulated link" if args.mbps else "loopback"
+    print(f"stand-in server at {base_url}, {link}\n")
+
+    header = f"{'tool':<6}{'payload':>10}" + "".join(
+        f"{(e or 'off'):>12} KB {'ms':>8}" for e in encodings)
+    print(header)
+    print("-" * len(header))
+    for tool in ("write", "read"):
+        for size in SIZES:
+            payload = make_file(size) if tool == "write" else ""
+            StandIn.listing = make_listing(size) if tool == "read" else ""
+            rounds = max(3, args.rounds * 16 * 1024 // max(size, 16 * 1024))
+            row = f"{tool:<6}{size // 1024:>7} KB"
+            for encoding in encodings:
+                StandIn.reply_encoding = encoding
+                wire, ms = asyncio.run(run(base_url, encoding, tool, payload, rounds))
+                row += f"{wire / 1024:>12.1f} KB {ms:>8.2f}"
+            print(row)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
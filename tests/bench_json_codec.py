@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: stdlib json vs. the fast codecs behind toolmux.main.json_*.
+Run directly: python tests/bench_json_codec.py [--rounds N]
+
+Workloads mirror ToolMux hot paths:
+  catalog  — serialize/parse a 300-tool catalog with full inputSchemas
+             (tools/list responses, catalog_tools, build cache files)
+  schema   — json_dumps(inputSchema) per tool (enrichment helpers)
+  result   — parse and re-serialize a ~20MB tools/call result
+             (large file reads / directory listings over stdio)
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from toolmux.main import _load_json_codec  # noqa: E402
+
+
+def make_catalog(n_tools: int = 300):
+    tools = []
+    for i in range(n_tools):
+        props = {
+            f"param_{j}": {
+                "type": ["string", "integer", "boolean", "array"][j % 4],
+                "description": f"Parameter {j} of tool {i}. Controls how the operation "
+                               f"handles input — see the server docs for détails.",
+                **({"items": {"type": "string"}} if j % 4 == 3 else {}),
+                **({"enum": ["fast", "safe", "full"]} if j % 5 == 0 else {}),
+            } for j in range(8)
+        }
+        tools.append({
+            "name": f"server{i % 12}_tool_{i}",
+            "description": "Read, search or modify resources on the backend. " * 3,
+            "inputSchema": {"type": "object", "properties": props,
+                            "required": ["param_0", "param_1"]},
+            "_server": f"server{i % 12}", "_transport": "stdio",
+        })
+    return tools
+
+
+def make_large_result(target_bytes: int = 20 * 1024 * 1024):
+    entry = {"name": "src/module/file_000.py", "type": "file", "size": 48213,
+             "modified": "2026-10-01T12:00:00Z", "mode": "0644"}
+    n = target_bytes // len(json.dumps(entry))
+    listing = [dict(entry, name=f"src/module/file_{k:06d}.py") for k in range(n)]
+    text = json.dumps(listing)
+    return {"jsonrpc": "2.0", "id": 7, "result": {
+        "content": [{"type": "text", "text": text}], "structured": listing[:5000]}}
+
+
+def bench(fn, rounds: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run_codec(codec, catalog, result, result_bytes, rounds):
+    _, dumps, dumpb, loads = codec
+    catalog_bytes = dumpb(catalog)
+    return {
+        "catalog dumps(indent=2)": bench(lambda: dumps(catalog, 2), rounds),
+        "catalog dumpb": bench(lambda: dumpb(catalog), rounds),
+        "catalog loads": bench(lambda: loads(catalog_bytes), rounds),
+        "schema dumps x300": bench(lambda: [dumps(t["inputSchema"]) for t in catalog], rounds),
+        "result loads (20MB)": bench(lambda: loads(result_bytes), max(1, rounds // 10)),
+        "result dumpb (20MB)": bench(lambda: dumpb(result), max(1, rounds // 10)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    catalog = make_catalog()
+    result = make_large_result()
+    result_bytes = json.dumps(result).encode()
+    print(f"catalog: {len(catalog)} tools, {len(json.dumps(catalog)) / 1024:.0f} KB; "
+          f"result: {len(result_bytes) / 1024 / 1024:.1f} MB\n")
+
+    baseline = run_codec(_load_json_codec("json"), catalog, result, result_bytes, args.rounds)
+    columns = {"json": baseline}
+    for name in ("orjson", "msgspec"):
+        codec = _load_json_codec(name)
+        if codec[0] == name:
+            columns[name] = run_codec(codec, catalog, result, result_bytes, args.rounds)
+        else:
+            print(f"({name} not installed — skipped)")
+
+    header = f"{'workload':<26}" + "".join(f"{n:>13}      " for n in columns)
+    print(header)
+    print("-" * len(header))
+    for workload, base_ms in baseline.items():
+        row = f"{workload:<26}"
+        for name, timings in columns.items():
+            ms = timings[workload]
+            row += f"{ms:>10.2f} ms" + (f" {base_ms / ms:>4.1f}x" if name != "json" else " " * 6)
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
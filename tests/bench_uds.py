@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP backend call latency over a Unix domain socket vs TCP loopback.
+Run directly: python tests/bench_uds.py [--calls N] [--rounds R]
+
+One local stand-in MCP server (real sockets, one thread per connection)
+listens on both a Unix socket and 127.0.0.1. Each round makes --calls
+sequential tools/call requests through HttpMcpClient on a warm connection,
+alternating transports between rounds so drift affects both alike. The
+table shows the median and p95 of each round's median, in milliseconds.
+"""
+import argparse
+import asyncio
+import json
+import socket
+import socketserver
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from toolmux.main import HttpMcpClient  # noqa: E402
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Minimal Streamable HTTP MCP server that echoes tool arguments."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        if self.connection.family != socket.AF_UNIX:
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        message = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if "id" not in message:
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if message["method"] == "initialize":
+            result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "stand-in", "version": "1"}}
+        else:
+            result = {"content": [{"type": "text", "text": json.dumps(message["params"]["arguments"])}]}
+        body = json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+async def round_median(base_url: str, calls: int) -> float:
+    client = HttpMcpClient(base_url)
+    try:
+        await client.call_tool_async("echo", {})  # connect and initialize first
+        samples = []
+        for i in range(calls):
+            start = time.perf_counter()
+            result = await client.call_tool_async("echo", {"i": i})
+            samples.append((time.perf_counter() - start) * 1000)
+            assert "error" not in result, result
+        return statistics.median(samples)
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200, help="calls per round")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sock = str(Path(tmp) / "mcp.sock")
+        unix = socketserver.ThreadingUnixStreamServer(sock, StandIn)
+        tcp = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+        for server in (unix, tcp):
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        urls = {"unix socket": f"unix://{sock}", "TCP loopback": f"http://127.0.0.1:{tcp.server_address[1]}"}
+        print(f"{args.rounds} rounds of {args.calls} calls\n")
+
+        medians = {name: [] for name in urls}
+        for _ in range(args.rounds):
+            for name, url in urls.items():
+                medians[name].append(asyncio.run(round_median(url, args.calls)))
+
+        print(f"{'transport':<14}{'median ms':>12}{'p95 ms':>10}")
+        print("-" * 36)
+        for name, values in medians.items():
+            p95 = statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+            print(f"{name:<14}{statistics.median(values):>12.3f}{p95:>10.3f}")
+        ratio = statistics.median(medians["unix socket"]) / statistics.median(medians["TCP loopback"])
+        print(f"\nunix socket / TCP loopback: {ratio:.2f}x")
+        for server in (unix, tcp):
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -57,12 +57,119 @@ while True:
             result_text = str(len(args.get("items", [])))
         else:
             result_text = json.dumps(args)
-        print(json.dumps({"jsonrpc": "2.0", "id": rid, "result": {
-            "content": [{"type": "text", "text": result_text}]}}))
+        result = {"content": [{"type": "text", "text": result_text}]}
+        if args.get("fail"):
+            result["isError"] = True
+        print(json.dumps({"jsonrpc": "2.0", "id": rid, "result": result}))
     sys.stdout.flush()
 '''
 
 
+# ─── Concurrent MCP Server Script ───
+# Handles each tools/call on its own thread so responses can arrive out of
+# order. "sleep" delays the reply; "exit" then kills the process ("exit_once"
+# only if the marker file it names does not exist yet, creating it); "pid"
+# adds the server's process id to the echoed arguments; "pad" appends that
+# many bytes of filler to the reply; "hang" makes it stop answering pings;
+# "cancelled" echoes the request ids named by notifications/cancelled so far;
+# "progress" sends that many progress notifications first (if given a token).
+
+CONCURRENT_SERVER_SCRIPT = '''\
+import sys, json, threading, time, os
+lock = threading.Lock()
+hung = threading.Event()
+cancelled = []
+def send(msg):
+    with lock:
+        sys.stdout.write(json.dumps(msg) + "\\n")
+        sys.stdout.flush()
+def handle(req):
+    args = req.get("params", {}).get("arguments", {})
+    token = req.get("params", {}).get("_meta", {}).get("progressToken")
+    for step in range(args.get("progress", 0) if token is not None else 0):
+        send({"jsonrpc": "2.0", "method": "notifications/progress", "params": {
+            "progressToken": token, "progress": step + 1, "total": args["progress"]}})
+    time.sleep(args.get("sleep", 0))
+    if args.get("exit"):
+        os._exit(3)
+    if args.get("exit_once") and not os.path.exists(args["exit_once"]):
+        open(args["exit_once"], "w").close()
+        os._exit(3)
+    if args.get("pid"):
+        args = dict(args, pid=os.getpid())
+    if args.get("pad"):
+        args = dict(args, pad="x" * args["pad"])
+    if args.get("hang"):
+        hung.set()
+    if args.get("cancelled"):
+        args = dict(args, cancelled=cancelled)
+    result = {"content": [{"type": "text", "text": json.dumps(args)}]}
+    if args.get("fail"):
+        result["isError"] = True
+    send({"jsonrpc": "2.0", "id": req["id"], "result": result})
+while True:
+    line = sys.stdin.readline()
+    if not line: break
+    req = json.loads(line)
+    m = req.get("method", "")
+    rid = req.get("id")
+    if m == "initialize":
+        send({"jsonrpc": "2.0", "id": rid, "result": {
+            "protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+            "serverInfo": {"name": "concurrent", "version": "1.0"}}})
+    elif m == "tools/list":
+        send({"jsonrpc": "2.0", "id": rid, "result": {"tools": [
+            {"name": "slow_tool", "description": "Echo arguments after an optional delay.",
+             "inputSchema": {"type": "object", "properties": {
+                 "sleep": {"type": "number"}, "tag": {"type": "string"}}}}]}})
+    elif m == "tools/call":
+        threading.Thread(target=handle, args=(req,), daemon=True).start()
+    elif m == "notifications/cancelled":
+        cancelled.append(req.get("params", {}).get("requestId"))
+    elif m == "ping" and not hung.is_set():
+        send({"jsonrpc": "2.0", "id": rid, "result": {}})
+'''
+
+
+@pytest.fixture
+def concurrent_server_config(tmp_path):
+    """Return a servers dict for one backend that answers calls concurrently."""
+    script = tmp_path / "concurrent_server.py"
+    script.write_text(CONCURRENT_SERVER_SCRIPT)
+    def _make(**overrides):
+        cfg = {"command": sys.executable, "args": [str(script)]}
+        cfg.update(overrides)
+        return {"conc": cfg}
+    return _make
+
+
+@pytest.fixture
+def started_backend():
+    """Return a factory that starts a BackendManager and waits for its tools.
+
+    Keyword arguments go to BackendManager; managers are shut down at teardown.
+    """
+    from toolmux.main import BackendManager
+    managers = []
+    def _start(servers, **manager_kwargs):
+        bm = BackendManager(servers, **manager_kwargs)
+        managers.append(bm)
+        bm.initialize_all_async()
+        assert bm.wait_for_tools(timeout=10), "backend did not list any tools"
+        return bm
+    yield _start
+    for bm in managers:
+        bm.shutdown()
+
+
+def wait_until(predicate, timeout=5.0):
+    """Poll ``predicate`` until it is true; fail the test after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.05)
+
+
 @pytest.fixture
 def echo_server_path(tmp_path):
     """Create an echo MCP server script and return its path."""
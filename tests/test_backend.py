@@ -1,7 +1,25 @@
 """BackendManager and HttpMcpClient unit tests."""
+import asyncio
+import gzip
 import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
-from toolmux.main import BackendManager, HttpMcpClient, VERSION
+from conftest import ECHO_SERVER_SCRIPT, wait_until
+import httpx
+from fastmcp import Client, FastMCP
+from toolmux.main import (BackendHealth, BackendManager, BodyCompressor, CircuitBreaker, HttpMcpClient, HttpPools, HttpSessionCache,
+                          ResultCache, RetryBudget, RetryPolicy, SseDecoder,
+                          ResultCondenser,
+                          SpillStore,
+                          StdioSession, VERSION, DEFAULT_CALL_TIMEOUT, DEFAULT_INLINE_LIMIT,
+                          adaptive_deadline, _split_unix_url, register_meta_tools, render_result)
 
 
 class TestBackendManager:
@@ -60,6 +78,848 @@ class TestBackendManager:
         bm.shutdown()
 
 
+class TestStdioSession:
+    """Multiplexed stdio sessions: many in-flight calls per backend."""
+
+    def test_server_is_stdio_session(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config())
+        assert isinstance(bm.server_processes["conc"], StdioSession)
+
+    def test_concurrent_calls_are_pipelined(self, started_backend, concurrent_server_config):
+        """Five 0.5s calls overlap instead of taking 2.5s back to back."""
+        bm = started_backend(concurrent_server_config())
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(
+                lambda i: bm.call_tool("slow_tool", {"sleep": 0.5, "tag": f"t{i}"}), range(5)))
+        elapsed = time.monotonic() - start
+        assert elapsed < 2.0
+        for i, result in enumerate(results):
+            assert json.loads(result["content"][0]["text"])["tag"] == f"t{i}"
+
+    def test_out_of_order_responses_routed_by_id(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config())
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            slow = pool.submit(bm.call_tool, "slow_tool", {"sleep": 0.6, "tag": "slow"})
+            time.sleep(0.1)
+            fast = pool.submit(bm.call_tool, "slow_tool", {"tag": "fast"})
+            assert "fast" in fast.result(timeout=5)["content"][0]["text"]
+            assert not slow.done()
+            assert "slow" in slow.result(timeout=5)["content"][0]["text"]
+
+    def test_in_flight_calls_fail_when_process_exits(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(auto_restart=False))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pending = pool.submit(bm.call_tool, "slow_tool", {"sleep": 5})
+            time.sleep(0.2)
+            bm.call_tool("slow_tool", {"exit": True})
+            result = pending.result(timeout=5)
+        assert result["isError"] is True
+        assert "exited with code 3" in result["content"][0]["text"]
+        assert not bm.server_processes["conc"].alive
+
+    def test_large_response_spanning_many_chunks(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config())
+        result = bm.call_tool("slow_tool", {"pad": 5_000_000})
+        assert len(json.loads(result["content"][0]["text"])["pad"]) == 5_000_000
+
+    def test_oversized_response_fails_only_its_call(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(max_message_bytes=100_000))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            small = pool.submit(bm.call_tool, "slow_tool", {"sleep": 0.3, "tag": "ok"})
+            big = bm.call_tool("slow_tool", {"pad": 3_000_000})
+            assert big["isError"] is True
+            assert "max_message_bytes" in big["content"][0]["text"]
+            assert "ok" in small.result(timeout=5)["content"][0]["text"]
+        assert bm.server_processes["conc"].alive
+        assert "after" in bm.call_tool("slow_tool", {"tag": "after"})["content"][0]["text"]
+
+
+class TestCrashRecovery:
+    """Crashed stdio backends are restarted, optionally from a hot spare."""
+
+    def test_crashed_backend_is_restarted(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config())
+        first = bm.server_processes["conc"]
+        crashed = bm.call_tool("slow_tool", {"exit": True})
+        assert crashed["isError"] is True
+        text = crashed["content"][0]["text"]
+        assert "exited with code 3" in text and "restarted" in text
+        result = bm.call_tool("slow_tool", {"tag": "back"})
+        assert "back" in result["content"][0]["text"]
+        assert bm.server_processes["conc"] is not first
+        assert bm.get_server_stats()["conc"]["restarts"] == 1
+
+    def test_queued_call_goes_to_replacement(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(max_concurrency=1))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            doomed = pool.submit(bm.call_tool, "slow_tool", {"sleep": 0.3, "exit": True})
+            time.sleep(0.1)
+            queued = pool.submit(bm.call_tool, "slow_tool", {"tag": "queued"})
+            assert doomed.result(timeout=5)["isError"] is True
+            result = queued.result(timeout=10)
+        assert not result.get("isError")
+        assert "queued" in result["content"][0]["text"]
+
+    def test_hot_spare_takes_over(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(hot_spare=True))
+        wait_until(lambda: bm.get_server_stats()["conc"]["hot_spare"])
+        spare = bm._spares["conc"]
+        bm.call_tool("slow_tool", {"exit": True})
+        start = time.monotonic()
+        assert "fast" in bm.call_tool("slow_tool", {"tag": "fast"})["content"][0]["text"]
+        assert time.monotonic() - start < 0.5
+        assert bm.server_processes["conc"] is spare
+        # A new standby is prepared for the next crash
+        wait_until(lambda: bm.get_server_stats()["conc"]["hot_spare"])
+        assert bm._spares["conc"] is not spare
+
+    def test_crashed_replica_is_replaced(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(replicas=2))
+        pool = bm.server_processes["conc"]
+        bm.call_tool("slow_tool", {"exit": True})
+        wait_until(lambda: all(r.alive for r in pool.replicas))
+        assert bm.get_server_stats()["conc"]["restarts"] == 1
+
+    def test_restart_backoff_grows_and_resets(self):
+        bm = BackendManager({})
+        delays = [bm._restart_delay("x", lived=1.0) for _ in range(5)]
+        assert delays == [0.0, 0.5, 1.0, 2.0, 4.0]
+        assert bm._restart_delay("x", lived=120.0) == 0.0
+        for _ in range(20):
+            delay = bm._restart_delay("x")
+        assert delay == 30.0
+
+
+class TestHealthChecks:
+    """Periodic pings record latency and restart backends that stop answering."""
+
+    def test_ping_latency_is_recorded(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(), ping_interval=0.1)
+        wait_until(lambda: bm.get_server_stats().get("conc", {}).get("health", {}).get("samples", 0) >= 2)
+        health = bm.get_server_stats()["conc"]["health"]
+        assert health["healthy"] is True
+        assert health["consecutive_misses"] == 0
+        assert 0 <= health["p95_ms"] <= health["max_ms"]
+        assert bm.get_health()["conc"]["healthy"] is True
+
+    def test_unresponsive_backend_is_restarted(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(ping_timeout=0.2, ping_misses=2), ping_interval=0.1)
+        first = bm.server_processes["conc"]
+        bm.call_tool("slow_tool", {"hang": True})
+        wait_until(lambda: bm.server_processes["conc"] is not first)
+        assert not first.alive
+        assert bm.get_server_stats()["conc"]["restarts"] == 1
+        assert bm.get_server_stats()["conc"]["health"]["total_misses"] >= 2
+        result = bm.call_tool("slow_tool", {"tag": "alive"})
+        assert "alive" in result["content"][0]["text"]
+
+    def test_pings_disabled(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config(), ping_interval=None)
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            time.sleep(0.3)
+            assert bm.get_health() == {}
+        finally:
+            bm.shutdown()
+
+    def test_health_window_stats(self):
+        health = BackendHealth(max_misses=2)
+        for ms in (10, 20, 30, 40):
+            health.record(0, ms / 1000)
+        stats = health.stats()
+        assert stats["avg_ms"] == 25.0
+        assert stats["max_ms"] == 40.0 and stats["p95_ms"] == 40.0
+        assert health.miss(0) is False
+        assert health.miss(0) is True
+        assert health.healthy is False
+        health.record(0, 0.01)
+        assert health.healthy is True and health.total_misses == 2
+
+
+class TestCallDeadlines:
+    """tools/call deadlines cancel the backend request and free the slot."""
+
+    def _cancelled_ids(self, bm):
+        result = bm.call_tool("slow_tool", {"cancelled": True})
+        return json.loads(result["content"][0]["text"])["cancelled"]
+
+    def test_tool_deadline_cancels_backend_request(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(tool_timeouts={"slow_tool": 0.3}))
+        start = time.monotonic()
+        result = bm.call_tool("slow_tool", {"sleep": 5})
+        assert time.monotonic() - start < 2
+        assert result["isError"] is True
+        assert "0.3s deadline" in result["content"][0]["text"]
+        assert len(self._cancelled_ids(bm)) == 1
+        stats = bm.get_server_stats()["conc"]
+        assert stats["timeouts"] == 1
+        assert stats["load"]["active"] == 0
+
+    def test_client_cancellation_reaches_backend(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(max_concurrency=1))
+
+        async def scenario():
+            task = asyncio.ensure_future(bm.call_tool_async("slow_tool", {"sleep": 5}))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        asyncio.run(scenario())
+        # The single admission slot was released, so this call is not stuck behind it
+        assert len(self._cancelled_ids(bm)) == 1
+
+    def test_deadline_precedence(self):
+        bm = BackendManager({"a": {"call_timeout": 5, "tool_timeouts": {"t": 1}},
+                             "b": {}, "c": {"call_timeout": None}}, call_timeout=None)
+        assert bm._call_deadline("a", "t") == 1
+        assert bm._call_deadline("a", "u") == 5
+        assert bm._call_deadline("b", "x") == DEFAULT_CALL_TIMEOUT
+        assert bm._call_deadline("c", "x") is None
+        bm.call_timeout = 60
+        assert bm._call_deadline("b", "x") == 60
+
+    def test_adaptive_deadline_from_latency(self):
+        from collections import deque
+        assert adaptive_deadline(deque([1.0] * 5)) is None
+        assert adaptive_deadline(deque([0.1] * 50)) == 30.0
+        assert adaptive_deadline(deque([20.0] * 50)) == 100.0
+        assert adaptive_deadline(deque([500.0] * 50)) == DEFAULT_CALL_TIMEOUT
+        bm = BackendManager({"b": {}})
+        bm._latencies[("b", "x")] = deque([20.0] * 50)
+        assert bm._call_deadline("b", "x") == 100.0
+
+    def test_http_deadline_sends_cancellation(self):
+        notices = []
+
+        async def handler(request):
+            body = json.loads(request.content)
+            if body["method"] == "tools/call":
+                await asyncio.sleep(5)
+            if body["method"] == "notifications/cancelled":
+                notices.append(body["params"])
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body.get("id"), "result": {}})
+
+        async def scenario():
+            client = HttpMcpClient(base_url="http://backend")
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            client._initialized = True
+            try:
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.call_tool_async("slow", {}, timeout=0.2)
+                await asyncio.sleep(0.1)
+            finally:
+                await client.aclose()
+        asyncio.run(scenario())
+        assert notices == [{"requestId": 1, "reason": "deadline of 0.2s exceeded"}]
+
+
+class TestCircuitBreaker:
+    """Backends that keep failing are failed fast until a probe succeeds."""
+
+    def test_opens_on_error_rate_then_probes(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_rate=0.5, window=10, min_calls=4,
+                                 open_seconds=10, clock=lambda: now[0])
+        for failure in (None, "refused", None, "refused"):
+            assert breaker.allow()
+            breaker.record(failure)
+        assert breaker.state == "open" and breaker.trips == 1
+        assert not breaker.allow()
+        assert "2 of its last 4 calls failed (last error: refused)" in breaker.message("remote")
+        assert "next probe in 10.0s" in breaker.message("remote")
+
+        now[0] = 10.0
+        assert breaker.state == "half_open"
+        assert breaker.allow() and not breaker.allow()  # one probe at a time
+        breaker.record("refused")
+        assert breaker.state == "open" and breaker.retry_in() == 20.0  # back-off doubles
+
+        now[0] = 30.0
+        assert breaker.allow()
+        breaker.record(None)
+        assert breaker.state == "closed" and breaker.stats()["calls"] == 1
+        assert breaker.stats()["rejected"] == 2
+
+    def test_consecutive_timeouts_trip_early(self):
+        breaker = CircuitBreaker(min_calls=10, max_timeouts=2)
+        breaker.record("timed out after 1s", timeout=True)
+        assert breaker.state == "closed"
+        breaker.record("timed out after 1s", timeout=True)
+        assert breaker.state == "open"
+
+    def test_config(self):
+        assert CircuitBreaker.from_config({"transport": "http"}) is not None
+        assert CircuitBreaker.from_config({"transport": "http", "circuit_breaker": False}) is None
+        assert CircuitBreaker.from_config({"command": "x"}) is None
+        assert CircuitBreaker.from_config({"command": "x", "circuit_breaker": {
+            "open_seconds": 5}}).open_seconds == 5.0
+
+    def test_json_rpc_errors_do_not_trip(self, unix_and_tcp_servers):
+        _, tcp_url = unix_and_tcp_servers
+        bm = BackendManager({"remote": {"transport": "http", "base_url": tcp_url,
+                                        "circuit_breaker": {"min_calls": 5}}})
+        bm.initialize_all_async()
+        try:
+            assert len(bm.wait_for_tools(timeout=10)) == 1
+            for _ in range(5):
+                assert bm.call_tool("echo", {"reject": True})["error"] == "Invalid params"
+            circuit = bm.get_server_stats()["remote"]["circuit"]
+            assert circuit["state"] == "closed" and circuit["failures"] == 0
+            for _ in range(5):
+                assert "HTTP 500" in bm.call_tool("echo", {"status": 500})["error"]
+            assert bm.get_server_stats()["remote"]["circuit"]["state"] == "open"
+        finally:
+            bm.shutdown()
+
+    def test_backend_fails_fast_while_open(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config(
+            tool_timeouts={"slow_tool": 0.2},
+            circuit_breaker={"max_timeouts": 2, "open_seconds": 0.5}))
+        bm.initialize_all_async()
+        try:
+            assert len(bm.wait_for_tools(timeout=10)) == 1
+            for _ in range(2):
+                assert "deadline" in bm.call_tool("slow_tool", {"sleep": 5})["content"][0]["text"]
+            start = time.monotonic()
+            result = bm.call_tool("slow_tool", {"sleep": 5})
+            assert time.monotonic() - start < 0.1
+            assert result["isError"] is True
+            assert "circuit open" in result["content"][0]["text"]
+            assert bm.get_server_stats()["conc"]["circuit"]["state"] == "open"
+
+            time.sleep(0.6)
+            assert "ok" in bm.call_tool("slow_tool", {"tag": "ok"})["content"][0]["text"]
+            assert bm.get_server_stats()["conc"]["circuit"]["state"] == "closed"
+        finally:
+            bm.shutdown()
+
+
+class TestRetries:
+    """Transient failures of idempotent tools are retried within a shared budget."""
+
+    def test_policy_only_for_idempotent_tools(self):
+        assert RetryPolicy.for_tool({}, "t", idempotent=True).attempts == 2
+        assert RetryPolicy.for_tool({}, "t", idempotent=False) is None
+        assert RetryPolicy.for_tool({"retry": False}, "t", idempotent=True) is None
+        assert RetryPolicy.for_tool({"retry_tools": {"t": False}}, "t", idempotent=True) is None
+        vouched = RetryPolicy.for_tool({"retry": {"attempts": 4}, "retry_tools": {"t": {"max_delay": 1}}},
+                                       "t", idempotent=False)
+        assert (vouched.attempts, vouched.max_delay) == (4, 1.0)
+        assert all(0 <= vouched.delay(n) <= min(1.0, 0.1 * 2 ** n) for n in range(6))
+
+    def test_budget_caps_retries_per_window(self):
+        now = [0.0]
+        budget = RetryBudget(ratio=0.5, min_retries=1, window=10, clock=lambda: now[0])
+        for _ in range(4):
+            budget.record_call()
+        assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+        assert budget.stats()["denied"] == 1
+        now[0] = 11.0  # calls and retries age out of the window
+        assert budget.try_spend() is True
+        assert RetryBudget.from_config(False).try_spend() is False
+
+    def test_http_transient_failures_are_marked(self):
+        replies = iter([httpx.ConnectError("reset"), httpx.Response(503), httpx.Response(400)])
+
+        def handler(request):
+            reply = next(replies)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        async def scenario():
+            client = HttpMcpClient("http://remote")
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            client._initialized = True
+            try:
+                return [await client.call_tool_async("t", {}) for _ in range(3)]
+            finally:
+                await client.aclose()
+        reset, unavailable, bad = asyncio.run(scenario())
+        assert reset["data"]["retryable"] and unavailable["data"]["retryable"]
+        assert "HTTP 503" in unavailable["error"]
+        assert "retryable" not in bad["data"]
+
+    def test_init_failure_is_retryable_only_when_transient(self):
+        async def first_call(reply):
+            client = HttpMcpClient("http://remote")
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: reply))
+            try:
+                return await client.call_tool_async("t", {})
+            finally:
+                await client.aclose()
+        rejected = asyncio.run(first_call(httpx.Response(200, json={
+            "jsonrpc": "2.0", "id": 1, "error": {"code": -32602, "message": "unsupported version"}})))
+        assert rejected == {"error": "Failed to initialize HTTP MCP connection: unsupported version"}
+        unavailable = asyncio.run(first_call(httpx.Response(503)))
+        assert unavailable["error"].startswith("Failed to initialize HTTP MCP connection: ")
+        assert unavailable["data"]["retryable"]
+
+    def test_transport_tag_is_not_returned(self, unix_and_tcp_servers):
+        _, tcp_url = unix_and_tcp_servers
+        bm = BackendManager({"remote": {"transport": "http", "base_url": tcp_url,
+                                        "retry_tools": {"echo": {"attempts": 1}}}})
+        bm.initialize_all_async()
+        try:
+            assert len(bm.wait_for_tools(timeout=10)) == 1
+            result = bm.call_tool("echo", {"status": 503})
+            assert "HTTP 503" in result["error"]
+            assert "data" not in result and "retryable" not in result
+            assert bm.get_server_stats()["remote"]["retries"]["retried"] == 1
+        finally:
+            bm.shutdown()
+
+    def test_crash_is_retried_on_replacement(self, concurrent_server_config, tmp_path):
+        bm = BackendManager(concurrent_server_config(retry_tools={"slow_tool": True}))
+        bm.initialize_all_async()
+        try:
+            assert len(bm.wait_for_tools(timeout=10)) == 1
+            marker = str(tmp_path / "crashed")
+            result = bm.call_tool("slow_tool", {"exit_once": marker, "tag": "again"})
+            assert not result.get("isError")
+            assert "again" in result["content"][0]["text"]
+            stats = bm.get_server_stats()["conc"]
+            assert stats["retries"] == {"retried": 1, "recovered": 1, "budget_denied": 0}
+            assert stats["restarts"] == 1
+        finally:
+            bm.shutdown()
+
+    def test_exhausted_budget_returns_failure(self, concurrent_server_config, tmp_path):
+        bm = BackendManager(concurrent_server_config(retry_tools={"slow_tool": True}),
+                            retry_budget=RetryBudget(0.0, 0))
+        bm.initialize_all_async()
+        try:
+            assert len(bm.wait_for_tools(timeout=10)) == 1
+            result = bm.call_tool("slow_tool", {"exit_once": str(tmp_path / "crashed")})
+            assert result["isError"] is True and "restarted" in result["content"][0]["text"]
+            assert bm.get_server_stats()["conc"]["retries"]["budget_denied"] == 1
+        finally:
+            bm.shutdown()
+
+
+class TestResultCache:
+    """Cached tool results: LRU + TTL in memory, optional disk tier."""
+
+    def test_key_ignores_argument_order(self):
+        assert ResultCache.key("s", "t", {"a": 1, "b": [1, 2]}) == ResultCache.key("s", "t", {"b": [1, 2], "a": 1})
+        assert ResultCache.key("s", "t", {"a": 1}) != ResultCache.key("s", "u", {"a": 1})
+
+    def test_lru_ttl_and_size_limits(self):
+        async def scenario():
+            cache = ResultCache(max_entries=2)
+            for i in range(3):
+                await cache.put("s", f"k{i}", {"n": i}, ttl=30)
+            assert await cache.get("s", "k0") is None  # evicted, oldest
+            assert await cache.get("s", "k2") == {"n": 2}
+            await cache.put("s", "short", {"n": 9}, ttl=0.05)
+            await asyncio.sleep(0.1)
+            assert await cache.get("s", "short") is None
+            small = ResultCache(max_bytes=50)
+            await small.put("s", "big", {"text": "x" * 100}, ttl=30)
+            assert await small.get("s", "big") is None
+            return cache.stats()
+        stats = asyncio.run(scenario())
+        assert stats["hits"] == 1 and stats["misses"] == 2
+        assert stats["evictions"] >= 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        async def scenario():
+            await ResultCache(directory=tmp_path).put("s", "k", {"v": 1}, ttl=30, persist=True)
+            fresh = ResultCache(directory=tmp_path)
+            assert await fresh.get("s", "k") is None  # memory-only lookup
+            assert await fresh.get("s", "k", persist=True) == {"v": 1}
+            assert await fresh.get("s", "k") == {"v": 1}  # promoted to memory
+            return fresh.stats()
+        stats = asyncio.run(scenario())
+        assert stats["disk_hits"] == 1 and stats["hits"] == 1
+
+    def test_repeated_call_served_from_cache(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config(cache_tools={"slow_tool": 30}),
+                            result_cache=ResultCache())
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            first = bm.call_tool("slow_tool", {"tag": "a", "sleep": 0.3})
+            start = time.monotonic()
+            again = bm.call_tool("slow_tool", {"sleep": 0.3, "tag": "a"})
+            assert time.monotonic() - start < 0.2
+            assert again == first
+            bm.call_tool("slow_tool", {"tag": "b"})
+            stats = bm.get_server_stats()["conc"]
+            assert stats["load"]["admitted"] == 2
+            assert stats["result_cache"] == {"hits": 1, "disk_hits": 0, "misses": 2, "stores": 2,
+                                             "invalidated": 0}
+            assert bm.get_cache_stats()["entries"] == 2
+        finally:
+            bm.shutdown()
+
+    def test_write_evicts_server_entries(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config(cache_tools={"slow_tool": 30},
+                                                     invalidate_on=["save"]),
+                            result_cache=ResultCache())
+        bm.initialize_all_async()
+        try:
+            assert len(bm.wait_for_tools(timeout=10)) == 1
+            with bm._lock:
+                bm.tool_cache.append({"name": "drop", "_server": "conc",
+                                      "annotations": {"destructiveHint": True}})
+            bm.call_tool("slow_tool", {"tag": "a"})
+            bm.call_tool("slow_tool", {"tag": "a"})
+            bm.call_tool("save", {}, server="conc")  # listed in invalidate_on
+            bm.call_tool("slow_tool", {"tag": "a"})
+            bm.call_tool("drop", {}, server="conc")  # annotated destructive
+            bm.call_tool("slow_tool", {"tag": "a"})
+            stats = bm.get_server_stats()["conc"]["result_cache"]
+            assert (stats["hits"], stats["misses"], stats["invalidated"]) == (1, 3, 2)
+        finally:
+            bm.shutdown()
+
+    def test_reads_and_failed_writes_keep_entries(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config(cache_tools={"slow_tool": 30},
+                                                     invalidate_on=["save"]),
+                            result_cache=ResultCache())
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            bm.call_tool("slow_tool", {"tag": "a"})
+            bm.call_tool("lookup", {}, server="conc")  # unannotated: not assumed to write
+            assert bm.call_tool("save", {"fail": True}, server="conc")["isError"]
+            bm.call_tool("slow_tool", {"tag": "a"})
+            stats = bm.get_server_stats()["conc"]["result_cache"]
+            assert (stats["hits"], stats["misses"], stats["invalidated"]) == (1, 1, 0)
+        finally:
+            bm.shutdown()
+
+    def test_invalidate_covers_disk_and_in_flight_reads(self, tmp_path):
+        async def scenario():
+            cache = ResultCache(directory=tmp_path)
+            await cache.put("s", "k", {"v": 1}, ttl=30, persist=True)
+            await cache.put("other", "o", {"v": 2}, ttl=30)
+            issued = time.time()
+            await asyncio.sleep(0.01)
+            cache.invalidate("s")
+            assert await cache.get("s", "k", persist=True) is None  # disk copy predates the write
+            assert await cache.get("other", "o") == {"v": 2}
+            await cache.put("s", "k", {"v": 0}, ttl=30, issued=issued)  # read raced the write
+            assert await cache.get("s", "k") is None
+            await cache.put("s", "k", {"v": 3}, ttl=30, issued=time.time())
+            return await cache.get("s", "k")
+        assert asyncio.run(scenario()) == {"v": 3}
+
+    def test_policy_from_config_and_annotations(self):
+        bm = BackendManager({"s": {"cache_tools": {"pinned": {"ttl": 5, "persist": True},
+                                                   "off": False, "short": 2}},
+                             "quiet": {"cache_annotated": False}},
+                            result_cache=ResultCache(ttl=60))
+        bm.tool_cache = [
+            {"name": "read", "_server": "s", "annotations": {"readOnlyHint": True}},
+            {"name": "put", "_server": "s", "annotations": {"idempotentHint": True, "destructiveHint": False}},
+            {"name": "delete", "_server": "s", "annotations": {"idempotentHint": True}},
+            {"name": "off", "_server": "s", "annotations": {"readOnlyHint": True}},
+            {"name": "read", "_server": "quiet", "annotations": {"readOnlyHint": True}},
+        ]
+        assert bm._cache_policy("s", "pinned") == (5.0, True)
+        assert bm._cache_policy("s", "short") == (2.0, False)
+        assert bm._cache_policy("s", "read") == (60.0, False)
+        assert bm._cache_policy("s", "put") == (60.0, False)
+        assert bm._cache_policy("s", "delete") is None
+        assert bm._cache_policy("s", "off") is None
+        assert bm._cache_policy("quiet", "read") is None
+        assert BackendManager({"s": {}})._cache_policy("s", "read") is None
+
+
+class TestResultCondensation:
+    """Tool output condensed in the call path, with per-tool rules and stats."""
+
+    def test_per_tool_rules(self):
+        config = {"condense_results": {"max_chars": 100},
+                  "servers": {"s": {"condense_tools": {"raw": False, "short": {"max_chars": 5}}}}}
+        condenser = ResultCondenser.from_config(config)
+        assert condenser.rules(config["servers"]["s"], "raw") is None
+        assert condenser.rules(config["servers"]["s"], "short")["max_chars"] == 5
+        assert condenser.rules({}, "other")["max_chars"] == 100
+        assert ResultCondenser.from_config({"servers": {"s": {}}}) is None
+        only_listed = ResultCondenser.from_config({"servers": {"s": {"condense_tools": {"t": True}}}})
+        assert only_listed.rules({}, "other") is None
+        assert only_listed.rules({"condense_tools": {"t": True}}, "t")["minify_json"] is True
+
+    def test_results_condensed_before_caching(self, concurrent_server_config):
+        servers = concurrent_server_config(cache_tools={"slow_tool": 30},
+                                           condense_tools={"slow_tool": {"max_chars": 40}})
+        bm = BackendManager(servers, result_cache=ResultCache(),
+                            condenser=ResultCondenser.from_config({"servers": servers}))
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            first = bm.call_tool("slow_tool", {"pad": 200})
+            text = first["content"][0]["text"]
+            assert text.startswith('{"pad":"xxx') and "[... truncated: showing 40 of 210" in text
+            assert bm.call_tool("slow_tool", {"pad": 200}) == first  # cached copy is condensed
+            stats = bm.get_server_stats()["conc"]["condensed"]["slow_tool"]
+            assert stats["calls"] == 1 and stats["bytes_in"] == 211
+            assert stats["bytes_out"] == len(text.encode())
+        finally:
+            bm.shutdown()
+
+
+class TestLargeResults:
+    """Oversized results handed out by handle and paged back with read_result."""
+
+    def test_off_unless_configured(self, concurrent_server_config):
+        assert SpillStore.from_config(None) is None
+        assert SpillStore.from_config(False) is None
+        assert SpillStore.from_config(True).inline_limit == DEFAULT_INLINE_LIMIT
+        store = SpillStore.from_config({"inline_limit": 50})
+        assert store.inline_limit == 50
+        store.close()
+        bm = BackendManager(concurrent_server_config())
+        big = {"content": [{"type": "text", "text": "x" * (DEFAULT_INLINE_LIMIT + 1)}]}
+        assert render_result("slow_tool", big, bm) == "x" * (DEFAULT_INLINE_LIMIT + 1)
+
+    def test_pages_cover_the_whole_result(self):
+        store = SpillStore(inline_limit=10, preview_chars=4)
+        text = "0123456789" * 5
+        notice = store.spill(text, "s1", "dump")
+        handle = notice.split("handle ")[1].split(".")[0]
+        assert notice.endswith("\n0123") and "offset=4" in notice
+        pieces, offset = [], 0
+        while True:
+            page = store.read(handle, offset, 10)
+            header, body = page.split("\n", 1)
+            pieces.append(body)
+            if "end of result" in header:
+                break
+            offset = int(header.split("next offset=")[1].rstrip("]"))
+        assert "".join(pieces) == text
+        assert "not found" in store.read("r-missing")
+
+    def test_pages_never_split_a_character(self):
+        store = SpillStore(inline_limit=100, preview_chars=1)
+        text = "é" * 30  # two bytes each
+        handle = store.spill(text, "s1", "t").split("handle ")[1].split(".")[0]
+        page = store.read(handle, 1, 5)  # starts and ends mid-character
+        assert page == f"[{handle}: bytes 2-6 of 60; next offset=6]\néé"
+
+    def test_short_pages_still_advance_past_wide_characters(self):
+        store = SpillStore(inline_limit=100, preview_chars=1)
+        text = "a€😀b"  # 1, 3, 4 and 1 bytes
+        handle = store.spill(text, "s1", "t").split("handle ")[1].split(".")[0]
+        assert store.read(handle, 1, 1) == f"[{handle}: bytes 1-4 of 9; next offset=4]\n€"
+        pieces, offset = [], 0
+        while True:
+            header, body = store.read(handle, offset, 1).split("\n", 1)
+            pieces.append(body)
+            if "end of result" in header:
+                break
+            offset = int(header.split("next offset=")[1].rstrip("]"))
+        assert pieces == ["a", "€", "😀", "b"]
+
+    def test_eviction_respects_session_and_global_caps(self):
+        store = SpillStore(inline_limit=10, preview_chars=1, max_bytes=250, session_bytes=150,
+                           max_handles=10)
+        handles = [store.spill("a" * 100, "s1", "t").split("handle ")[1].split(".")[0]
+                   for _ in range(2)]
+        assert "not found" in store.read(handles[0])  # s1 over its 150-byte cap
+        other = store.spill("b" * 100, "s2", "t").split("handle ")[1].split(".")[0]
+        store.spill("c" * 100, "s3", "t")  # 300 bytes total: the LRU handle goes
+        assert "not found" in store.read(handles[1])
+        assert "bbb" in store.read(other)
+        stats = store.stats()
+        assert stats["handles"] == 2 and stats["evictions"] == 2 and stats["sessions"] == 2
+        too_big = store.spill("z" * 500, "s3", "t")
+        assert too_big.startswith("[Result from t truncated")
+        store.close()
+        assert store.stats()["handles"] == 0
+
+    def test_invoke_returns_handle_for_large_output(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config(),
+                            spill_store=SpillStore(inline_limit=1000, preview_chars=100))
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            mcp = FastMCP("test")
+            register_meta_tools(mcp, bm)
+            small = asyncio.run(mcp.call_tool("invoke", {"name": "slow_tool", "args": {"tag": "a"}}))
+            assert small.content[0].text.startswith('{"tag": "a"}')
+            big = asyncio.run(mcp.call_tool("invoke", {"name": "slow_tool", "args": {"pad": 5000}}))
+            notice = big.content[0].text
+            assert notice.startswith("[Large result from slow_tool: 5,")
+            assert len(notice) < 500
+            handle = notice.split("handle ")[1].split(".")[0]
+            page = asyncio.run(mcp.call_tool("read_result", {"handle": handle, "offset": 0,
+                                                             "length": 100_000}))
+            body = page.content[0].text.split("\n", 1)[1]
+            assert len(body) == 1000  # one page is capped at the inline limit
+            assert bm.spill_store.stats()["spilled"] == 1
+        finally:
+            bm.shutdown()
+
+
+class TestLazySpawning:
+    """Lazy mode starts backends on first call; idle backends are reaped."""
+
+    CACHED = [{"name": "slow_tool", "description": "Echo arguments.",
+               "inputSchema": {"type": "object", "properties": {}},
+               "_server": "conc", "_transport": "stdio"}]
+
+    def _lazy(self, servers, **kwargs):
+        bm = BackendManager(servers, lazy=True, **kwargs)
+        bm.preload_tools([dict(t) for t in self.CACHED])
+        bm.initialize_all_async()
+        bm.wait_for_tools(timeout=10)
+        return bm
+
+    def test_backend_starts_on_first_call(self, concurrent_server_config):
+        bm = self._lazy(concurrent_server_config())
+        try:
+            assert "conc" not in bm.server_processes
+            assert [t["name"] for t in bm.get_all_tools()] == ["slow_tool"]
+            result = bm.call_tool("slow_tool", {"tag": "first"})
+            assert "first" in result["content"][0]["text"]
+            assert "conc" in bm.server_processes
+            # Live discovery replaced the cached entry instead of duplicating it
+            assert len(bm.get_all_tools()) == 1
+        finally:
+            bm.shutdown()
+
+    def test_eager_server_starts_immediately(self, concurrent_server_config):
+        bm = self._lazy(concurrent_server_config(eager=True))
+        try:
+            assert "conc" in bm.server_processes
+        finally:
+            bm.shutdown()
+
+    def test_idle_backend_is_reaped_and_restarted(self, concurrent_server_config):
+        bm = self._lazy(concurrent_server_config(), idle_timeout=0.3)
+        try:
+            bm.call_tool("slow_tool", {})
+            first = bm.server_processes["conc"]
+            time.sleep(1.0)
+            assert "conc" not in bm.server_processes
+            assert not first.alive
+            assert "again" in bm.call_tool("slow_tool", {"tag": "again"})["content"][0]["text"]
+            assert bm.server_processes["conc"] is not first
+        finally:
+            bm.shutdown()
+
+    def test_busy_backend_is_not_reaped(self, concurrent_server_config):
+        bm = self._lazy(concurrent_server_config(), idle_timeout=0.2)
+        try:
+            result = bm.call_tool("slow_tool", {"sleep": 0.8, "tag": "long"})
+            assert "long" in result["content"][0]["text"]
+        finally:
+            bm.shutdown()
+
+
+class TestAsyncBackendApi:
+    """call_tool_async runs on the backend loop and never blocks the caller's loop."""
+
+    def test_call_tool_async_does_not_block_event_loop(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config())
+        bm.initialize_all_async()
+        bm.wait_for_tools(timeout=10)
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.05)
+                    ticks += 1
+
+            tick_task = asyncio.create_task(ticker())
+            start = time.monotonic()
+            results = await asyncio.gather(*(
+                bm.call_tool_async("slow_tool", {"sleep": 0.5, "tag": str(i)}) for i in range(4)))
+            elapsed = time.monotonic() - start
+            tick_task.cancel()
+            return results, elapsed, ticks
+
+        try:
+            results, elapsed, ticks = asyncio.run(scenario())
+            assert elapsed < 1.5
+            assert ticks >= 5  # the caller's loop kept running while calls were in flight
+            assert [json.loads(r["content"][0]["text"])["tag"] for r in results] == ["0", "1", "2", "3"]
+        finally:
+            bm.shutdown()
+
+    def test_sync_wrapper_matches_async(self, test_config):
+        config = json.loads(test_config().read_text())
+        bm = BackendManager(config["servers"])
+        bm.initialize_all_async()
+        bm.wait_for_tools(timeout=10)
+        try:
+            sync_result = bm.call_tool("reverse_tool", {"text": "abc"})
+            async_result = asyncio.run(bm.call_tool_async("reverse_tool", {"text": "abc"}))
+            assert sync_result == async_result
+            assert sync_result["content"][0]["text"] == "cba"
+        finally:
+            bm.shutdown()
+
+
+class TestPerServerReadiness:
+    """Calls wait only for their own backend, never for the slowest one."""
+
+    @pytest.fixture
+    def mixed_servers(self, tmp_path, echo_server_path):
+        slow = tmp_path / "slow_start.py"
+        slow.write_text("import time\ntime.sleep(4)\n" + ECHO_SERVER_SCRIPT)
+        return {
+            "fast": {"command": sys.executable, "args": [echo_server_path]},
+            "slow": {"command": sys.executable, "args": [str(slow)]},
+            "broken": {"command": "/nonexistent/binary", "args": []},
+        }
+
+    def test_fast_server_not_blocked_by_slow_server(self, mixed_servers):
+        bm = BackendManager(mixed_servers)
+        bm.initialize_all_async()
+        try:
+            start = time.monotonic()
+            result = bm.call_tool("reverse_tool", {"text": "abc"}, server="fast")
+            assert result["content"][0]["text"] == "cba"
+            assert time.monotonic() - start < 3
+            assert not bm._init_complete.is_set()
+        finally:
+            bm.shutdown()
+
+    def test_tool_lookup_resolves_as_servers_come_up(self, mixed_servers):
+        bm = BackendManager(mixed_servers)
+        bm.initialize_all_async()
+        try:
+            start = time.monotonic()
+            result = bm.call_tool("echo_tool", {"message": "hi"})
+            assert "hi" in result["content"][0]["text"]
+            assert time.monotonic() - start < 3
+        finally:
+            bm.shutdown()
+
+    def test_failed_server_fails_fast_with_reason(self, mixed_servers):
+        bm = BackendManager(mixed_servers)
+        bm.initialize_all_async()
+        try:
+            assert bm.wait_for_server("broken", timeout=5) is False
+            start = time.monotonic()
+            result = bm.call_tool("anything", {}, server="broken")
+            assert time.monotonic() - start < 1
+            assert result["isError"] is True
+            assert "failed to initialize: returned 0 tools" in result["content"][0]["text"]
+        finally:
+            bm.shutdown()
+
+    def test_wait_for_server(self, mixed_servers):
+        bm = BackendManager(mixed_servers)
+        bm.initialize_all_async()
+        try:
+            assert bm.wait_for_server("fast", timeout=5) is True
+            assert bm.wait_for_server("slow", timeout=0.5) is False
+            assert bm.wait_for_server("slow", timeout=10) is True
+        finally:
+            bm.shutdown()
+
+
 class TestHttpMcpClient:
 
     def test_client_initialization(self):
@@ -92,3 +952,529 @@ class TestHttpMcpClient:
         result = client.call_rpc("test")
         assert "error" in result
         client.close()
+
+    def test_async_connection_error_handled(self):
+        async def scenario():
+            client = HttpMcpClient(base_url="http://localhost:1", timeout=1)
+            try:
+                return await client.call_rpc_async("test", request_id=7)
+            finally:
+                await client.aclose()
+        result = asyncio.run(scenario())
+        assert result["id"] == 7
+        assert result["error"]["code"] == -32603
+
+
+class TestHttpPools:
+    """Connection pools shared by HTTP backends on the same origin."""
+
+    def test_same_origin_shares_one_client(self):
+        async def scenario():
+            pools = HttpPools()
+            a = HttpMcpClient("http://api.example:8080/one", pools=pools)
+            b = HttpMcpClient("http://api.example:8080/two", headers={"X-Key": "b"}, pools=pools)
+            c = HttpMcpClient("http://api.example:8080/three", pools=pools,
+                              pool_config={"pool_connections": 5})
+            d = HttpMcpClient("http://other.example", pools=pools)
+            clients = [x._get_async_client() for x in (a, b, c, d)]
+            assert clients[0] is clients[1]
+            assert clients[2] is not clients[0] and clients[3] is not clients[0]
+            assert pools.stats(a._pool_key) == {
+                "origin": "http://api.example:8080", "backends": 2, "http2": False,
+                "max_connections": 100, "max_keepalive": 20, "keepalive_expiry": 30.0}
+            await a.aclose()
+            assert not clients[0].is_closed
+            await b.aclose()
+            assert clients[0].is_closed
+            for x in (c, d):
+                await x.aclose()
+        asyncio.run(scenario())
+
+    def test_backend_headers_sent_per_request(self):
+        seen = []
+
+        def handler(request):
+            seen.append((request.headers.get("X-Key"), request.headers["Content-Type"]))
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": {}})
+
+        async def scenario():
+            shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            for key in ("a", "b"):
+                client = HttpMcpClient("http://backend", headers={"X-Key": key})
+                client._async_client = shared
+                await client.call_rpc_async("ping")
+            await shared.aclose()
+        asyncio.run(scenario())
+        assert seen == [("a", "application/json"), ("b", "application/json")]
+
+    def test_http2_without_h2_falls_back(self, monkeypatch, capsys):
+        monkeypatch.setattr(sys.modules["toolmux.main"], "_http2_available", lambda: False)
+
+        async def scenario():
+            pools = HttpPools()
+            client = HttpMcpClient("https://backend", pools=pools, pool_config={"http2": True})
+            client._get_async_client()
+            http2 = pools.stats(client._pool_key)["http2"]
+            await client.aclose()
+            return http2
+        assert asyncio.run(scenario()) is False
+        assert "using HTTP/1.1" in capsys.readouterr().err
+
+
+class _GzipEchoServer:
+    """Mock MCP server that takes gzip request bodies (unless ``refuse``) and gzips its replies."""
+
+    def __init__(self, refuse=False):
+        self.refuse = refuse
+        self.received = []  # (Content-Encoding, bytes on the wire)
+
+    def __call__(self, request):
+        encoding = request.headers.get("Content-Encoding")
+        self.received.append((encoding, len(request.content)))
+        if encoding and self.refuse:
+            return httpx.Response(415, headers={"Accept-Encoding": "identity"})
+        body = json.loads(gzip.decompress(request.content) if encoding == "gzip" else request.content)
+        reply = json.dumps({"jsonrpc": "2.0", "id": body["id"], "result": {
+            "content": [{"type": "text", "text": body["params"]["arguments"]["data"]}]}}).encode()
+        return httpx.Response(200, content=gzip.compress(reply), headers={
+            "Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+
+class TestHttpCompression:
+    """Opt-in request compression; compressed replies are decoded transparently."""
+
+    def _calls(self, server, payloads, compression):
+        async def scenario():
+            client = HttpMcpClient("http://remote", compression=compression)
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+            client._initialized = True
+            try:
+                return [(await client.call_tool_async("write", {"data": p}))["content"][0]["text"]
+                        for p in payloads]
+            finally:
+                await client.aclose()
+        return asyncio.run(scenario())
+
+    def test_large_bodies_are_compressed(self):
+        server = _GzipEchoServer()
+        compressor = BodyCompressor("gzip", min_bytes=1024)
+        big = "line of file content\n" * 2000
+        assert self._calls(server, ["small", big], compressor) == ["small", big]
+        assert [e for e, _ in server.received] == [None, "gzip"]
+        assert server.received[1][1] < len(big) / 10
+        stats = compressor.stats()
+        assert stats["compressed"] == 1 and stats["requests"] == 2
+        assert stats["saved_pct"] > 90 and stats["compressed_replies"] == 2
+
+    def test_refused_encoding_falls_back_to_identity(self):
+        server = _GzipEchoServer(refuse=True)
+        compressor = BodyCompressor("gzip", min_bytes=10)
+        big = "x" * 5000
+        assert self._calls(server, [big, big], compressor) == [big, big]
+        assert [e for e, _ in server.received] == ["gzip", None, None]
+        assert compressor.encoding is None and compressor.refusals == 1
+
+    def test_config(self, monkeypatch, capsys):
+        assert BodyCompressor.from_config({}) is None
+        assert BodyCompressor.from_config({"compression": {"encoding": "gzip", "min_bytes": 64}}).min_bytes == 64
+        monkeypatch.setattr(sys.modules["toolmux.main"], "_zstd_available", lambda: False)
+        assert BodyCompressor.from_config({"compression": True}).encoding == "gzip"
+        assert BodyCompressor.from_config({"compression": {"encoding": "zstd"}}).encoding == "gzip"
+        assert "zstandard" in capsys.readouterr().err
+
+
+class _McpHttpHandler(BaseHTTPRequestHandler):
+    """Real-socket Streamable HTTP MCP server with one ``echo`` tool."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        if self.connection.family != socket.AF_UNIX:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        message = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = (message.get("params", {}).get("arguments") or {}).get("status")
+        if "id" not in message or status:
+            self.send_response(status or 202)  # ``status`` argument: fail at the HTTP level
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if (message.get("params", {}).get("arguments") or {}).get("reject"):
+            self._reply({"jsonrpc": "2.0", "id": message["id"],
+                         "error": {"code": -32602, "message": "Invalid params"}})
+            return
+        result = {
+            "initialize": {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                           "serverInfo": {"name": "local", "version": "1"}},
+            "tools/list": {"tools": [{"name": "echo", "inputSchema": {"type": "object"}}]},
+        }.get(message["method"]) or {
+            "content": [{"type": "text", "text": json.dumps(message.get("params", {}).get("arguments"))}]}
+        self._reply({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def _reply(self, message):
+        body = json.dumps(message).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def unix_and_tcp_servers(tmp_path):
+    """The same MCP server on a Unix socket and on TCP loopback: (unix:// URL, http:// URL)."""
+    sock = str(tmp_path / "mcp.sock")
+    unix = socketserver.ThreadingUnixStreamServer(sock, _McpHttpHandler)
+    tcp = ThreadingHTTPServer(("127.0.0.1", 0), _McpHttpHandler)
+    for server in (unix, tcp):
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"unix://{sock}", f"http://127.0.0.1:{tcp.server_address[1]}"
+    for server in (unix, tcp):
+        server.shutdown()
+        server.server_close()
+
+
+class TestUnixSocketTransport:
+    """HTTP backends reached over a Unix domain socket instead of TCP."""
+
+    def test_split_unix_url(self):
+        assert _split_unix_url("unix:///run/mcp/foo.sock") == ("http://localhost", "/run/mcp/foo.sock")
+        assert _split_unix_url("http://host:8080") == ("http://host:8080", None)
+        with pytest.raises(ValueError, match="absolute path"):
+            _split_unix_url("unix://foo.sock")
+
+    def test_backend_over_unix_socket(self, unix_and_tcp_servers):
+        unix_url, _ = unix_and_tcp_servers
+        bm = BackendManager({"local": {"transport": "http", "base_url": unix_url}})
+        bm.initialize_all_async()
+        try:
+            assert [t["name"] for t in bm.wait_for_tools(timeout=10)] == ["echo"]
+            assert json.loads(bm.call_tool("echo", {"n": 1})["content"][0]["text"]) == {"n": 1}
+            assert bm.get_server_stats()["local"]["http_pool"]["origin"] == unix_url
+            assert bm.server_processes["local"]._client is None  # no sync client on the async path
+        finally:
+            bm.shutdown()
+        with HttpMcpClient(unix_url) as client:  # synchronous API
+            assert json.loads(client.call_tool("echo", {"n": 2})["content"][0]["text"]) == {"n": 2}
+
+    def test_round_trip_matches_tcp(self, unix_and_tcp_servers):
+        # Latency against TCP loopback is measured by tests/bench_uds.py (make bench-uds)
+        async def round_trip(url):
+            client = HttpMcpClient(url)
+            try:
+                return [await client.call_tool_async("echo", args)
+                        for args in ({"i": 1}, {"blob": "x" * 300_000})]
+            finally:
+                await client.aclose()
+        unix_url, tcp_url = unix_and_tcp_servers
+        over_unix = asyncio.run(round_trip(unix_url))
+        assert over_unix == asyncio.run(round_trip(tcp_url))
+        assert len(json.loads(over_unix[1]["content"][0]["text"])["blob"]) == 300_000
+
+
+class _RpcOnlyServer:
+    """Mock MCP server on /rpc only that issues sessions and can forget them."""
+
+    def __init__(self):
+        self.requests = []
+        self.sessions = set()
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        session = request.headers.get("Mcp-Session-Id")
+        self.requests.append((request.url.path, body["method"], session))
+        if request.url.path != "/rpc":
+            return httpx.Response(404)
+        if body["method"].startswith("notifications/"):
+            return httpx.Response(202)
+        if body["method"] == "initialize":
+            sid = f"s{len(self.sessions) + 1}"
+            self.sessions.add(sid)
+            return httpx.Response(200, headers={"Mcp-Session-Id": sid}, json={
+                "jsonrpc": "2.0", "id": body["id"], "result": {
+                    "protocolVersion": "2024-11-05", "capabilities": {"tools": {"listChanged": True}},
+                    "serverInfo": {"name": "remote", "version": "1"}}})
+        if session not in self.sessions:
+            return httpx.Response(404)
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": {
+            "content": [{"type": "text", "text": "ok"}]}})
+
+
+class TestHttpNegotiation:
+    """Endpoint, session and capabilities negotiated once and reused."""
+
+    def _client(self, server, saved=None):
+        client = HttpMcpClient("http://remote")
+        client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+        if saved:
+            client.restore(saved)
+        return client
+
+    def test_endpoint_probed_once(self):
+        server = _RpcOnlyServer()
+        negotiated = []
+
+        async def scenario():
+            client = self._client(server)
+            client.on_negotiated = negotiated.append
+            try:
+                for _ in range(2):
+                    assert (await client.call_tool_async("t", {}))["content"][0]["text"] == "ok"
+            finally:
+                await client.aclose()
+            return client
+        client = asyncio.run(scenario())
+        assert [r[:2] for r in server.requests] == [
+            ("/mcp", "initialize"), ("/rpc", "initialize"), ("/rpc", "notifications/initialized"),
+            ("/rpc", "tools/call"), ("/rpc", "tools/call")]
+        assert server.requests[-1][2] == "s1"
+        assert client.capabilities == {"tools": {"listChanged": True}}
+        assert negotiated[-1]["endpoint"] == "/rpc" and negotiated[-1]["session_id"] == "s1"
+
+    def test_warm_start_reuses_saved_endpoint(self, tmp_path):
+        cache = HttpSessionCache(tmp_path / ".toolmux_http.json")
+        cache.put("remote", "http://remote/", {"endpoint": "/rpc", "session_id": "s1",
+                                                "protocol_version": "2024-11-05"})
+        reloaded = HttpSessionCache(tmp_path / ".toolmux_http.json")
+        assert reloaded.get("remote", "http://elsewhere") is None  # base_url changed
+        saved = reloaded.get("remote", "http://remote")
+        assert "session_id" not in saved  # a live session's id is never written to disk
+        server = _RpcOnlyServer()
+
+        async def scenario():
+            client = self._client(server, saved)
+            try:
+                await client.call_tool_async("t", {})
+            finally:
+                await client.aclose()
+        asyncio.run(scenario())
+        assert [r[:2] for r in server.requests] == [
+            ("/rpc", "initialize"), ("/rpc", "notifications/initialized"), ("/rpc", "tools/call")]
+
+    def test_saves_are_debounced_off_the_loop(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys.modules["toolmux.main"], "HTTP_SESSION_SAVE_DELAY", 0.05)
+        path = tmp_path / ".toolmux_http.json"
+        cache = HttpSessionCache(path)
+        writers = []
+        flush = cache.flush
+        monkeypatch.setattr(cache, "flush", lambda: (writers.append(threading.current_thread()), flush()))
+
+        async def scenario():
+            for n in range(3):
+                cache.put("remote", "http://remote", {"endpoint": "/rpc", "n": n})
+            assert not path.exists()
+            await asyncio.sleep(0.2)
+        asyncio.run(scenario())
+        assert len(writers) == 1 and writers[0] is not threading.main_thread()
+        assert HttpSessionCache(path).get("remote", "http://remote")["n"] == 2
+
+    def test_expired_session_renegotiates(self):
+        server = _RpcOnlyServer()  # has never heard of s9
+
+        async def scenario():
+            client = self._client(server, {"endpoint": "/rpc", "session_id": "s9",
+                                           "protocol_version": "2024-11-05"})
+            try:
+                return await client.call_tool_async("t", {})
+            finally:
+                await client.aclose()
+        result = asyncio.run(scenario())
+        assert result["content"][0]["text"] == "ok"
+        assert [r[:2] for r in server.requests] == [
+            ("/rpc", "tools/call"), ("/mcp", "initialize"), ("/rpc", "initialize"),
+            ("/rpc", "notifications/initialized"), ("/rpc", "tools/call")]
+        assert server.requests[-1][2] == "s1"
+
+
+class _ToolsServer:
+    """Mock MCP server whose tools/list honours If-None-Match when it sends ETags."""
+
+    def __init__(self, etag=True):
+        self.etag = etag
+        self.tools = [{"name": "t", "inputSchema": {"type": "object"}}]
+        self.list_requests = []
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        if body["method"].startswith("notifications/"):
+            return httpx.Response(202)
+        if body["method"] == "initialize":
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": {
+                "protocolVersion": "2024-11-05", "capabilities": {}, "serverInfo": {}}})
+        self.list_requests.append(request.headers.get("If-None-Match"))
+        tag = f'"v{len(self.tools)}"'
+        if self.etag and request.headers.get("If-None-Match") == tag:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": tag} if self.etag else {}, json={
+            "jsonrpc": "2.0", "id": body["id"], "result": {"tools": self.tools}})
+
+
+class TestToolsRevalidation:
+    """tools/list is revalidated with a validator instead of re-downloaded."""
+
+    def _list(self, server, rounds, saved=None, change_after=None):
+        async def scenario():
+            client = HttpMcpClient("http://remote")
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+            if saved:
+                client.restore(saved)
+            try:
+                lists = []
+                for i in range(rounds):
+                    if i == change_after:
+                        server.tools = server.tools + [{"name": "u", "inputSchema": {}}]
+                    lists.append([t["name"] for t in await client.get_tools_async()])
+                return client, lists
+            finally:
+                await client.aclose()
+        return asyncio.run(scenario())
+
+    def test_etag_not_modified(self):
+        server = _ToolsServer()
+        client, lists = self._list(server, 3, change_after=2)
+        assert lists == [["t"], ["t"], ["t", "u"]]
+        assert server.list_requests == [None, '"v1"', '"v1"']
+        assert client.tools_revalidation == {"fetched": 2, "not_modified": 1, "unchanged": 0}
+        assert client.tools_validator == '"v2"'
+
+    def test_content_hash_without_etag(self):
+        server = _ToolsServer(etag=False)
+        client, lists = self._list(server, 3, change_after=2)
+        assert lists == [["t"], ["t"], ["t", "u"]]
+        assert client.tools_revalidation == {"fetched": 2, "not_modified": 0, "unchanged": 1}
+        assert client.tools_validator.startswith('W/"')
+
+    def test_warm_start_revalidates_saved_list(self):
+        server = _ToolsServer()
+        first, _ = self._list(server, 1)
+        saved = first.negotiated()
+        server.list_requests.clear()
+        client, lists = self._list(server, 1, saved=saved)
+        assert lists == [["t"]]
+        assert server.list_requests == ['"v1"']
+        assert client.tools_revalidation["not_modified"] == 1
+
+
+def _sse(*messages, event="message"):
+    return "".join(f"event: {event}\ndata: {json.dumps(m) if not isinstance(m, str) else m}\n\n"
+                   for m in messages).encode()
+
+
+class TestStreamingReplies:
+    """Streamable HTTP event-stream replies, legacy SSE transport, progress forwarding."""
+
+    def test_sse_decoder(self):
+        decoder = SseDecoder()
+        lines = [": keep-alive", "event: endpoint", "data: /messages?s=1", "",
+                 "data: {\"a\":", "data: 1}", "", ""]
+        events = [e for e in map(decoder.feed, lines) if e]
+        assert events == [("endpoint", "/messages?s=1"), ("message", '{"a":\n1}')]
+
+    def test_event_stream_reply_forwards_progress_first(self):
+        seen = []
+
+        async def stream(request_id):
+            yield _sse({"jsonrpc": "2.0", "method": "notifications/progress",
+                        "params": {"progressToken": request_id, "progress": 1, "total": 2}})
+            await asyncio.sleep(0.2)
+            seen.append("result sent")
+            yield _sse({"jsonrpc": "2.0", "id": request_id, "result": {
+                "content": [{"type": "text", "text": "done"}]}})
+
+        def handler(request):
+            body = json.loads(request.content)
+            assert "text/event-stream" in request.headers["Accept"]
+            return httpx.Response(200, headers={"Content-Type": "text/event-stream"},
+                                  content=stream(body["id"]))
+
+        async def scenario():
+            client = HttpMcpClient("http://remote")
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            client._initialized = True
+            try:
+                return await client.call_tool_async(
+                    "long", {}, progress=lambda p: seen.append(("progress", p["progress"])))
+            finally:
+                await client.aclose()
+        result = asyncio.run(scenario())
+        assert result["content"][0]["text"] == "done"
+        assert seen == [("progress", 1), "result sent"]
+
+    def test_legacy_sse_transport(self):
+        outbox: asyncio.Queue = asyncio.Queue()
+        posts = []
+
+        async def events():
+            yield _sse("/messages?session=abc", event="endpoint")
+            while True:
+                yield _sse(await outbox.get())
+
+        async def handler(request):
+            if request.method == "GET":
+                assert request.url.path == "/events"
+                return httpx.Response(200, headers={"Content-Type": "text/event-stream"},
+                                      content=events())
+            body = json.loads(request.content)
+            posts.append((str(request.url), body["method"]))
+            if "id" in body:
+                result = ({"protocolVersion": "2024-11-05", "capabilities": {}}
+                          if body["method"] == "initialize" else
+                          {"content": [{"type": "text", "text": "via sse"}]})
+                await outbox.put({"jsonrpc": "2.0", "id": body["id"], "result": result})
+            return httpx.Response(202)
+
+        async def scenario():
+            client = HttpMcpClient("http://remote", sse_endpoint="/events")
+            client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await client.call_tool_async("t", {})
+            finally:
+                await client.aclose()
+        result = asyncio.run(scenario())
+        assert result["content"][0]["text"] == "via sse"
+        assert posts == [("http://remote/messages?session=abc", "initialize"),
+                         ("http://remote/messages?session=abc", "notifications/initialized"),
+                         ("http://remote/messages?session=abc", "tools/call")]
+
+    def test_stdio_progress_reaches_caller(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config())
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            updates = []
+
+            async def call():
+                return await bm.call_tool_async("slow_tool", {"progress": 3, "tag": "p"},
+                                                progress=updates.append)
+            result = asyncio.run(call())
+            assert json.loads(result["content"][0]["text"])["tag"] == "p"
+            assert [(u["progress"], u["total"]) for u in updates] == [(1, 3), (2, 3), (3, 3)]
+        finally:
+            bm.shutdown()
+
+    def test_progress_relayed_to_mcp_client(self, concurrent_server_config):
+        bm = BackendManager(concurrent_server_config())
+        bm.initialize_all_async()
+        try:
+            bm.wait_for_tools(timeout=10)
+            mcp = FastMCP("test")
+            register_meta_tools(mcp, bm)
+            updates = []
+
+            async def on_progress(progress, total, message):
+                updates.append((progress, total))
+
+            async def call():
+                async with Client(mcp, progress_handler=on_progress) as client:
+                    await client.call_tool("invoke", {"name": "slow_tool",
+                                                      "args": {"progress": 2, "sleep": 0.2}})
+            asyncio.run(call())
+            assert updates == [(1, 2), (2, 2)]
+        finally:
+            bm.shutdown()
@@ -0,0 +1,284 @@
+"""Concurrency controls in BackendManager: admission limits, bounded queues, replicas, coalescing."""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastmcp import FastMCP
+
+from toolmux.main import (AdmissionGate, BackendManager, ReplicaPool, SingleFlight, MAX_BATCH_CALLS,
+                          register_manage_tool, run_batch)
+
+
+class TestAdmissionGate:
+
+    def test_unlimited_gate_never_queues(self):
+        async def scenario():
+            gate = AdmissionGate()
+            assert all([await gate.acquire() for _ in range(50)])
+            return gate.stats()
+        stats = asyncio.run(scenario())
+        assert stats["active"] == 50
+        assert stats["queued"] == 0
+
+    def test_fifo_order_and_queue_bound(self):
+        async def scenario():
+            gate = AdmissionGate(max_concurrency=1, max_queue=2)
+            order = []
+
+            async def worker(tag):
+                if not await gate.acquire():
+                    order.append(f"{tag}:shed")
+                    return
+                try:
+                    await asyncio.sleep(0.05)
+                    order.append(tag)
+                finally:
+                    gate.release()
+
+            await asyncio.gather(*(worker(t) for t in "abcd"))
+            return order, gate.stats()
+
+        order, stats = asyncio.run(scenario())
+        assert order == ["d:shed", "a", "b", "c"]
+        assert stats["rejected"] == 1
+        assert stats["peak_queue"] == 2
+        assert stats["active"] == 0
+        assert stats["max_wait_ms"] >= 50
+
+    def test_cancelled_waiter_leaves_queue(self):
+        async def scenario():
+            gate = AdmissionGate(max_concurrency=1, max_queue=5)
+            await gate.acquire()
+            waiter = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0.01)
+            assert gate.queued == 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            gate.release()
+            return gate.stats()
+        stats = asyncio.run(scenario())
+        assert stats["queued"] == 0
+        assert stats["active"] == 0
+
+
+class TestBackendAdmission:
+
+    def test_calls_beyond_limit_wait_then_shed(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(max_concurrency=2, max_queue=1))
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(bm.call_tool, "slow_tool", {"sleep": 0.5, "tag": str(i)})
+                       for i in range(4)]
+            results = [f.result(timeout=10) for f in futures]
+        elapsed = time.monotonic() - start
+        shed = [r for r in results if r.get("isError")]
+        assert len(shed) == 1
+        assert "overloaded" in shed[0]["content"][0]["text"]
+        # Two ran at once, the queued one ran after a slot freed
+        assert 0.9 < elapsed < 2.0
+        stats = bm.get_server_stats()["conc"]["load"]
+        assert stats["rejected"] == 1
+        assert stats["admitted"] == 3
+        assert stats["max_wait_ms"] > 300
+
+    def test_manage_servers_list_reports_load(self, started_backend, concurrent_server_config, tmp_path):
+        servers = concurrent_server_config(max_concurrency=3)
+        bm = started_backend(servers)
+        bm.call_tool("slow_tool", {})
+        mcp = FastMCP("test")
+        config = {"servers": servers}
+        register_manage_tool(mcp, tmp_path / "mcp.json", config, backend=bm)
+        result = asyncio.run(mcp.call_tool("manage_servers", {"action": "list"}))
+        entry = json.loads(result.content[0].text)["servers"][0]
+        assert entry["load"]["max_concurrency"] == 3
+        assert entry["load"]["admitted"] == 1
+
+
+def _pids(results):
+    return [json.loads(r["content"][0]["text"])["pid"] for r in results]
+
+
+class TestReplicaPool:
+
+    def test_tools_discovered_once_per_pool(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(replicas=3))
+        pool = bm.server_processes["conc"]
+        assert isinstance(pool, ReplicaPool)
+        assert len(pool.replicas) == 3
+        assert [t["name"] for t in bm.get_all_tools()] == ["slow_tool"]
+
+    def test_calls_spread_across_replicas(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(replicas=3))
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(
+                lambda i: bm.call_tool("slow_tool", {"sleep": 0.3, "pid": True}), range(6)))
+        assert len(set(_pids(results))) == 3
+        served = [r["served"] for r in bm.get_server_stats()["conc"]["replicas"]]
+        assert served == [2, 2, 2]
+
+    def test_sticky_tool_stays_on_one_replica(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(replicas=3, sticky_tools=["slow_tool"]))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(
+                lambda i: bm.call_tool("slow_tool", {"sleep": 0.1, "pid": True}), range(4)))
+        assert len(set(_pids(results))) == 1
+
+    def test_replicas_failing_the_handshake_are_closed(self, capsys):
+        class Replica:
+            def __init__(self, error=None):
+                self.error, self.closed = error, False
+                self.alive, self.in_flight, self.exit_reason = True, 0, None
+
+            async def initialize(self):
+                if self.error:
+                    raise self.error
+                return {"serverInfo": {"name": "ok"}}
+
+            async def close(self, timeout=5.0):
+                self.closed, self.alive = True, False
+
+        good, bad = Replica(), Replica(ConnectionError("handshake failed"))
+        pool = ReplicaPool("s", [bad, good])
+        assert asyncio.run(pool.initialize()) == {"serverInfo": {"name": "ok"}}
+        assert pool.replicas == [good] and bad.closed and not good.closed
+        assert len(pool.stats()) == 1
+        assert "1 of 2 replicas of s failed to initialize (handshake failed)" in capsys.readouterr().err
+        asyncio.run(ReplicaPool("s", [Replica(asyncio.TimeoutError()), Replica()]).initialize())
+        assert "(TimeoutError)" in capsys.readouterr().err  # no message: name the exception
+        with pytest.raises(ConnectionError, match="handshake failed"):
+            asyncio.run(ReplicaPool("s", [Replica(ConnectionError("handshake failed"))]).initialize())
+
+    def test_dead_replica_is_skipped(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(replicas=2, auto_restart=False))
+        bm.call_tool("slow_tool", {"exit": True})
+        results = [bm.call_tool("slow_tool", {"pid": True}) for _ in range(3)]
+        assert not any(r.get("isError") for r in results)
+        assert len(set(_pids(results))) == 1
+        assert bm.server_processes["conc"].alive
+
+
+class TestSingleFlight:
+    """Identical concurrent read-only calls share one backend request."""
+
+    def test_waiters_share_one_task(self):
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "done"
+
+        async def scenario():
+            flights = SingleFlight()
+            results = await asyncio.gather(*(flights.do("k", work) for _ in range(4)))
+            assert len(flights) == 0
+            return results
+        results = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert [r for r, _ in results] == ["done"] * 4
+        assert [shared for _, shared in results] == [False, True, True, True]
+
+    def test_work_cancelled_only_when_every_waiter_gives_up(self):
+        async def scenario():
+            flights = SingleFlight()
+            started = asyncio.Event()
+
+            async def work():
+                started.set()
+                await asyncio.sleep(0.3)
+                return "done"
+            first = asyncio.ensure_future(flights.do("k", work))
+            second = asyncio.ensure_future(flights.do("k", work))
+            await started.wait()
+            first.cancel()
+            assert (await second) == ("done", True)
+
+            third = asyncio.ensure_future(flights.do("k2", work))
+            await asyncio.sleep(0.05)
+            task = flights._flights["k2"][0]
+            third.cancel()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return task.cancelled()
+        assert asyncio.run(scenario()) is True
+
+    def test_identical_calls_hit_backend_once(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(coalesce_tools=["slow_tool"]))
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(bm.call_tool, "slow_tool", {"sleep": 0.5, "tag": "q"})
+                       for _ in range(5)]
+            results = [f.result(timeout=10) for f in futures]
+        assert all(r == results[0] for r in results)
+        stats = bm.get_server_stats()["conc"]
+        assert stats["load"]["admitted"] == 1
+        assert stats["coalesced"] == 4
+
+    def test_calls_not_marked_read_only_are_not_coalesced(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config())
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(bm.call_tool, "slow_tool", {"sleep": 0.3}) for _ in range(3)]
+            [f.result(timeout=10) for f in futures]
+        stats = bm.get_server_stats()["conc"]
+        assert stats["load"]["admitted"] == 3
+        assert stats["coalesced"] == 0
+
+    def test_coalescing_policy(self):
+        bm = BackendManager({"s": {"coalesce_tools": ["listed"], "cache_tools": {"cached": 5, "nope": False}},
+                             "off": {"coalesce": False, "coalesce_tools": ["*"]}})
+        bm.tool_cache = [{"name": "read", "_server": "s", "annotations": {"readOnlyHint": True}},
+                         {"name": "nope", "_server": "s", "annotations": {"readOnlyHint": True}}]
+        assert bm._coalescible("s", "listed")
+        assert bm._coalescible("s", "cached")
+        assert bm._coalescible("s", "read")
+        assert not bm._coalescible("s", "nope")
+        assert not bm._coalescible("s", "write")
+        assert not bm._coalescible("off", "anything")
+
+
+class TestRunBatch:
+    """invoke_batch runs calls concurrently and reports them in order."""
+
+    def test_calls_run_concurrently_in_order(self):
+        async def invoke_one(call):
+            await asyncio.sleep(call["args"]["sleep"])
+            if call["name"] == "bad":
+                raise RuntimeError("boom")
+            return call["name"], call["name"] != "soft_fail"
+
+        calls = [{"name": "slow", "args": {"sleep": 0.3}}, {"name": "fast", "args": {"sleep": 0.0}},
+                 {"name": "bad", "args": {"sleep": 0.1}}, {"name": "soft_fail", "args": {"sleep": 0.2}}]
+        start = time.monotonic()
+        batch = json.loads(asyncio.run(run_batch(calls, invoke_one)))
+        assert time.monotonic() - start < 0.55
+        assert [r["name"] for r in batch["results"]] == ["slow", "fast", "bad", "soft_fail"]
+        assert batch["results"][0] == {"index": 0, "name": "slow", "ok": True, "result": "slow",
+                                       "elapsed_ms": batch["results"][0]["elapsed_ms"]}
+        assert batch["results"][2]["error"] == "Error: boom"
+        assert batch["results"][3] == {"index": 3, "name": "soft_fail", "ok": False, "error": "soft_fail",
+                                       "elapsed_ms": batch["results"][3]["elapsed_ms"]}
+        assert batch["succeeded"] == 2 and batch["failed"] == 2
+
+    def test_invalid_batches(self):
+        async def invoke_one(call):
+            return "x", True
+        assert "error" in json.loads(asyncio.run(run_batch([], invoke_one)))
+        too_many = [{"name": "t"}] * (MAX_BATCH_CALLS + 1)
+        assert "Too many" in json.loads(asyncio.run(run_batch(too_many, invoke_one)))["error"]
+        batch = json.loads(asyncio.run(run_batch([{"args": {}}, {"name": "t", "args": [1]}], invoke_one)))
+        assert [r["ok"] for r in batch["results"]] == [False, False]
+
+    def test_batch_respects_admission_limits(self, started_backend, concurrent_server_config):
+        bm = started_backend(concurrent_server_config(max_concurrency=2))
+
+        async def invoke_one(call):
+            result = await bm.call_tool_async(call["name"], call["args"])
+            return result["content"][0]["text"], True
+        calls = [{"name": "slow_tool", "args": {"sleep": 0.3, "tag": str(i)}} for i in range(4)]
+        start = time.monotonic()
+        batch = json.loads(asyncio.run(run_batch(calls, invoke_one)))
+        elapsed = time.monotonic() - start
+        assert batch["succeeded"] == 4
+        assert 0.55 < elapsed < 1.2  # two waves of two
+        assert bm.get_server_stats()["conc"]["load"]["peak_queue"] == 2
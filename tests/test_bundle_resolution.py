@@ -7,7 +7,7 @@ files when commands are missing or incorrect.
 
 import json
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
@@ -202,12 +202,12 @@ class TestBundleFallbackBehavior:
         with patch("pathlib.Path.home", return_value=home), \
              patch("shutil.which") as mock_which:
             mock_which.side_effect = lambda cmd: "/usr/bin/real-cmd" if cmd == "real-cmd" else None
-            with patch("subprocess.Popen") as mock_popen:
-                mock_popen.return_value = MagicMock()
+            with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_spawn:
+                mock_spawn.return_value = MagicMock()
                 result = bm.start_server("broken-mcp")
 
             assert result is not None
-            call_args = mock_popen.call_args[0][0]
+            call_args = mock_spawn.call_args[0]
             assert call_args[0] == "real-cmd"
             assert "--flag" in call_args
 
@@ -225,12 +225,12 @@ class TestBundleFallbackBehavior:
         with patch("pathlib.Path.home", return_value=home), \
              patch("shutil.which") as mock_which:
             mock_which.side_effect = lambda cmd: f"/usr/bin/{cmd}" if cmd == "claude-server" else None
-            with patch("subprocess.Popen") as mock_popen:
-                mock_popen.return_value = MagicMock()
+            with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_spawn:
+                mock_spawn.return_value = MagicMock()
                 result = bm.start_server("claude-mcp")
 
             assert result is not None
-            call_args = mock_popen.call_args[0][0]
+            call_args = mock_spawn.call_args[0]
             assert call_args[0] == "claude-server"
 
     def test_no_bundle_no_fallback(self, tmp_path):
@@ -8,6 +8,7 @@ from pathlib import Path
 
 from toolmux.main import (
     VERSION, load_build_cache, compute_config_hash,
+    _auto_generate_cache, _cached_tools, _store_cache_tool_specs,
 )
 
 TOOLMUX_DIR = Path(__file__).parent.parent
@@ -146,3 +147,29 @@ class TestBuildCache:
         h2 = compute_config_hash(p)
         assert h1 == h2
         assert h1.startswith("sha256:")
+
+    def test_cache_stores_tool_specs_for_lazy_mode(self, tmp_path):
+        p = tmp_path / "mcp.json"
+        p.write_text('{"servers": {"fs": {}}}')
+        live = [{"name": "read", "description": "Read a file from disk.", "_server": "fs",
+                 "_transport": "stdio",
+                 "inputSchema": {"type": "object", "properties": {"path": {"type": "string"}}}}]
+        _auto_generate_cache(p, live)
+        cache = json.loads((tmp_path / ".toolmux_cache.json").read_text())
+        assert _cached_tools(cache, {"fs": {}}) == live
+
+    def test_old_cache_gains_specs_without_losing_descriptions(self, tmp_path):
+        p = tmp_path / "mcp.json"
+        p.write_text('{"servers": {"fs": {}}}')
+        (tmp_path / ".toolmux_cache.json").write_text(json.dumps({
+            "config_hash": compute_config_hash(p), "model": "agent-generated",
+            "servers": {"fs": {"tool_count": 1, "descriptions": {"read": "Custom"}}}}))
+        assert _cached_tools(json.loads((tmp_path / ".toolmux_cache.json").read_text()),
+                             {"fs": {}}) == []
+        _store_cache_tool_specs(p, [{"name": "read", "description": "Read.", "_server": "fs",
+                                     "inputSchema": {"type": "object"},
+                                     "annotations": {"readOnlyHint": True}}])
+        cache = json.loads((tmp_path / ".toolmux_cache.json").read_text())
+        assert cache["servers"]["fs"]["descriptions"] == {"read": "Custom"}
+        assert cache["servers"]["fs"]["tools"][0]["name"] == "read"
+        assert cache["servers"]["fs"]["tools"][0]["annotations"] == {"readOnlyHint": True}
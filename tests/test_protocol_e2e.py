@@ -2,6 +2,7 @@
 import json
 import subprocess
 import sys
+import time
 import pytest
 from conftest import start_toolmux, init_toolmux, send_jsonrpc
 from toolmux.main import VERSION
@@ -126,6 +127,24 @@ class TestMetaModeE2E:
         finally:
             proc.terminate(); proc.wait(timeout=5)
 
+    def test_invoke_batch(self, test_config):
+        proc = start_toolmux(mode="meta", config_path=test_config(mode="meta"))
+        try:
+            init_toolmux(proc)
+            resp = send_jsonrpc(proc, "tools/call", {"name": "invoke_batch", "arguments": {"calls": [
+                {"name": "echo_tool", "args": {"message": "one"}},
+                {"name": "reverse_tool", "args": {"text": "abc"}},
+                {"name": "no_such_tool"}]}}, req_id=3)
+            batch = json.loads(resp["result"]["content"][0]["text"])
+            assert [r["name"] for r in batch["results"]] == ["echo_tool", "reverse_tool", "no_such_tool"]
+            assert "one" in batch["results"][0]["result"]
+            assert "cba" in batch["results"][1]["result"]
+            assert batch["results"][2]["ok"] is False
+            assert batch["succeeded"] == 2 and batch["failed"] == 1
+            assert all("elapsed_ms" in r for r in batch["results"])
+        finally:
+            proc.terminate(); proc.wait(timeout=5)
+
 
 class TestGatewayModeE2E:
     """End-to-end gateway mode: server-tool routing + native tools."""
@@ -168,6 +187,54 @@ class TestGatewayModeE2E:
         finally:
             proc.terminate(); proc.wait(timeout=5)
 
+    def test_invoke_batch_with_server(self, test_config):
+        proc = start_toolmux(mode="gateway", config_path=test_config(mode="gateway"))
+        try:
+            init_toolmux(proc)
+            resp = send_jsonrpc(proc, "tools/call", {"name": "invoke_batch", "arguments": {"calls": [
+                {"name": "echo_tool", "server": "echo", "args": {"message": "a"}},
+                {"name": "echo_tool", "args": {"message": "b"}}]}}, req_id=3)
+            batch = json.loads(resp["result"]["content"][0]["text"])
+            assert batch["succeeded"] == 2
+            assert "a" in batch["results"][0]["result"] and "b" in batch["results"][1]["result"]
+        finally:
+            proc.terminate(); proc.wait(timeout=5)
+
+    def test_lazy_mode_starts_backend_on_first_call(self, tmp_path, echo_server_path):
+        config_path = tmp_path / "mcp.json"
+        config_path.write_text(json.dumps({"lazy": True, "servers": {
+            "echo": {"command": sys.executable, "args": [echo_server_path]}}}))
+        cache_file = tmp_path / ".toolmux_cache.json"
+        # First start has no cache: every backend starts and the cache is written
+        proc = start_toolmux(mode="gateway", config_path=config_path)
+        try:
+            init_toolmux(proc)
+            for _ in range(50):
+                if cache_file.exists():
+                    break
+                time.sleep(0.1)
+        finally:
+            proc.terminate(); proc.wait(timeout=5)
+        assert "tools" in json.loads(cache_file.read_text())["servers"]["echo"]
+
+        proc = start_toolmux(mode="gateway", config_path=config_path)
+        try:
+            init_toolmux(proc)
+            resp = send_jsonrpc(proc, "tools/call",
+                {"name": "manage_servers", "arguments": {"action": "list"}}, req_id=2)
+            entry = json.loads(resp["result"]["content"][0]["text"])["servers"][0]
+            assert entry["running"] is False
+            resp = send_jsonrpc(proc, "tools/call", {
+                "name": "echo",
+                "arguments": {"tool": "echo_tool", "arguments": {"message": "lazy"}}}, req_id=3)
+            assert "lazy" in resp["result"]["content"][0]["text"]
+            resp = send_jsonrpc(proc, "tools/call",
+                {"name": "manage_servers", "arguments": {"action": "list"}}, req_id=4)
+            entry = json.loads(resp["result"]["content"][0]["text"])["servers"][0]
+            assert entry["running"] is True
+        finally:
+            proc.terminate(); proc.wait(timeout=5)
+
 
 class TestProxyModeE2E:
     """End-to-end proxy mode: direct tool calls."""
@@ -182,3 +249,21 @@ class TestProxyModeE2E:
             assert "echo_tool" in names
         finally:
             proc.terminate(); proc.wait(timeout=5)
+
+    def test_invoke_batch(self, test_config):
+        proc = start_toolmux(mode="proxy", config_path=test_config(mode="proxy"))
+        try:
+            init_toolmux(proc)
+            resp = send_jsonrpc(proc, "tools/call", {"name": "invoke_batch", "arguments": {"calls": [
+                {"name": "echo_tool", "args": {"message": "direct"}},
+                {"name": "invoke_batch", "args": {}},
+                {"name": "echo_tool", "args": {"message": "bad", "fail": True}}]}}, req_id=3)
+            batch = json.loads(resp["result"]["content"][0]["text"])
+            assert "direct" in batch["results"][0]["result"]
+            assert batch["results"][1] == {"index": 1, "name": "invoke_batch", "ok": False,
+                                           "error": "invoke_batch cannot be nested",
+                                           "elapsed_ms": batch["results"][1]["elapsed_ms"]}
+            assert batch["results"][2]["ok"] is False and "bad" in batch["results"][2]["error"]
+            assert (batch["succeeded"], batch["failed"]) == (1, 2)
+        finally:
+            proc.terminate(); proc.wait(timeout=5)
@@ -5,9 +5,10 @@ from hypothesis import given, settings, assume
 from hypothesis import strategies as st
 
 from toolmux.main import (
-    condense_description, condense_schema, resolve_collisions,
+    condense_description, condense_schema, condense_output, resolve_collisions,
     enrich_result, enrich_error_result, build_gateway_description,
     build_gateway_instructions, FILLER_PHRASES,
+    json_dumps, json_dumpb, json_loads, _load_json_codec,
 )
 from conftest import tool_dict
 
@@ -131,6 +132,39 @@ class TestCondenseSchema:
             "type": "array", "items": {"type": "string"}}
 
 
+# ═══════════════════════════════════════════════════════════
+# condense_output
+# ═══════════════════════════════════════════════════════════
+
+class TestCondenseOutput:
+    """Output condensation keeps the content and marks anything it cuts."""
+
+    @given(data=st.recursive(
+        st.none() | st.booleans() | st.integers() | st.text(max_size=20),
+        lambda children: st.lists(children, max_size=4)
+        | st.dictionaries(st.text(max_size=8), children, max_size=4), max_leaves=20))
+    @settings(max_examples=100)
+    def test_minified_json_is_equivalent(self, data):
+        pretty = json.dumps(data, indent=2)
+        assert json.loads(condense_output(pretty, {})) == data
+
+    def test_big_integers_survive_minification(self):
+        assert condense_output('{"id": 10000000000000000000001}', {}) == '{"id":10000000000000000000001}'
+
+    def test_whitespace_and_ansi(self):
+        text = "\x1b[1;32mPASS\x1b[0m  \n\n\n\n    indented\t\n"
+        assert condense_output(text, {}) == "PASS\n\n    indented"
+        assert condense_output(text, {"strip_ansi": False, "collapse_whitespace": False}) == text
+
+    def test_strip_patterns_and_truncation_marker(self):
+        text = "Generated by tool v1.2\nresult line\n" + "x" * 100
+        out = condense_output(text, {"strip": [r"^Generated by.*\n"], "max_chars": 20})
+        assert out == "result line\nxxxxxxxx\n[... truncated: showing 20 of 112 characters]"
+
+    def test_non_json_braces_left_alone(self):
+        assert condense_output("{not json}  ", {}) == "{not json}"
+
+
 # ═══════════════════════════════════════════════════════════
 # resolve_collisions — Property 4
 # ═══════════════════════════════════════════════════════════
@@ -257,3 +291,36 @@ class TestBuildGatewayInstructions:
         assert "get_tool_count" in result
         assert "tool=" in result
         assert "arguments=" in result
+
+
+# ═══════════════════════════════════════════════════════════
+# JSON codec — every available backend round-trips the same data
+# ═══════════════════════════════════════════════════════════
+
+class TestJsonCodec:
+
+    @pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+    def test_codec_roundtrip(self, name):
+        codec_name, dumps, dumpb, loads = _load_json_codec(name)
+        if codec_name != name:
+            pytest.skip(f"{name} not installed")
+        data = {"name": "tool", "args": [1, 2.5, None, True], "text": "héllo ✓"}
+        assert loads(dumpb(data)) == data
+        assert loads(dumps(data)) == data
+        assert loads(bytearray(dumpb(data))) == data
+        assert "\n  " in dumps(data, indent=2)
+        with pytest.raises(ValueError):
+            loads(b"not json")
+
+    def test_unsupported_types_fall_back_to_stdlib(self):
+        big = {"n": 2 ** 70}
+        assert json.loads(json_dumps(big)) == big
+        assert json.loads(json_dumpb(big)) == big
+
+    @given(data=st.recursive(
+        st.none() | st.booleans() | st.integers(-2 ** 63, 2 ** 63 - 1) | st.text(),
+        lambda children: st.lists(children) | st.dictionaries(st.text(), children),
+        max_leaves=20))
+    @settings(max_examples=100)
+    def test_matches_stdlib(self, data):
+        assert json_loads(json_dumps(data)) == json.loads(json.dumps(data))
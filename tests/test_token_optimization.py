@@ -9,7 +9,7 @@ import pytest
 from toolmux.main import (
     condense_description, condense_schema, resolve_collisions,
     build_gateway_description, build_gateway_instructions,
-    BackendManager,
+    BackendManager, ResultCondenser,
 )
 from conftest import tool_dict
 
@@ -141,6 +141,21 @@ REALISTIC_TOOLS = [
 ]
 
 
+# Typical tool outputs: pretty-printed JSON, terminal logs, boilerplate-heavy text
+REALISTIC_OUTPUTS = {
+    "list_directory": json.dumps([{"name": f"src/module_{i}.py", "type": "file", "size": 1200 + i,
+                                   "modified": "2026-10-01T12:00:00Z"} for i in range(40)], indent=2),
+    "search_issues": json.dumps({"total_count": 3, "items": [
+        {"number": n, "title": f"Crash when opening file {n}", "state": "open",
+         "labels": [{"name": "bug", "color": "d73a4a", "default": True}],
+         "user": {"login": "octocat", "type": "User", "site_admin": False}}
+        for n in range(3)]}, indent=4),
+    "run_tests": "\n".join(f"\x1b[32mPASSED\x1b[0m tests/test_mod.py::test_case_{i}    \n"
+                           for i in range(30)) + "\n\n\n\x1b[1m30 passed\x1b[0m\n",
+    "fetch_page": "Skip to main content\nCookie settings\n\n\n\n" + "Article body text. " * 40,
+}
+
+
 def raw_tools_tokens(tools):
     """Calculate tokens for raw tool schemas (no condensation)."""
     total = 0
@@ -322,3 +337,24 @@ class TestTokenOptimization:
         print(f"  {'Meta':12} {meta:>8} {(1-meta/raw)*100:>9.1f}% {'93-99%':>12}")
         print(f"  {'Gateway':12} {gateway:>8} {(1-gateway/raw)*100:>9.1f}% {'85-93%':>12}")
         print(f"  {'Proxy':12} {proxy:>8} {(1-proxy/raw)*100:>9.1f}% {'55-75%':>12}")
+
+    def test_result_condensation_savings(self):
+        """Tool output condensation: bytes and tokens saved per tool."""
+        condenser = ResultCondenser({"strip": [r"^(Skip to main content|Cookie settings)\n"]})
+        print(f"\n{'='*60}")
+        print(f"RESULT CONDENSATION")
+        print(f"{'='*60}")
+        for tool, text in REALISTIC_OUTPUTS.items():
+            result = {"content": [{"type": "text", "text": text}]}
+            out = condenser.apply("srv", tool, result, condenser.rules({}, tool))
+            assert out["content"][0]["text"] != text
+        report = condenser.stats("srv")
+        for tool, stats in report.items():
+            print(f"  {tool:20s}: {stats['bytes_in']:>6} → {stats['bytes_out']:>6} bytes "
+                  f"({stats['saved_pct']:4.1f}% saved)")
+            assert stats["bytes_out"] < stats["bytes_in"]
+        before = sum(s["bytes_in"] for s in report.values())
+        after = sum(s["bytes_out"] for s in report.values())
+        savings = (1 - after / before) * 100
+        print(f"  Total:               {before:>6} → {after:>6} bytes ({savings:4.1f}% saved)")
+        assert savings > 25, f"Result condensation savings {savings:.1f}% below minimum"
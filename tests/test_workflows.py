@@ -0,0 +1,182 @@
+"""Saved workflows: validation, reference substitution, DAG execution, native tools."""
+import asyncio
+import json
+import time
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.exceptions import ValidationError
+
+from toolmux.main import (BackendManager, register_workflow_tools, run_workflow,
+                          validate_workflow, workflow_dependencies, _substitute)
+
+
+def _result(value):
+    text = value if isinstance(value, str) else json.dumps(value)
+    return {"content": [{"type": "text", "text": text}]}
+
+
+class TestWorkflowDefinition:
+
+    def test_valid_workflow(self):
+        assert validate_workflow("wf", {"steps": [
+            {"id": "a", "tool": "read", "args": {"path": "${params.p}"}},
+            {"id": "b", "tool": "read", "args": {"path": "${a.next}"}}]}) == []
+
+    def test_dependencies_from_references_and_after(self):
+        step = {"tool": "t", "args": {"x": "${a.items[0].path}", "y": ["pre-${b}", "${params.q}"]},
+                "after": ["c"]}
+        assert workflow_dependencies(step) == {"a", "b", "c"}
+
+    @pytest.mark.parametrize("definition,problem", [
+        ({"steps": []}, "non-empty"),
+        ({"steps": [{"id": "a"}]}, "needs a 'tool'"),
+        ({"steps": [{"id": "a", "tool": "t"}, {"id": "a", "tool": "t"}]}, "duplicate"),
+        ({"steps": [{"id": "a", "tool": "t", "args": {"x": "${nope.y}"}}]}, "unknown step 'nope'"),
+        ({"steps": [{"id": "a", "tool": "t", "after": ["b"]},
+                    {"id": "b", "tool": "t", "args": {"x": "${a}"}}]}, "cycle"),
+        ({"params": {"a-b": {}}, "steps": [{"tool": "t"}]}, "valid identifier"),
+        ({"params": {"n": {"type": "int"}}, "steps": [{"tool": "t"}]}, "unknown type 'int'"),
+    ])
+    def test_invalid_workflows(self, definition, problem):
+        errors = validate_workflow("wf", definition)
+        assert any(problem in e for e in errors), errors
+
+    def test_invalid_name(self):
+        assert validate_workflow("has space", {"steps": [{"tool": "t"}]})
+
+    def test_substitution(self):
+        scope = {"params": {"n": 3}, "a": {"items": [{"path": "/x"}]}}
+        assert _substitute({"whole": "${a.items}", "n": "${params.n}"}, scope) == {
+            "whole": [{"path": "/x"}], "n": 3}
+        assert _substitute("dir=${a.items[0].path} n=${params.n}", scope) == "dir=/x n=3"
+        with pytest.raises(ValueError, match="not found"):
+            _substitute("${a.items[5]}", scope)
+
+
+class TestRunWorkflow:
+
+    def test_independent_steps_run_in_parallel(self):
+        async def call(tool, args, server):
+            await asyncio.sleep(0.2)
+            return _result({"tool": tool, **args})
+
+        definition = {"steps": [
+            {"id": "a", "tool": "left", "args": {"v": "${params.v}"}},
+            {"id": "b", "tool": "right", "args": {"v": 2}},
+            {"id": "c", "tool": "join", "args": {"l": "${a.v}", "r": "${b.v}"}}]}
+        start = time.monotonic()
+        report = asyncio.run(run_workflow(definition, {"v": 1}, call))
+        assert time.monotonic() - start < 0.55
+        assert report["output"] == {"tool": "join", "l": 1, "r": 2}
+        assert all(s["ok"] for s in report["steps"].values())
+
+    def test_output_template_and_text_results(self):
+        async def call(tool, args, server):
+            return _result(f"plain {args['n']}")
+
+        definition = {"steps": [{"id": "a", "tool": "t", "args": {"n": 1}},
+                                {"id": "b", "tool": "t", "args": {"n": 2}}],
+                      "output": {"first": "${a}", "both": "${a} / ${b}"}}
+        report = asyncio.run(run_workflow(definition, {}, call))
+        assert report["output"] == {"first": "plain 1", "both": "plain 1 / plain 2"}
+
+    def test_failing_step_stops_the_workflow(self):
+        calls = []
+
+        async def call(tool, args, server):
+            calls.append(tool)
+            if tool == "bad":
+                return {"content": [{"type": "text", "text": "Error: nope"}], "isError": True}
+            await asyncio.sleep(0.5 if tool == "slow" else 0)
+            return _result("ok")
+
+        definition = {"steps": [{"id": "bad", "tool": "bad"},
+                                {"id": "slow", "tool": "slow"},
+                                {"id": "after_bad", "tool": "next", "after": ["bad"]}]}
+        start = time.monotonic()
+        report = asyncio.run(run_workflow(definition, {}, call))
+        assert time.monotonic() - start < 0.4
+        assert "step 'bad' (bad) failed: Error: nope" == report["error"]
+        assert "next" not in calls
+        assert report["steps"]["slow"]["ok"] is False
+
+
+class TestWorkflowTools:
+
+    def _setup(self, concurrent_server_config, tmp_path, workflows=None):
+        servers = concurrent_server_config()
+        bm = BackendManager(servers)
+        bm.initialize_all_async()
+        bm.wait_for_tools(timeout=10)
+        config = {"servers": servers, "workflows": workflows or {}}
+        config_path = tmp_path / "mcp.json"
+        config_path.write_text(json.dumps(config))
+        mcp = FastMCP("test")
+        register_workflow_tools(mcp, bm, config, config_path)
+        return bm, mcp, config_path
+
+    def _call(self, mcp, name, args):
+        result = asyncio.run(mcp.call_tool(name, args))
+        return json.loads(result.content[0].text)
+
+    def test_configured_workflow_is_a_tool(self, concurrent_server_config, tmp_path):
+        workflows = {"tag_twice": {
+            "description": "Echo a tag, then echo it again with a suffix.",
+            "params": {"t": {"type": "string", "description": "Tag to echo."}},
+            "steps": [{"id": "a", "tool": "slow_tool", "args": {"tag": "${params.t}"}},
+                      {"id": "b", "tool": "slow_tool", "args": {"tag": "${a.tag}-2"}}]}}
+        bm, mcp, _ = self._setup(concurrent_server_config, tmp_path, workflows)
+        try:
+            tools = {t.name: t for t in asyncio.run(mcp.list_tools())}
+            assert {"tag_twice", "manage_workflows"} <= tools.keys()
+            schema = tools["tag_twice"].parameters
+            assert schema["properties"] == {"t": {"type": "string", "description": "Tag to echo."}}
+            assert schema["required"] == ["t"]
+            report = self._call(mcp, "tag_twice", {"t": "x"})
+            assert report["output"] == {"tag": "x-2"}
+            with pytest.raises(ValidationError):
+                asyncio.run(mcp.call_tool("tag_twice", {}))
+        finally:
+            bm.shutdown()
+
+    def test_save_run_and_remove_at_runtime(self, concurrent_server_config, tmp_path):
+        bm, mcp, config_path = self._setup(concurrent_server_config, tmp_path)
+        try:
+            definition = {"params": {"t": {"type": "string", "default": "d"}},
+                          "steps": [{"id": "a", "tool": "slow_tool", "args": {"tag": "${params.t}"}}]}
+            saved = self._call(mcp, "manage_workflows",
+                               {"action": "save", "name": "one", "definition": definition})
+            assert saved["status"] == "saved"
+            assert json.loads(config_path.read_text())["workflows"]["one"] == definition
+            assert self._call(mcp, "one", {})["output"] == {"tag": "d"}
+            ran = self._call(mcp, "manage_workflows",
+                             {"action": "run", "name": "one", "arguments": {"t": "r"}})
+            assert ran["output"] == {"tag": "r"}
+
+            bad = self._call(mcp, "manage_workflows", {"action": "save", "name": "conc",
+                                                       "definition": definition})
+            assert "clashes" in bad["problems"][0]
+
+            self._call(mcp, "manage_workflows", {"action": "remove", "name": "one"})
+            assert "one" not in {t.name for t in asyncio.run(mcp.list_tools())}
+            assert json.loads(config_path.read_text())["workflows"] == {}
+        finally:
+            bm.shutdown()
+
+    def test_workflow_shadowing_a_lazily_discovered_tool_is_disabled(self, concurrent_server_config,
+                                                                     tmp_path, capsys):
+        servers = concurrent_server_config()
+        bm = BackendManager(servers, lazy=True)
+        config = {"servers": servers, "workflows": {"slow_tool": {
+            "steps": [{"id": "a", "tool": "slow_tool", "server": "conc", "args": {"tag": "wf"}}]}}}
+        mcp = FastMCP("test")
+        register_workflow_tools(mcp, bm, config, tmp_path / "mcp.json")
+        try:
+            assert "slow_tool" in {t.name for t in asyncio.run(mcp.list_tools())}  # not known yet
+            bm.call_tool("slow_tool", {}, server="conc")  # first call starts conc and lists its tools
+            assert "clashes" in self._call(mcp, "slow_tool", {})["error"]
+            assert "disabling workflow slow_tool" in capsys.readouterr().err
+            assert "slow_tool" not in {t.name for t in asyncio.run(mcp.list_tools())}
+        finally:
+            bm.shutdown()
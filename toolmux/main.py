@@ -4,22 +4,32 @@ ToolMux v2.0 - MCP server aggregation with FastMCP foundation
 Three operating modes: meta, proxy, gateway (default)
 Smart description/schema condensation, progressive disclosure, parallel init
 """
+import asyncio
+import itertools
 import json
 import sys
-import subprocess
 import os
 import re
 import argparse
+import functools
+import gzip
 import hashlib
+import inspect
+import keyword
+import mmap
+import random
 import shutil
+import tempfile
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set
+from typing import Awaitable, Callable, Deque, Dict, Any, List, Optional, Set, Tuple
 
 import httpx
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from fastmcp.server import create_proxy
 from fastmcp.server.transforms import Transform
 from fastmcp.tools import Tool
@@ -36,6 +46,81 @@ def _is_client_disconnect(exc: BaseException) -> bool:
         return all(_is_client_disconnect(e) for e in exc.exceptions)
     return False
 
+
+# ─── JSON Codec ───
+# Hot-path (de)serialization goes through json_dumps/json_dumpb/json_loads,
+# which use orjson or msgspec when installed and the stdlib otherwise.
+# TOOLMUX_JSON=orjson|msgspec|json forces a backend. Any ``indent`` means
+# two-space indentation (the only width orjson supports).
+
+def _stdlib_codec():
+    def dumps(obj: Any, indent: Optional[int] = None) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+    return "json", dumps, lambda obj, indent=None: dumps(obj, indent).encode(), json.loads
+
+
+def _orjson_codec():
+    import orjson
+
+    def dumpb(obj: Any, indent: Optional[int] = None) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return "orjson", lambda obj, indent=None: dumpb(obj, indent).decode(), dumpb, orjson.loads
+
+
+def _msgspec_codec():
+    import msgspec
+    encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+
+    def dumpb(obj: Any, indent: Optional[int] = None) -> bytes:
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return "msgspec", lambda obj, indent=None: dumpb(obj, indent).decode(), dumpb, loads
+
+
+def _load_json_codec(preferred: Optional[str] = None):
+    """Pick the fastest available codec, or ``preferred`` if it is installed."""
+    factories = {"orjson": _orjson_codec, "msgspec": _msgspec_codec, "json": _stdlib_codec}
+    order = [preferred] if preferred in factories else []
+    for name in order + ["orjson", "msgspec", "json"]:
+        try:
+            return factories[name]()
+        except ImportError:
+            continue
+    return _stdlib_codec()
+
+
+_, _stdlib_dumps, _stdlib_dumpb, _ = _stdlib_codec()
+JSON_CODEC, _fast_dumps, _fast_dumpb, _fast_loads = _load_json_codec(os.environ.get("TOOLMUX_JSON"))
+
+
+def json_dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """Serialize to str; falls back to stdlib json for types the fast codec rejects."""
+    try:
+        return _fast_dumps(obj, indent)
+    except TypeError:
+        return _stdlib_dumps(obj, indent)
+
+
+def json_dumpb(obj: Any, indent: Optional[int] = None) -> bytes:
+    """Serialize to UTF-8 bytes (wire format for stdio and HTTP backends)."""
+    try:
+        return _fast_dumpb(obj, indent)
+    except TypeError:
+        return _stdlib_dumpb(obj, indent)
+
+
+def json_loads(data: Any) -> Any:
+    """Parse str, bytes or bytearray. Raises ValueError on malformed input."""
+    return _fast_loads(data)
+
+
 # ─── Filler phrases to remove from descriptions ───
 FILLER_PHRASES = [
     "Only works within allowed directories",
@@ -72,8 +157,10 @@ Available tools:
   - catalog_tools() — list all backend tools with name, server, and description
   - get_tool_schema(name="tool_name") — get full parameter details for a tool
   - invoke(name="tool_name", args={{...}}) — execute a backend tool
+  - invoke_batch(calls=[{{"name": ..., "args": {{...}}}}, ...]) — run several tools concurrently in one call
   - get_tool_count() — get tool count statistics by server
   - manage_servers(action="list|add|remove|validate|test") — manage backend MCP servers
+  - manage_workflows(action="list|show|save|remove|run") — saved multi-step workflows that run in one call
   - optimize_descriptions(action="generate|save|status") — improve tool descriptions using your intelligence
 
 Workflow:
@@ -92,6 +179,7 @@ All backend tools are exposed directly. Call any tool directly: tool_name(param=
 Helper tools:
   - list_all_tools() — MUST call first. Lists all tools with full descriptions grouped by server.
   - get_tool_schema(name="tool_name") — get full parameter details for a tool
+  - invoke_batch(calls=[{{"name": ..., "args": {{...}}}}, ...]) — run several tools concurrently in one call
   - get_tool_count() — get tool count statistics by server
   - manage_servers(action="list|add|remove|validate|test") — manage backend MCP servers{optimization_hint}"""
 
@@ -202,6 +290,41 @@ class CondenseTransform(Transform):
         return result
 
 
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def condense_output(text: str, rules: Dict[str, Any]) -> str:
+    """Shrink tool output text without changing what it says.
+
+    Stages, in order: drop terminal escape codes (``strip_ansi``) and any
+    ``strip`` regex matches, minify JSON output (``minify_json``) or else
+    trim trailing spaces and blank-line runs (``collapse_whitespace``), then
+    cut to ``max_chars`` with an explicit marker. Indentation inside lines is
+    kept, since it is meaningful in code and tables.
+    """
+    if rules.get("strip_ansi", True):
+        text = _ANSI_ESCAPE.sub("", text)
+    for pattern in rules.get("strip", ()):
+        text = re.sub(pattern, "", text, flags=re.MULTILINE)
+    minified = False
+    if rules.get("minify_json", True) and text.lstrip()[:1] in ("{", "["):
+        try:
+            # stdlib on purpose: the fast codecs turn integers past 64 bits into floats
+            text = json.dumps(json.loads(text), separators=(",", ":"), ensure_ascii=False)
+            minified = True
+        except ValueError:
+            pass
+    if rules.get("collapse_whitespace", True) and not minified:
+        text = _BLANK_LINES.sub("\n\n", _TRAILING_SPACE.sub("", text)).strip()
+    max_chars = rules.get("max_chars")
+    if max_chars and len(text) > max_chars:
+        text = (f"{text[:max_chars]}\n[... truncated: showing {max_chars:,} of "
+                f"{len(text):,} characters]")
+    return text
+
+
 def resolve_collisions(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Prefix duplicate tool names with server name. If still colliding, append index."""
     name_counts: Dict[str, int] = {}
@@ -234,7 +357,7 @@ def _extract_text(result: Dict[str, Any]) -> str:
     if isinstance(content, list):
         parts = [c.get("text", "") for c in content if isinstance(c, dict)]
         return "\n".join(parts)
-    return json.dumps(result)
+    return json_dumps(result)
 
 
 def _build_enrichment_text(tool_name: str, tool_cache: List[Dict[str, Any]],
@@ -245,7 +368,7 @@ def _build_enrichment_text(tool_name: str, tool_cache: List[Dict[str, Any]],
             parts = [f"\n[Tool: {tool_name}]"]
             if include_desc:
                 parts.append(f"[Description: {tool.get('description', '')}]")
-            parts.append(f"[Parameters: {json.dumps(tool.get('inputSchema', {}))}]")
+            parts.append(f"[Parameters: {json_dumps(tool.get('inputSchema', {}))}]")
             return "\n".join(parts)
     return ""
 
@@ -266,6 +389,42 @@ def enrich_result(
     return text
 
 
+def _progress_relay(ctx: Optional[Context]) -> Optional["ProgressCallback"]:
+    """Forward a backend's progress notifications to the MCP client, if it asked for progress."""
+    request = ctx.request_context if ctx is not None else None
+    token = (request.meta or {}).get("progressToken") if request is not None else None
+    if token is None:
+        return None
+    loop = asyncio.get_running_loop()
+
+    def relay(params: Dict[str, Any]) -> None:
+        # Called on the BackendManager loop; the client session lives on this one
+        asyncio.run_coroutine_threadsafe(request.session.send_progress_notification(
+            progress_token=token, progress=params.get("progress", 0), total=params.get("total"),
+            message=params.get("message"), related_request_id=request.request_id), loop)
+    return relay
+
+
+def render_result(tool_name: str, result: Dict[str, Any], backend: "BackendManager",
+                  ctx: Optional[Context] = None) -> str:
+    """Text sent back for a backend tool result.
+
+    Adds progressive-disclosure context (or the schema, for errors) and, when
+    the output is over the spill store's inline limit, swaps it for a handle
+    and a preview that ``read_result`` can page through.
+    """
+    text = enrich_result(tool_name, result, backend._described_tools, backend.tool_cache)
+    if isinstance(result, dict) and result.get("isError"):
+        text = enrich_error_result(tool_name, result, backend.tool_cache)
+    store = backend.spill_store
+    if store is None:
+        return text
+    raw = _extract_text(result)  # both enrich helpers append to this
+    if len(raw) <= store.inline_limit:
+        return text
+    return store.spill(raw, _session_key(ctx), tool_name) + text[len(raw):]
+
+
 def enrich_error_result(
     tool_name: str,
     error_result: Dict[str, Any],
@@ -275,7 +434,7 @@ def enrich_error_result(
     text = _extract_text(error_result)
     for tool in tool_cache:
         if tool["name"] == tool_name:
-            text += f"\n[Schema for {tool_name}: {json.dumps(tool.get('inputSchema', {}))}]"
+            text += f"\n[Schema for {tool_name}: {json_dumps(tool.get('inputSchema', {}))}]"
             break
     return text
 
@@ -330,30 +489,323 @@ Example: filesystem(tool="read_file", arguments={{"path": "/tmp/example.txt"}})
 Native tools (call directly by name, not via server pattern):
   - list_all_tools() — MUST call first. Lists all tools grouped by server.
   - get_tool_schema(name="tool_name") — get full parameter details for any sub-tool
+  - invoke_batch(calls=[{{"name": "sub_tool", "args": {{...}}}}, ...]) — run several sub-tools concurrently in one call
   - get_tool_count() — get tool count statistics by server
   - manage_servers(action="list|add|remove|validate|test") — manage backend MCP servers
+  - manage_workflows(action="list|show|save|remove|run") — saved multi-step workflows that run in one call
   - optimize_descriptions(action="generate|save|status") — improve tool descriptions using your intelligence
 
 On first use of each sub-tool, additional context (full description and parameters) \
 will be provided with the result.{hint}"""
 
 
+# ─── HTTP Connection Pools ───
+
+# Per-server ``pool_connections`` / ``pool_keepalive`` / ``keepalive_expiry``
+DEFAULT_POOL_CONNECTIONS = 100
+DEFAULT_POOL_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (installed by the http2 extra)
+        return True
+    except ImportError:
+        return False
+
+
+def _pool_settings(config: Dict[str, Any]) -> Tuple[int, int, float, bool]:
+    """(max connections, max keep-alive, keep-alive expiry, http2) for a server config."""
+    http2 = bool(config.get("http2", False))
+    if http2 and not _http2_available():
+        print("⚠ ToolMux: http2 requested but the 'h2' package is missing "
+              "(pip install toolmux[http2]); using HTTP/1.1", file=sys.stderr)
+        http2 = False
+    return (int(config.get("pool_connections", DEFAULT_POOL_CONNECTIONS)),
+            int(config.get("pool_keepalive", DEFAULT_POOL_KEEPALIVE)),
+            float(config.get("keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY)),
+            http2)
+
+
+def _split_unix_url(base_url: str) -> Tuple[str, Optional[str]]:
+    """``(HTTP base URL, socket path)`` for a ``unix:///path/to.sock`` base_url.
+
+    Requests to a Unix domain socket still need an HTTP URL for the request
+    line and Host header; ``http://localhost`` stands in. Other URLs are
+    returned unchanged with no socket path.
+    """
+    if not base_url.startswith("unix://"):
+        return base_url, None
+    path = base_url[len("unix://"):]
+    if not path.startswith("/"):
+        raise ValueError(f"unix socket base_url needs an absolute path: {base_url!r}")
+    return "http://localhost", path
+
+
+def _new_async_client(settings: Tuple[int, int, float, bool],
+                      uds: Optional[str] = None) -> httpx.AsyncClient:
+    connections, keepalive, expiry, http2 = settings
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=keepalive,
+                          keepalive_expiry=expiry)
+    # No default headers or timeout: both are set per request, so one client can serve many backends
+    if uds is not None:
+        return httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(
+            uds=uds, http2=http2, limits=limits))
+    return httpx.AsyncClient(http2=http2, limits=limits)
+
+
+class HttpPools:
+    """Shared ``httpx.AsyncClient`` connection pools for HTTP backends.
+
+    Backends on the same origin (scheme, host and port, or Unix socket path)
+    with the same pool settings share one client, so their parallel calls
+    reuse warm keep-alive or HTTP/2 connections instead of each opening its
+    own. Clients are reference-counted and closed when the last backend
+    using them closes. Must be used on the BackendManager event loop.
+    """
+
+    def __init__(self):
+        self._clients: Dict[tuple, httpx.AsyncClient] = {}
+        self._refs: Dict[tuple, int] = {}
+
+    def acquire(self, base_url: str, config: Dict[str, Any],
+                uds: Optional[str] = None) -> Tuple[tuple, httpx.AsyncClient]:
+        url = httpx.URL(base_url)
+        origin = ("unix", uds, None) if uds is not None else (url.scheme, url.host, url.port)
+        key = (origin, _pool_settings(config))
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = _new_async_client(key[1], uds)
+        self._refs[key] = self._refs.get(key, 0) + 1
+        return key, client
+
+    async def release(self, key: tuple) -> None:
+        self._refs[key] -= 1
+        if self._refs[key] <= 0:
+            del self._refs[key]
+            await self._clients.pop(key).aclose()
+
+    def stats(self, key: tuple) -> Dict[str, Any]:
+        """The pool behind ``key``: its origin, settings and how many backends share it."""
+        (scheme, host, port), (connections, keepalive, expiry, http2) = key
+        return {"origin": f"{scheme}://{host}" + (f":{port}" if port else ""),  # unix:///path.sock
+                "backends": self._refs.get(key, 0), "http2": http2,
+                "max_connections": connections, "max_keepalive": keepalive,
+                "keepalive_expiry": expiry}
+
+
+# ─── HTTP Compression ───
+
+# Per-server ``compression``: request bodies of at least ``min_bytes`` are
+# sent compressed.
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+DEFAULT_COMPRESSION_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+def _zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401  (installed by the compression extra)
+        return True
+    except ImportError:
+        return False
+
+
+class BodyCompressor:
+    """Request-body compression for one HTTP backend.
+
+    Bodies under ``min_bytes`` go out as is. If the server answers
+    ``415 Unsupported Media Type``, the compressor switches to an encoding the
+    server lists in ``Accept-Encoding``, or stops compressing requests, and
+    the caller resends. Replies need nothing here: httpx already advertises
+    every encoding it can decode (gzip, deflate, and zstd or br when their
+    packages are installed) and decodes them; they are only counted.
+    """
+
+    def __init__(self, encoding: str = "gzip", min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES,
+                 level: Optional[int] = None):
+        self.encoding: Optional[str] = encoding
+        self.min_bytes = min_bytes
+        self.level = level
+        self.requests = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compressed_replies = 0
+        self.refusals = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["BodyCompressor"]:
+        """Compressor for one server's config, or None when ``compression`` is off (the default).
+
+        ``compression`` is ``true`` (zstd when installed, else gzip) or
+        ``{"encoding": "gzip"|"zstd", "min_bytes": ..., "level": ...}``.
+        """
+        setting = config.get("compression")
+        if not setting:
+            return None
+        options = setting if isinstance(setting, dict) else {}
+        encoding = options.get("encoding") or ("zstd" if _zstd_available() else "gzip")
+        if encoding not in DEFAULT_COMPRESSION_LEVELS:
+            print(f"⚠ ToolMux: unknown compression encoding '{encoding}'; using gzip", file=sys.stderr)
+            encoding = "gzip"
+        elif encoding == "zstd" and not _zstd_available():
+            print("⚠ ToolMux: zstd compression requested but the 'zstandard' package is missing "
+                  "(pip install toolmux[compression]); using gzip", file=sys.stderr)
+            encoding = "gzip"
+        return cls(encoding, int(options.get("min_bytes", DEFAULT_COMPRESSION_MIN_BYTES)),
+                   options.get("level"))
+
+    def encode(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """``(body to send, Content-Encoding or None)``."""
+        self.requests += 1
+        if self.encoding is None or len(body) < self.min_bytes:
+            return body, None
+        level = self.level if self.level is not None else DEFAULT_COMPRESSION_LEVELS[self.encoding]
+        if self.encoding == "zstd":
+            import zstandard
+            packed = zstandard.ZstdCompressor(level=level).compress(body)
+        else:
+            packed = gzip.compress(body, compresslevel=level, mtime=0)
+        self.compressed += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(packed)
+        return packed, self.encoding
+
+    def refused(self, accept_encoding: str) -> None:
+        """The server rejected the current encoding (415): fall back to one it accepts, or none."""
+        self.refusals += 1
+        offered = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        usable = [e for e in ("zstd", "gzip") if e in offered and e != self.encoding
+                  and (e != "zstd" or _zstd_available())]
+        self.encoding = usable[0] if usable else None
+
+    def replied(self, response: httpx.Response) -> None:
+        if response.headers.get("content-encoding", "identity") != "identity":
+            self.compressed_replies += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"encoding": self.encoding, "min_bytes": self.min_bytes,
+                "requests": self.requests, "compressed": self.compressed,
+                "bytes_in": self.bytes_in, "bytes_out": self.bytes_out,
+                "saved_pct": round(100 * (1 - self.bytes_out / self.bytes_in), 1) if self.bytes_in else 0.0,
+                "compressed_replies": self.compressed_replies, "refusals": self.refusals}
+
+
 # ─── HttpMcpClient (preserved from v1.2.1, version bump) ───
 
+_JSON_CONTENT = {"Content-Type": "application/json"}
+# JSON-RPC paths tried, in order, until a server answers with something other than 404
+_RPC_PATHS = ("/mcp", "/rpc")
+# Statuses from a server or gateway that is briefly unavailable: worth retrying
+_RETRYABLE_STATUS = (502, 503, 504)
+# Receives the params of each notifications/progress sent for one tools/call
+ProgressCallback = Callable[[Dict[str, Any]], None]
+# Streamable HTTP servers may answer a POST with either
+_ACCEPT_RPC = {"Accept": "application/json, text/event-stream"}
+
+
+def _transport_failure(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The ``data`` tag of an HTTP transport failure (see ``HttpMcpClient._rpc_error``), else None.
+
+    Errors without it came from a server that answered, e.g. -32602 for bad arguments.
+    """
+    data = result.get("data") if "error" in result else None
+    return data if isinstance(data, dict) and data.get("transport") == "http" else None
+
+
+def _tools_digest(tools: List[Dict[str, Any]]) -> str:
+    """Stable hash of a tools/list result, the validator for servers that send no ETag."""
+    return hashlib.sha256(json.dumps(tools, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class SseDecoder:
+    """Incremental ``text/event-stream`` parser.
+
+    Feed it one line at a time (without the line ending); it returns
+    ``(event, data)`` each time a blank line completes an event.
+    """
+
+    def __init__(self):
+        self.event = ""
+        self.data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Tuple[str, str]]:
+        if not line:
+            if not self.data:
+                self.event = ""
+                return None
+            event = (self.event or "message", "\n".join(self.data))
+            self.event, self.data = "", []
+            return event
+        if line.startswith(":"):
+            return None  # comment / keep-alive
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            self.event = value
+        elif field == "data":
+            self.data.append(value)
+        return None
+
+
 class HttpMcpClient:
-    """HTTP/SSE MCP client for remote MCP servers."""
+    """HTTP/SSE MCP client for remote MCP servers.
+
+    Offers a synchronous API (``call_rpc``, ``call_tool``, ...) for standalone
+    and CLI use, and an ``*_async`` counterpart backed by ``httpx.AsyncClient``
+    that BackendManager uses from its event loop. With ``pools``, the async
+    client comes from a connection pool shared with other backends on the
+    same origin; ``pool_config`` holds the server's pool and HTTP/2 settings.
+
+    Replies may be plain JSON or a Streamable HTTP event stream, which is read
+    as it arrives so progress notifications reach the caller before the
+    result. Passing ``sse_endpoint`` selects the legacy two-channel transport:
+    responses arrive on a long-lived GET event stream and requests are POSTed
+    to the URL the server announces on it (async API only). A
+    ``unix:///path.sock`` base_url carries the same HTTP over a Unix domain
+    socket, skipping TCP for servers on the same host.
+    """
 
     def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None,
-                 timeout: int = 30, sse_endpoint: Optional[str] = None):
+                 timeout: int = 30, sse_endpoint: Optional[str] = None,
+                 pools: Optional[HttpPools] = None, pool_config: Optional[Dict[str, Any]] = None,
+                 compression: Optional[BodyCompressor] = None):
+        # unix:///path.sock talks HTTP over a Unix domain socket instead of TCP
+        base_url, self.uds = _split_unix_url(base_url)
         self.base_url = base_url.rstrip('/')
         self.headers = headers or {}
         self.timeout = timeout
         self.sse_endpoint = sse_endpoint or "/sse"
-        self.client = httpx.Client(
-            headers=self.headers,
-            timeout=httpx.Timeout(timeout, connect=timeout / 2),
-        )
+        self.legacy_sse = sse_endpoint is not None
+        self.pool_config = pool_config or {}
+        self._client: Optional[httpx.Client] = None  # synchronous API only; see ``client``
+        self._request_headers = {**self.headers, **_JSON_CONTENT, **_ACCEPT_RPC}
+        self.compression = compression
+        self._pools = pools
+        self._pool_key: Optional[tuple] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
         self._initialized = False
+        self._init_error: Optional[Dict[str, Any]] = None  # why the last initialize failed
+        # Negotiated once, then reused on every call (see restore / on_negotiated)
+        self.endpoint: Optional[str] = None
+        self.session_id: Optional[str] = None
+        self.protocol_version: Optional[str] = None
+        self.capabilities: Dict[str, Any] = {}
+        self.server_info: Dict[str, Any] = {}
+        self.on_negotiated: Optional[Callable[[Dict[str, Any]], None]] = None
+        # Last tools/list and its validator (ETag, or a hash of the list)
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self.tools_validator: Optional[str] = None
+        self.tools_revalidation = {"fetched": 0, "not_modified": 0, "unchanged": 0}
+        self._ids = itertools.count(1)  # async request ids, so a cancellation names the right request
+        self._background: Set[asyncio.Task] = set()
+        self._progress: Dict[Any, ProgressCallback] = {}  # progressToken → callback
+        # Legacy SSE transport: the GET stream reader and the calls waiting on it
+        self._sse_task: Optional[asyncio.Task] = None
+        self._sse_ready: Optional[asyncio.Future] = None  # → URL to POST messages to
+        self._waiting: Dict[int, asyncio.Future] = {}
 
     def __enter__(self):
         return self
@@ -361,75 +813,1800 @@ class HttpMcpClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    @property
+    def client(self) -> httpx.Client:
+        """The synchronous client, created on first use (BackendManager only uses the async path)."""
+        if self._client is None:
+            connections, keepalive, expiry, _ = _pool_settings({**self.pool_config, "http2": False})
+            limits = httpx.Limits(max_connections=connections, max_keepalive_connections=keepalive,
+                                  keepalive_expiry=expiry)
+            self._client = httpx.Client(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout, connect=self.timeout / 2),
+                limits=limits,
+                transport=httpx.HTTPTransport(uds=self.uds, limits=limits) if self.uds else None,
+            )
+        return self._client
+
     def close(self):
-        if hasattr(self, 'client'):
-            self.client.close()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
-    def call_rpc(self, method: str, params: Optional[Dict[str, Any]] = None,
-                 request_id: int = 1) -> Dict[str, Any]:
-        payload: Dict[str, Any] = {"jsonrpc": "2.0", "method": method, "id": request_id}
+    async def aclose(self):
+        self.close()
+        if self._sse_task is not None:
+            self._sse_task.cancel()
+            await asyncio.gather(self._sse_task, return_exceptions=True)
+            self._sse_task = None
+        if self._async_client is not None:
+            if self._pool_key is not None:
+                await self._pools.release(self._pool_key)
+                self._pool_key = None
+            else:
+                await self._async_client.aclose()
+            self._async_client = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            if self._pools is not None:
+                self._pool_key, self._async_client = self._pools.acquire(
+                    self.base_url, self.pool_config, self.uds)
+            else:
+                self._async_client = _new_async_client(_pool_settings(self.pool_config), self.uds)
+        return self._async_client
+
+    def _payload(self, method: str, params: Optional[Dict[str, Any]],
+                 request_id: int) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if not method.startswith("notifications/"):
+            payload["id"] = request_id
         if params:
             payload["params"] = params
+        return payload
+
+    def _rpc_error(self, request_id: int, message: str, retryable: bool = False) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"transport": "http", "url": self.base_url}
+        if retryable:
+            data["retryable"] = True  # transient: the request may be sent again
+        return {"jsonrpc": "2.0", "id": request_id, "error": {
+            "code": -32603, "message": message, "data": data}}
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.session_id and not self.protocol_version:
+            return self._request_headers
+        headers = dict(self._request_headers)
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        if self.protocol_version:
+            headers["MCP-Protocol-Version"] = self.protocol_version
+        return headers
+
+    def negotiated(self) -> Dict[str, Any]:
+        """What this server agreed to: RPC endpoint, MCP session and capabilities."""
+        return {"endpoint": self.endpoint, "session_id": self.session_id,
+                "protocol_version": self.protocol_version,
+                "capabilities": self.capabilities, "server_info": self.server_info,
+                "tools_validator": self.tools_validator, "tools": self._tools}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Reuse a negotiation saved by an earlier run, skipping the endpoint probe.
+
+        With a session id (``HttpSessionCache`` never saves one) the session
+        is resumed without a new initialize; if the server has dropped it, the
+        next call gets a 404 and negotiates from scratch.
+        """
+        self.endpoint = state.get("endpoint")
+        self.session_id = state.get("session_id")
+        self.protocol_version = state.get("protocol_version")
+        self.capabilities = state.get("capabilities") or {}
+        self.server_info = state.get("server_info") or {}
+        self._initialized = bool(self.session_id and self.protocol_version)
+        if state.get("tools") is not None and state.get("tools_validator"):
+            self._tools, self.tools_validator = state["tools"], state["tools_validator"]
+
+    def _encode(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """The body to POST and its ``Content-Encoding`` header, if compressed."""
+        if self.compression is None:
+            return body, {}
+        content, encoding = self.compression.encode(body)
+        return content, {"Content-Encoding": encoding} if encoding else {}
+
+    def _remember(self, path: str, response: httpx.Response) -> None:
+        if self.compression is not None:
+            self.compression.replied(response)
+        session_id = response.headers.get("mcp-session-id") or self.session_id
+        if path != self.endpoint or session_id != self.session_id:
+            self.endpoint, self.session_id = path, session_id
+            self._negotiation_changed()
+
+    def _forget(self) -> None:
+        """Drop the remembered endpoint and session (moved, or expired on the server)."""
+        self.endpoint = self.session_id = self.protocol_version = None
+        self._initialized = False
+
+    def _record_init(self, init_response: Dict[str, Any]) -> None:
+        result = init_response.get("result") or {}
+        self.protocol_version = result.get("protocolVersion")
+        self.capabilities = result.get("capabilities") or {}
+        self.server_info = result.get("serverInfo") or {}
+        self._negotiation_changed()
+
+    def _negotiation_changed(self) -> None:
+        if self.on_negotiated is not None:
+            self.on_negotiated(self.negotiated())
+
+    def _post(self, method: str, body: bytes, retry: bool = True) -> httpx.Response:
+        """POST to the known endpoint, or probe ``_RPC_PATHS`` and remember the one that answers.
+
+        The response is streamed; the caller reads and closes it.
+        """
+        remembered = self.endpoint
+        content, headers = self._encode(body)
+        for path in [remembered] if remembered else _RPC_PATHS:
+            request = self.client.build_request("POST", f"{self.base_url}{path}", content=content,
+                                                headers={**self._headers(), **headers})
+            response = self.client.send(request, stream=True)
+            if response.status_code == 415 and headers:
+                response.close()
+                self.compression.refused(response.headers.get("accept-encoding", ""))
+                return self._post(method, body, retry)
+            if response.status_code != 404:
+                self._remember(path, response)
+                return response
+            response.close()
+        if remembered and retry:
+            self._forget()
+            if method == "initialize" or self.initialize():
+                return self._post(method, body, retry=False)
+        return response
+
+    async def _post_async(self, client: httpx.AsyncClient, method: str, body: bytes,
+                          timeout: httpx.Timeout, headers: Optional[Dict[str, str]] = None,
+                          retry: bool = True) -> httpx.Response:
+        remembered = self.endpoint
+        content, encoded = self._encode(body)
+        for path in [remembered] if remembered else _RPC_PATHS:
+            request = client.build_request("POST", f"{self.base_url}{path}", content=content,
+                                           headers={**self._headers(), **(headers or {}), **encoded},
+                                           timeout=timeout)
+            response = await client.send(request, stream=True)
+            if response.status_code == 415 and encoded:
+                await response.aclose()
+                self.compression.refused(response.headers.get("accept-encoding", ""))
+                return await self._post_async(client, method, body, timeout, headers, retry)
+            if response.status_code != 404:
+                self._remember(path, response)
+                return response
+            await response.aclose()
+        if remembered and retry:
+            # Endpoint moved or the MCP session expired: negotiate again, once
+            self._forget()
+            if method == "initialize" or await self.initialize_async():
+                return await self._post_async(client, method, body, timeout, headers, retry=False)
+        return response
+
+    def _route(self, message: Dict[str, Any], request_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Return ``message`` if it answers ``request_id``; hand progress notifications to their caller."""
+        if "method" in message:
+            if message["method"] == "notifications/progress":
+                params = message.get("params") or {}
+                callback = self._progress.get(params.get("progressToken"))
+                if callback is not None:
+                    callback(params)
+            return None  # other notifications and server requests are not forwarded
+        return message if message.get("id") == request_id else None
+
+    def _read_reply(self, response: httpx.Response, request_id: Optional[int]) -> Dict[str, Any]:
+        if response.status_code == 202:
+            return {"jsonrpc": "2.0", "id": request_id, "result": {}}  # notification accepted
+        if not response.headers.get("content-type", "").startswith("text/event-stream"):
+            return json_loads(response.read())
+        decoder = SseDecoder()
+        for line in response.iter_lines():
+            event = decoder.feed(line)
+            if event and event[0] == "message":
+                reply = self._route(json_loads(event[1]), request_id)
+                if reply is not None:
+                    return reply
+        return self._rpc_error(request_id, "Event stream ended without a response")
+
+    async def _read_reply_async(self, response: httpx.Response,
+                                request_id: Optional[int]) -> Dict[str, Any]:
+        if response.status_code == 202:
+            return {"jsonrpc": "2.0", "id": request_id, "result": {}}
+        if not response.headers.get("content-type", "").startswith("text/event-stream"):
+            return json_loads(await response.aread())
+        # Read events as they arrive: progress is forwarded before the result
+        decoder = SseDecoder()
+        async for line in response.aiter_lines():
+            event = decoder.feed(line)
+            if event and event[0] == "message":
+                reply = self._route(json_loads(event[1]), request_id)
+                if reply is not None:
+                    return reply
+        return self._rpc_error(request_id, "Event stream ended without a response")
+
+    def call_rpc(self, method: str, params: Optional[Dict[str, Any]] = None,
+                 request_id: int = 1) -> Dict[str, Any]:
+        if self.legacy_sse:
+            return self._rpc_error(request_id, "The legacy SSE transport (sse_endpoint) "
+                                               "needs the async API")
+        payload = self._payload(method, params, request_id)
+        body = json_dumpb(payload)
         try:
-            response = self.client.post(f"{self.base_url}/mcp", json=payload)
-            response.raise_for_status()
-            return response.json()
+            response = self._post(method, body)
+            try:
+                response.raise_for_status()
+                return self._read_reply(response, request_id)
+            finally:
+                response.close()
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                try:
-                    response = self.client.post(f"{self.base_url}/rpc", json=payload)
-                    response.raise_for_status()
-                    return response.json()
-                except Exception:
-                    pass
-            return {"jsonrpc": "2.0", "id": request_id, "error": {
-                "code": -32603, "message": f"HTTP {e.response.status_code}: {e}",
-                "data": {"transport": "http", "url": self.base_url}}}
+            return self._rpc_error(request_id, f"HTTP {e.response.status_code}: {e}")
         except httpx.TimeoutException:
-            return {"jsonrpc": "2.0", "id": request_id, "error": {
-                "code": -32603, "message": f"Request timeout after {self.timeout}s",
-                "data": {"transport": "http", "url": self.base_url}}}
+            return self._rpc_error(request_id, f"Request timeout after {self.timeout}s")
+        except Exception as e:
+            return self._rpc_error(request_id, f"Connection error: {e}")
+
+    async def call_rpc_async(self, method: str, params: Optional[Dict[str, Any]] = None,
+                             request_id: Optional[int] = None,
+                             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async JSON-RPC call; ``timeout`` overrides the client read timeout for this request.
+
+        Without ``request_id`` a fresh one is taken from the client's counter.
+        """
+        return (await self._exchange_async(method, params, request_id, timeout))[0]
+
+    async def _exchange_async(self, method: str, params: Optional[Dict[str, Any]],
+                              request_id: Optional[int], timeout: Optional[float],
+                              headers: Optional[Dict[str, str]] = None
+                              ) -> Tuple[Dict[str, Any], Optional[httpx.Headers]]:
+        """One round trip: the JSON-RPC reply and the HTTP response headers (None on failure).
+
+        A ``304 Not Modified`` (for a conditional request) comes back as
+        ``{"notModified": True}``.
+        """
+        client = self._get_async_client()
+        if request_id is None:
+            request_id = next(self._ids)
+        payload = self._payload(method, params, request_id)
+        body = json_dumpb(payload)
+        limit = timeout or self.timeout
+        per_request = httpx.Timeout(limit, connect=min(limit, self.timeout / 2))
+        try:
+            if self.legacy_sse:
+                return await self._call_legacy(client, payload, body, limit, per_request), None
+            response = await self._post_async(client, method, body, per_request, headers)
+            try:
+                if response.status_code == 304:
+                    return {"jsonrpc": "2.0", "id": request_id, "notModified": True}, response.headers
+                response.raise_for_status()
+                return await self._read_reply_async(response, request_id), response.headers
+            finally:
+                await response.aclose()
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            return self._rpc_error(request_id, f"HTTP {status}: {e}",
+                                   retryable=status in _RETRYABLE_STATUS), None
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            return self._rpc_error(request_id, f"Request timeout after {limit:g}s"), None
+        except httpx.TransportError as e:
+            # Refused or reset connections: nothing (or not all) reached the server
+            return self._rpc_error(request_id, f"Connection error: {e}", retryable=True), None
+        except Exception as e:
+            return self._rpc_error(request_id, f"Connection error: {e}"), None
+
+    async def _call_legacy(self, client: httpx.AsyncClient, payload: Dict[str, Any], body: bytes,
+                           limit: float, per_request: httpx.Timeout) -> Dict[str, Any]:
+        """POST one message over the legacy SSE transport and wait for its reply on the stream."""
+        if self._sse_ready is None:
+            self._sse_ready = asyncio.get_running_loop().create_future()
+            self._sse_task = asyncio.ensure_future(self._sse_loop(client, self._sse_ready))
+        post_url = await asyncio.wait_for(asyncio.shield(self._sse_ready), limit)
+        request_id = payload.get("id")
+        waiter = None
+        if request_id is not None:
+            waiter = self._waiting[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            while True:
+                content, encoded = self._encode(body)
+                response = await client.post(post_url, content=content,
+                                             headers={**self._headers(), **encoded}, timeout=per_request)
+                if response.status_code != 415 or not encoded:
+                    break
+                self.compression.refused(response.headers.get("accept-encoding", ""))
+            response.raise_for_status()
+            if waiter is None:
+                return {"jsonrpc": "2.0", "result": {}}
+            return await asyncio.wait_for(waiter, limit)
+        finally:
+            self._waiting.pop(request_id, None)
+
+    async def _sse_loop(self, client: httpx.AsyncClient, ready: asyncio.Future) -> None:
+        """Read the legacy SSE stream: the POST endpoint first, then JSON-RPC messages."""
+        reason = "SSE stream closed by the server"
+        try:
+            async with client.stream(
+                    "GET", f"{self.base_url}{self.sse_endpoint}",
+                    headers={**self.headers, "Accept": "text/event-stream"},
+                    timeout=httpx.Timeout(self.timeout, read=None)) as response:
+                response.raise_for_status()
+                decoder = SseDecoder()
+                async for line in response.aiter_lines():
+                    event = decoder.feed(line)
+                    if event is None:
+                        continue
+                    kind, data = event
+                    if kind == "endpoint" and not ready.done():
+                        ready.set_result(str(response.url.join(data.strip())))
+                    elif kind == "message":
+                        message = json_loads(data)
+                        waiter = None if "method" in message else self._waiting.get(message.get("id"))
+                        if waiter is not None and not waiter.done():
+                            waiter.set_result(message)
+                        else:
+                            self._route(message, None)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            return {"jsonrpc": "2.0", "id": request_id, "error": {
-                "code": -32603, "message": f"Connection error: {e}",
-                "data": {"transport": "http", "url": self.base_url}}}
+            reason = f"SSE stream failed: {e}"
+        # The MCP session lived on this stream: the next call reconnects and initializes again
+        self._sse_ready = None
+        self._initialized = False
+        error = ConnectionError(reason)
+        if not ready.done():
+            ready.set_exception(error)
+        for waiter in list(self._waiting.values()):
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def initialize(self) -> bool:
+        if self._initialized:
+            return True
+        init_response = self.call_rpc("initialize", {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": "ToolMux", "version": VERSION}})
+        if "error" in init_response:
+            return False
+        self._record_init(init_response)
+        self.call_rpc("notifications/initialized")
+        self._initialized = True
+        return True
+
+    async def initialize_async(self) -> bool:
+        if self._initialized:
+            return True
+        init_response = await self.call_rpc_async("initialize", {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": "ToolMux", "version": VERSION}})
+        if "error" in init_response:
+            self._init_error = init_response["error"]
+            return False
+        self._init_error = None
+        self._record_init(init_response)
+        await self.call_rpc_async("notifications/initialized")
+        self._initialized = True
+        return True
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        if not self.initialize():
+            return []
+        response = self.call_rpc("tools/list")
+        if "error" in response:
+            return []
+        return response.get("result", {}).get("tools", [])
+
+    async def get_tools_async(self) -> List[Dict[str, Any]]:
+        """The server's tools, revalidated against the last list instead of re-downloaded.
+
+        The request carries ``If-None-Match`` with the last validator: the
+        server's ETag, or a hash of the list when it sends none. A 304, or a
+        full reply with the same ETag or hash, reuses the stored list.
+        """
+        if not await self.initialize_async():
+            return []
+        conditional = self._tools is not None and self.tools_validator
+        response, headers = await self._exchange_async(
+            "tools/list", None, None, None,
+            {"If-None-Match": self.tools_validator} if conditional else None)
+        if response.get("notModified") and self._tools is not None:
+            self.tools_revalidation["not_modified"] += 1
+            return self._tools
+        if "error" in response:
+            return []
+        tools = response.get("result", {}).get("tools", [])
+        etag = headers.get("etag") if headers is not None else None
+        validator = etag or f'W/"{_tools_digest(tools)}"'
+        if self._tools is not None and validator == self.tools_validator:
+            self.tools_revalidation["unchanged"] += 1
+            return self._tools
+        self.tools_revalidation["fetched"] += 1
+        self._tools, self.tools_validator = tools, validator
+        self._negotiation_changed()
+        return tools
+
+    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.initialize():
+            return {"error": "Failed to initialize HTTP MCP connection"}
+        response = self.call_rpc("tools/call", {"name": tool_name, "arguments": arguments})
+        if "error" in response:
+            return {"error": response["error"]["message"]}
+        return response.get("result", {"error": "No result returned"})
+
+    async def call_tool_async(self, tool_name: str, arguments: Dict[str, Any],
+                              timeout: Optional[float] = None,
+                              progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Call a tool; past ``timeout`` raises asyncio.TimeoutError and the server is told to cancel.
+
+        ``progress`` receives the params of each progress notification for this call.
+        """
+        if not await self.initialize_async():
+            return self._tool_error(self._init_error or {}, "Failed to initialize HTTP MCP connection")
+        request_id = next(self._ids)
+        params: Dict[str, Any] = {"name": tool_name, "arguments": arguments}
+        if progress is not None:
+            params["_meta"] = {"progressToken": request_id}
+            self._progress[request_id] = progress
+        try:
+            response = await asyncio.wait_for(self.call_rpc_async(
+                "tools/call", params, request_id=request_id, timeout=timeout), timeout)
+        except asyncio.TimeoutError:
+            self._send_cancelled(request_id, f"deadline of {timeout:g}s exceeded")
+            raise
+        except asyncio.CancelledError:
+            self._send_cancelled(request_id, "cancelled by caller")
+            raise
+        finally:
+            self._progress.pop(request_id, None)
+        if "error" in response:
+            return self._tool_error(response["error"])
+        return response.get("result", {"error": "No result returned"})
+
+    @staticmethod
+    def _tool_error(error: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+        """tools/call error result; transport failures keep their ``data`` tag (see ``_rpc_error``)."""
+        message = error.get("message", "")
+        result: Dict[str, Any] = {"error": f"{context}: {message}" if context and message
+                                  else context or message or "Unknown error"}
+        data = error.get("data")
+        if isinstance(data, dict) and data.get("transport") == "http":
+            result["data"] = data
+        return result
+
+    def _send_cancelled(self, request_id: int, reason: str) -> None:
+        """Post ``notifications/cancelled`` in the background so the server can stop work."""
+        task = asyncio.ensure_future(self.call_rpc_async(
+            "notifications/cancelled", {"requestId": request_id, "reason": reason}))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+# Negotiation changes arrive in bursts (initialize, then the first reply's
+# session header); they are written out together this many seconds later.
+HTTP_SESSION_SAVE_DELAY = 1.0
+
+
+class HttpSessionCache:
+    """Negotiated HTTP endpoints and capabilities, saved next to .toolmux_cache.json.
+
+    Entries are keyed by server name and only reused while the server's
+    ``base_url`` is unchanged, so warm starts skip the endpoint probe. MCP
+    session ids are credentials for a live session and are never saved.
+    Writes are debounced and done off the event loop; ``flush`` forces one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # one writer of the file at a time
+        self._dirty = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        try:
+            self._entries: Dict[str, Dict[str, Any]] = json_loads(path.read_bytes())["servers"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = {}
+        for entry in self._entries.values():
+            entry.pop("session_id", None)  # saved by older versions
+
+    def get(self, server_name: str, base_url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(server_name)
+        if not entry or entry.get("base_url") != base_url.rstrip("/"):
+            return None
+        return entry
+
+    def put(self, server_name: str, base_url: str, state: Dict[str, Any]) -> None:
+        """Record a server's negotiation; saved after ``HTTP_SESSION_SAVE_DELAY``."""
+        entry = {"base_url": base_url.rstrip("/"),
+                 **{k: v for k, v in state.items() if k != "session_id"}}
+        with self._lock:
+            if self._entries.get(server_name) == entry:
+                return
+            self._entries[server_name] = entry
+            self._dirty = True
+            if self._timer is not None:
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None  # synchronous caller: write now
+            else:
+                self._timer = loop.call_later(
+                    HTTP_SESSION_SAVE_DELAY, loop.run_in_executor, None, self.flush)
+        if loop is None:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending changes to disk (blocking)."""
+        with self._write_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                data = json_dumps({"version": "1.0", "servers": self._entries}, indent=2)
+            try:
+                self.path.write_text(data)
+            except OSError:
+                pass  # best effort: the next start just probes again
+
+
+# ─── StdioSession ───
+
+# Default upper bound for one newline-delimited message from a stdio backend
+# (per-server ``max_message_bytes``). Larger responses are drained without
+# being buffered and fail only the call they belong to.
+DEFAULT_MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+# StreamReader buffer size. Frames are assembled from chunks of up to this
+# size, and the pipe transport pauses once ~2x this much is unread, so big
+# frames do not leave a second full-size copy in the reader's buffer.
+STDIO_READ_CHUNK = 1024 * 1024
+# How many bytes at each end of an oversized frame are kept to find its id.
+_FRAME_ID_SCAN = 64 * 1024
+_FRAME_HEAD_ID = re.compile(rb'^\s*\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*(\d+)')
+_FRAME_TAIL_ID = re.compile(rb'"id"\s*:\s*(\d+)\s*\}\s*$')
+
+
+class StdioSession:
+    """Multiplexed JSON-RPC session over a stdio backend's stdin/stdout.
+
+    A dedicated reader task routes each response to its caller by request id
+    and a writer task drains a queue of outgoing messages, so any number of
+    calls can be in flight on the same process without blocking each other.
+    Must be created and used on the BackendManager event loop.
+    """
+
+    def __init__(self, server_name: str, process: "asyncio.subprocess.Process",
+                 max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES):
+        self.server_name = server_name
+        self.process = process
+        self.max_message_bytes = max_message_bytes
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._progress: Dict[Any, ProgressCallback] = {}  # progressToken → callback
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+        self.exit_reason: Optional[str] = None
+        self.started_at = asyncio.get_running_loop().time()
+        # Called once if the process dies on its own (not via close())
+        self.on_exit: Optional[Callable[["StdioSession"], None]] = None
+        self._reader_task = asyncio.create_task(self._read_loop())
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self.process.returncode is None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a request and wait for the response with the matching id.
+
+        If ``timeout`` expires or the caller is cancelled, the backend gets a
+        ``notifications/cancelled`` for the request and any late response is
+        dropped.
+        """
+        if not self.alive:
+            raise ConnectionError(self.exit_reason or f"{self.server_name} is not running")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        self._outbox.put_nowait(message)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.notify("notifications/cancelled", {
+                "requestId": request_id, "reason": f"deadline of {timeout:g}s exceeded"})
+            raise
+        except asyncio.CancelledError:
+            self.notify("notifications/cancelled", {
+                "requestId": request_id, "reason": "cancelled by caller"})
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Queue a notification (no response expected)."""
+        if not self.alive:
+            return
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        self._outbox.put_nowait(message)
+
+    async def initialize(self) -> Dict[str, Any]:
+        response = await self.request("initialize", {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": "ToolMux", "version": VERSION}})
+        self.notify("notifications/initialized")
+        return response
+
+    async def get_tools(self) -> List[Dict[str, Any]]:
+        response = await self.request("tools/list")
+        return response.get("result", {}).get("tools", [])
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"name": tool_name, "arguments": arguments}
+        token = None
+        if progress is not None:
+            token = next(self._ids)
+            params["_meta"] = {"progressToken": token}
+            self._progress[token] = progress
+        try:
+            response = await self.request("tools/call", params, timeout=timeout)
+        finally:
+            self._progress.pop(token, None)
+        if "error" in response:
+            message = response["error"].get("message", "Unknown error")
+            return {"content": [{"type": "text", "text": f"Error: {message}"}], "isError": True}
+        return response.get("result", {"error": "No result"})
+
+    async def _write_loop(self) -> None:
+        stdin = self.process.stdin
+        try:
+            while True:
+                message = await self._outbox.get()
+                stdin.write(json_dumpb(message) + b"\n")
+                await stdin.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(f"write to {self.server_name} failed: {e}")
+
+    async def _read_frame(self):
+        """Read one newline-delimited frame in chunks.
+
+        Returns ``(frame, size, edges)``: ``frame`` is the message bytes, or
+        None once ``size`` exceeds ``max_message_bytes`` — the rest is then
+        drained and discarded, keeping only the first and last bytes in
+        ``edges`` to identify the request. Returns None at EOF.
+        """
+        stdout = self.process.stdout
+        frame: Optional[bytearray] = bytearray()
+        size = 0
+        head = tail = b""
+        while True:
+            done = True
+            try:
+                part = await stdout.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                part = e.partial
+                if not part and size == 0:
+                    return None
+            except asyncio.LimitOverrunError as e:
+                part = await stdout.readexactly(e.consumed)
+                done = False
+            size += len(part)
+            if frame is not None and size > self.max_message_bytes:
+                head, tail = bytes(frame[:_FRAME_ID_SCAN]), bytes(frame[-_FRAME_ID_SCAN:])
+                frame = None
+            if frame is not None:
+                frame += part
+            else:
+                if len(head) < _FRAME_ID_SCAN:
+                    head += part[:_FRAME_ID_SCAN - len(head)]
+                tail = (tail + part[-_FRAME_ID_SCAN:])[-_FRAME_ID_SCAN:]
+            if done:
+                return frame, size, (head, tail)
+
+    def _reject_oversized(self, size: int, head: bytes, tail: bytes) -> None:
+        """Fail the call whose response was too large to accept."""
+        match = _FRAME_HEAD_ID.search(head) or _FRAME_TAIL_ID.search(tail)
+        if match:
+            request_id: Optional[int] = int(match.group(1))
+        elif len(self._pending) == 1:
+            request_id = next(iter(self._pending))
+        else:
+            print(f"⚠ ToolMux: dropped {size}-byte message from {self.server_name} "
+                  f"(over max_message_bytes={self.max_message_bytes})", file=sys.stderr)
+            return
+        self._dispatch({"jsonrpc": "2.0", "id": request_id, "error": {
+            "code": -32603,
+            "message": (f"Response from {self.server_name} is {size} bytes, over the "
+                        f"{self.max_message_bytes}-byte max_message_bytes limit")}})
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                read = await self._read_frame()
+                if read is None:
+                    break
+                frame, size, (head, tail) = read
+                if frame is None:
+                    self._reject_oversized(size, head, tail)
+                    continue
+                try:
+                    message = json_loads(frame)
+                except ValueError:
+                    continue  # Servers sometimes log to stdout — skip non-JSON lines
+                if isinstance(message, dict):
+                    self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(f"read from {self.server_name} failed: {e}")
+            return
+        code = await self.process.wait()
+        self._fail(f"{self.server_name} exited with code {code}")
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        request_id = message.get("id")
+        if "method" in message:
+            if request_id is not None:
+                # Server-initiated request: answer ping, decline everything else
+                if message["method"] == "ping":
+                    self._outbox.put_nowait({"jsonrpc": "2.0", "id": request_id, "result": {}})
+                else:
+                    self._outbox.put_nowait({"jsonrpc": "2.0", "id": request_id, "error": {
+                        "code": -32601, "message": f"Method not supported: {message['method']}"}})
+            elif message["method"] == "notifications/progress":
+                params = message.get("params") or {}
+                callback = self._progress.get(params.get("progressToken"))
+                if callback is not None:
+                    callback(params)
+            return
+        future = self._pending.get(request_id)
+        if future is not None and not future.done():
+            future.set_result(message)
+
+    def _fail(self, reason: str, crashed: bool = True) -> None:
+        """Mark the session dead and fail every call still waiting on it."""
+        if self._closed:
+            return
+        self._closed = True
+        self.exit_reason = reason
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(reason))
+        if crashed and self.on_exit is not None:
+            self.on_exit(self)
+
+    def abort(self, reason: str) -> None:
+        """Treat a hung process as crashed: fail its calls, fire ``on_exit`` and kill it."""
+        self._fail(reason)
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self._fail(f"{self.server_name} was shut down", crashed=False)
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        if self.process.returncode is None:
+            try:
+                self.process.terminate()
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+            except ProcessLookupError:
+                pass
+        for task in (self._reader_task, self._writer_task):
+            task.cancel()
+
+
+class ReplicaPool:
+    """N StdioSessions of the same stdio backend behind one session-like API.
+
+    Calls go to the live replica with the fewest requests in flight. Tools
+    listed in ``sticky_tools`` (or every tool, with ``"*"``) stay pinned to
+    the replica that served them first, for servers that keep per-process
+    state. Tool discovery runs on one replica only.
+    """
+
+    def __init__(self, server_name: str, replicas: List[StdioSession],
+                 sticky_tools: Optional[List[str]] = None):
+        self.server_name = server_name
+        self.replicas = replicas
+        self.sticky_tools: Set[str] = set(sticky_tools or [])
+        self._pins: Dict[str, StdioSession] = {}
+        self._served: Dict[int, int] = {id(r): 0 for r in replicas}
+
+    @property
+    def alive(self) -> bool:
+        return any(r.alive for r in self.replicas)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(r.in_flight for r in self.replicas)
+
+    @property
+    def exit_reason(self) -> Optional[str]:
+        reasons = [r.exit_reason for r in self.replicas if r.exit_reason]
+        return reasons[-1] if reasons else None
+
+    def _pick(self, tool_name: Optional[str] = None) -> StdioSession:
+        """Least-outstanding-requests choice, honouring sticky pins."""
+        sticky = tool_name is not None and (
+            "*" in self.sticky_tools or tool_name in self.sticky_tools)
+        if sticky:
+            pinned = self._pins.get(tool_name)
+            if pinned is not None and pinned.alive:
+                return pinned
+        live = [r for r in self.replicas if r.alive]
+        if not live:
+            raise ConnectionError(self.exit_reason or f"{self.server_name} is not running")
+        replica = min(live, key=lambda r: (r.in_flight, self._served[id(r)]))
+        if sticky:
+            self._pins[tool_name] = replica
+        return replica
+
+    async def initialize(self) -> Dict[str, Any]:
+        """Run the MCP handshake on every replica and close the ones that fail.
+
+        Raises the first handshake error only if no replica is left.
+        """
+        results = await asyncio.gather(*(r.initialize() for r in self.replicas),
+                                       return_exceptions=True)
+        failed = [r for r, result in zip(self.replicas, results) if isinstance(result, BaseException)]
+        if len(failed) == len(self.replicas):
+            raise results[0]
+        if failed:
+            errors = [result for result in results if isinstance(result, BaseException)]
+            print(f"⚠ ToolMux: {len(failed)} of {len(self.replicas)} replicas of {self.server_name} "
+                  f"failed to initialize ({str(errors[0]) or type(errors[0]).__name__}); "
+                  f"running {len(self.replicas) - len(failed)}", file=sys.stderr)
+            self.replicas = [r for r in self.replicas if r not in failed]
+            for replica in failed:
+                self._served.pop(id(replica), None)
+            await asyncio.gather(*(r.close() for r in failed))
+        return next(result for result in results if not isinstance(result, BaseException))
+
+    async def get_tools(self) -> List[Dict[str, Any]]:
+        return await self._pick().get_tools()
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        replica = self._pick(tool_name)
+        self._served[id(replica)] += 1
+        return await replica.call_tool(tool_name, arguments, timeout=timeout, progress=progress)
+
+    def replace(self, old: StdioSession, new: StdioSession) -> None:
+        """Swap a crashed replica for its replacement and drop pins to it."""
+        self.replicas[self.replicas.index(old)] = new
+        self._served[id(new)] = self._served.pop(id(old), 0)
+        self._pins = {tool: r for tool, r in self._pins.items() if r is not old}
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [{"alive": r.alive, "in_flight": r.in_flight, "served": self._served[id(r)]}
+                for r in self.replicas]
+
+    async def close(self, timeout: float = 5.0) -> None:
+        await asyncio.gather(*(r.close(timeout) for r in self.replicas))
+
+
+# ─── Admission Control ───
+
+DEFAULT_MAX_QUEUE = 100
+
+
+class AdmissionGate:
+    """Per-backend concurrency limit with a bounded FIFO wait queue.
+
+    Up to ``max_concurrency`` calls run at once; further calls wait in arrival
+    order, and once ``max_queue`` are waiting new calls are shed immediately.
+    A ``max_concurrency`` of None means unlimited (the gate only counts).
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 max_queue: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue if max_queue is not None else DEFAULT_MAX_QUEUE
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.peak_queue = 0
+        self._waited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AdmissionGate":
+        return cls(config.get("max_concurrency"), config.get("max_queue"))
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in line if needed. False if the queue is full."""
+        if self.max_concurrency is None or (
+                self.active < self.max_concurrency and not self._waiters):
+            self.active += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.peak_queue = max(self.peak_queue, len(self._waiters))
+        started = loop.time()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                self.release()  # slot was already handed to us — pass it on
+            raise
+        waited = loop.time() - started
+        self._waited += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active, "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency, "max_queue": self.max_queue,
+            "admitted": self.admitted, "rejected": self.rejected,
+            "peak_queue": self.peak_queue,
+            "avg_wait_ms": round(self._wait_total / self._waited * 1000, 1) if self._waited else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 1),
+        }
+
+
+# ─── Result Cache ───
+
+DEFAULT_RESULT_TTL = 60.0
+DEFAULT_RESULT_CACHE_ENTRIES = 1024
+DEFAULT_RESULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ResultCache:
+    """LRU cache of tool results with per-entry TTL and an optional disk tier.
+
+    Entries are keyed by a hash of (server, tool, canonical JSON arguments)
+    and kept serialized, so every hit returns a fresh copy and sizes are
+    exact. Entries stored with ``persist`` are also written to ``directory``
+    and survive restarts. ``invalidate`` drops a server's entries after a
+    call that may have changed its state. Used only on the BackendManager
+    event loop.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_RESULT_TTL,
+                 max_entries: int = DEFAULT_RESULT_CACHE_ENTRIES,
+                 max_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+                 directory: Optional[Path] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        # key → (expires, result, server)
+        self._entries: "OrderedDict[str, Tuple[float, bytes, str]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self._invalidated: Dict[str, float] = {}  # server → time of its last invalidate()
+        # server → hits/disk_hits/misses/stores/invalidated
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], default_dir: Path) -> "ResultCache":
+        """Build from the top-level ``result_cache`` object of mcp.json."""
+        directory = config.get("dir")
+        return cls(float(config.get("ttl", DEFAULT_RESULT_TTL)),
+                   int(config.get("max_entries", DEFAULT_RESULT_CACHE_ENTRIES)),
+                   int(config.get("max_bytes", DEFAULT_RESULT_CACHE_BYTES)),
+                   Path(directory).expanduser() if directory else default_dir)
+
+    @staticmethod
+    def key(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"),
+                               ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{server_name}\0{tool_name}\0{canonical}".encode()).hexdigest()
+
+    async def get(self, server_name: str, key: str, persist: bool = False) -> Optional[Dict[str, Any]]:
+        """Cached result for ``key``, checking the disk tier when ``persist`` is set."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self._count(server_name, "hits")
+                return json_loads(entry[1])
+            self._drop(key)
+        if persist and self.directory is not None:
+            stored = await asyncio.to_thread(self._read_disk, key, now,
+                                             self._invalidated.get(server_name, 0.0))
+            if stored is not None:
+                self._remember(key, *stored, server_name)
+                self._count(server_name, "disk_hits")
+                return json_loads(stored[1])
+        self._count(server_name, "misses")
+        return None
+
+    async def put(self, server_name: str, key: str, result: Dict[str, Any],
+                  ttl: float, persist: bool = False, issued: Optional[float] = None) -> None:
+        """Store ``result``; skipped if the server was invalidated after ``issued``."""
+        if issued is not None and issued < self._invalidated.get(server_name, 0.0):
+            return  # a write finished while this read was in flight
+        data = json_dumpb(result)
+        if len(data) > self.max_bytes:
+            return
+        expires = time.time() + ttl
+        self._remember(key, expires, data, server_name)
+        self._count(server_name, "stores")
+        if persist and self.directory is not None:
+            await asyncio.to_thread(self._write_disk, key, expires, data)
+
+    def invalidate(self, server_name: str) -> None:
+        """Forget ``server_name``'s results; disk entries written before now read as stale."""
+        self._invalidated[server_name] = time.time()
+        stale = [key for key, entry in self._entries.items() if entry[2] == server_name]
+        for key in stale:
+            self._drop(key)
+        self._count(server_name, "invalidated", len(stale))
+
+    def _count(self, server_name: str, field: str, n: int = 1) -> None:
+        counters = self.counters.setdefault(
+            server_name, {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "invalidated": 0})
+        counters[field] += n
+
+    def _remember(self, key: str, expires: float, data: bytes, server_name: str) -> None:
+        self._drop(key)
+        self._entries[key] = (expires, data, server_name)
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    # Disk entries are "<expires>\n<result JSON>"; the tier is best-effort.
+
+    def _read_disk(self, key: str, now: float, since: float) -> Optional[Tuple[float, bytes]]:
+        path = self.directory / f"{key}.json"
+        try:
+            header, data = path.read_bytes().split(b"\n", 1)
+            expires = float(header)
+            if expires > now and path.stat().st_mtime >= since:
+                return expires, data
+            path.unlink()
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _write_disk(self, key: str, expires: float, data: bytes) -> None:
+        path = self.directory / f"{key}.json"
+        tmp = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(f"{expires}\n".encode() + data)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        totals = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "invalidated": 0}
+        for counters in self.counters.values():
+            for field, value in counters.items():
+                totals[field] += value
+        lookups = totals["hits"] + totals["disk_hits"] + totals["misses"]
+        return {
+            **totals,
+            "hit_rate": round((totals["hits"] + totals["disk_hits"]) / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries), "bytes": self._bytes,
+            "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "dir": str(self.directory) if self.directory else None,
+        }
+
+
+# ─── Result Condensation ───
+
+# Stages applied when ``condense_results`` is just ``true``
+DEFAULT_CONDENSE_RULES: Dict[str, Any] = {
+    "strip_ansi": True, "strip": [], "minify_json": True, "collapse_whitespace": True,
+    "max_chars": None,
+}
+
+
+class ResultCondenser:
+    """Runs ``condense_output`` over tool results and counts the bytes it saves.
+
+    ``defaults`` (from the top-level ``condense_results``) applies to every
+    tool; a server's ``condense_tools`` maps tool names to rule overrides, or
+    to ``false`` to leave that tool's output alone. With no defaults, only
+    tools named in ``condense_tools`` are condensed.
+    """
+
+    def __init__(self, defaults: Optional[Dict[str, Any]] = None):
+        self.defaults = dict(DEFAULT_CONDENSE_RULES, **defaults) if defaults is not None else None
+        # (server, tool) -> [calls, bytes_in, bytes_out]
+        self.counters: Dict[Tuple[str, str], List[int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ResultCondenser"]:
+        """Build from mcp.json; None when neither ``condense_results`` nor any ``condense_tools`` is set."""
+        setting = config.get("condense_results")
+        per_tool = any(cfg.get("condense_tools") for cfg in config.get("servers", {}).values())
+        if not setting and not per_tool:
+            return None
+        return cls((setting if isinstance(setting, dict) else {}) if setting else None)
+
+    def rules(self, server_cfg: Dict[str, Any], tool_name: str) -> Optional[Dict[str, Any]]:
+        override = (server_cfg.get("condense_tools") or {}).get(tool_name)
+        if override is False:
+            return None
+        if isinstance(override, dict):
+            return {**(self.defaults or DEFAULT_CONDENSE_RULES), **override}
+        if override is True:
+            return self.defaults or DEFAULT_CONDENSE_RULES
+        return self.defaults
+
+    def apply(self, server: str, tool_name: str, result: Dict[str, Any],
+              rules: Dict[str, Any]) -> Dict[str, Any]:
+        """A copy of ``result`` with each text block condensed (errors are left as they are)."""
+        content = result.get("content")
+        if result.get("isError") or not isinstance(content, list):
+            return result
+        before = after = 0
+        blocks = []
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "text" and block.get("text"):
+                text = condense_output(block["text"], rules)
+                before += len(block["text"].encode("utf-8"))
+                after += len(text.encode("utf-8"))
+                block = dict(block, text=text)
+            blocks.append(block)
+        counts = self.counters.setdefault((server, tool_name), [0, 0, 0])
+        counts[0] += 1
+        counts[1] += before
+        counts[2] += after
+        return dict(result, content=blocks)
+
+    def stats(self, server: str) -> Dict[str, Dict[str, Any]]:
+        """Per-tool calls, bytes in/out and percentage saved for one server."""
+        report = {}
+        for (srv, tool), (calls, before, after) in list(self.counters.items()):
+            if srv == server:
+                report[tool] = {"calls": calls, "bytes_in": before, "bytes_out": after,
+                                "saved_pct": round((1 - after / before) * 100, 1) if before else 0.0}
+        return report
+
+
+# ─── Large Results ───
+
+# Tool output longer than this many characters is parked in the spill store
+# and replaced by a handle and a preview (``large_results.inline_limit``).
+DEFAULT_INLINE_LIMIT = 100_000
+DEFAULT_PREVIEW_CHARS = 2_000
+DEFAULT_SPILL_BYTES = 512 * 1024 * 1024
+DEFAULT_SESSION_SPILL_BYTES = 128 * 1024 * 1024
+DEFAULT_SPILL_HANDLES = 256
+DEFAULT_PAGE_BYTES = 32_000
+
+
+class _Spilled:
+    """One parked result: an unlinked temp file mapped read-only."""
+
+    __slots__ = ("file", "view", "size", "session", "tool")
+
+    def __init__(self, data: bytes, session: str, tool: str):
+        self.file = tempfile.TemporaryFile(prefix="toolmux-result-")
+        self.file.write(data)
+        self.file.flush()
+        self.view = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(data)
+        self.session = session
+        self.tool = tool
+
+    def close(self) -> None:
+        self.view.close()
+        self.file.close()
+
+
+class SpillStore:
+    """Oversized tool results kept out of the response and read back in pages.
+
+    Each result goes to its own memory-mapped temp file behind a random
+    handle. Handles are evicted least-recently-used first, to stay within
+    ``max_bytes`` and ``max_handles`` overall and ``session_bytes`` per
+    client session.
+    """
+
+    def __init__(self, inline_limit: int = DEFAULT_INLINE_LIMIT,
+                 preview_chars: int = DEFAULT_PREVIEW_CHARS,
+                 max_bytes: int = DEFAULT_SPILL_BYTES,
+                 session_bytes: int = DEFAULT_SESSION_SPILL_BYTES,
+                 max_handles: int = DEFAULT_SPILL_HANDLES):
+        self.inline_limit = inline_limit
+        self.preview_chars = preview_chars
+        self.max_bytes = max_bytes
+        self.session_bytes = session_bytes
+        self.max_handles = max_handles
+        self._items: "OrderedDict[str, _Spilled]" = OrderedDict()
+        self._bytes = 0
+        self._session_bytes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.spilled = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, setting: Any) -> Optional["SpillStore"]:
+        """Store for the top-level ``large_results``, or None when it is off (the default).
+
+        ``large_results`` is ``true`` for the default limits or an object overriding them.
+        """
+        if not setting:
+            return None
+        options = setting if isinstance(setting, dict) else {}
+        return cls(int(options.get("inline_limit", DEFAULT_INLINE_LIMIT)),
+                   int(options.get("preview_chars", DEFAULT_PREVIEW_CHARS)),
+                   int(options.get("max_bytes", DEFAULT_SPILL_BYTES)),
+                   int(options.get("session_bytes", DEFAULT_SESSION_SPILL_BYTES)),
+                   int(options.get("max_handles", DEFAULT_SPILL_HANDLES)))
+
+    def spill(self, text: str, session: str, tool_name: str) -> str:
+        """Park ``text`` and return the preview and handle notice that replace it."""
+        data = text.encode("utf-8")
+        preview = text[:self.preview_chars]
+        if len(data) > min(self.max_bytes, self.session_bytes):
+            return (f"[Result from {tool_name} truncated: {len(data):,} bytes is more than the "
+                    f"large-result store holds. Showing the first {len(preview):,} characters.]\n"
+                    f"{preview}")
+        handle = f"r-{os.urandom(6).hex()}"
+        item = _Spilled(data, session, tool_name)
+        with self._lock:
+            self._make_room(item.size, session)
+            self._items[handle] = item
+            self._bytes += item.size
+            self._session_bytes[session] = self._session_bytes.get(session, 0) + item.size
+            self.spilled += 1
+        return (f"[Large result from {tool_name}: {len(data):,} bytes stored as handle "
+                f"{handle}. Showing the first {len(preview):,} characters. Read more with "
+                f"read_result(handle=\"{handle}\", offset={len(preview.encode('utf-8'))}).]\n"
+                f"{preview}")
+
+    def _make_room(self, size: int, session: str) -> None:
+        """Evict LRU handles (the session's own first if it is over its cap). Caller holds the lock."""
+        while self._session_bytes.get(session, 0) + size > self.session_bytes:
+            victim = next(h for h, it in self._items.items() if it.session == session)
+            self._evict(victim)
+        while self._items and (self._bytes + size > self.max_bytes
+                               or len(self._items) >= self.max_handles):
+            self._evict(next(iter(self._items)))
+
+    def _evict(self, handle: str) -> None:
+        item = self._items.pop(handle)
+        self._bytes -= item.size
+        self._session_bytes[item.session] -= item.size
+        if not self._session_bytes[item.session]:
+            del self._session_bytes[item.session]
+        self.evictions += 1
+        item.close()
+
+    def read(self, handle: str, offset: int = 0, length: int = DEFAULT_PAGE_BYTES) -> str:
+        """Up to ``length`` bytes from ``offset``, trimmed to whole UTF-8 characters."""
+        with self._lock:
+            item = self._items.get(handle)
+            if item is None:
+                return (f"Error: result handle '{handle}' not found — it expired or was evicted. "
+                        "Run the tool again to get a fresh handle.")
+            self._items.move_to_end(handle)
+            view = item.view
+            start = max(0, min(offset, item.size))
+            # Never start or stop inside a multi-byte character
+            while start < item.size and view[start] & 0xC0 == 0x80:
+                start += 1
+            end = min(item.size, start + max(1, min(length, self.inline_limit)))
+            while end > start and end < item.size and view[end] & 0xC0 == 0x80:
+                end -= 1
+            if end == start < item.size:
+                # ``length`` is shorter than this character: return it whole so paging advances
+                end += 1
+                while end < item.size and view[end] & 0xC0 == 0x80:
+                    end += 1
+            text = view[start:end].decode("utf-8")
+        status = (f"next offset={end}" if end < item.size else "end of result")
+        return f"[{handle}: bytes {start}-{end} of {item.size:,}; {status}]\n{text}"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"handles": len(self._items), "bytes": self._bytes, "spilled": self.spilled,
+                    "evictions": self.evictions, "sessions": len(self._session_bytes),
+                    "inline_limit": self.inline_limit}
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in list(self._items):
+                self._evict(handle)
+
+
+def _session_key(ctx: Optional[Context]) -> str:
+    """The MCP client session a call belongs to ("default" outside a request)."""
+    try:
+        return ctx.session_id if ctx is not None else "default"
+    except RuntimeError:
+        return "default"
+
+
+# ─── Request Coalescing ───
+
+class SingleFlight:
+    """Share one in-flight coroutine among concurrent callers with the same key.
+
+    The first caller starts the work as a task; later callers with the same
+    key await that task instead of starting their own. The task is only
+    cancelled once every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, List[Any]] = {}  # key → [task, waiters]
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, start: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Result of the shared call for ``key``, and whether it was already running."""
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = self._flights[key] = [asyncio.ensure_future(start()), 0]
+            flight[0].add_done_callback(lambda _: self._forget(key, flight))
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if flight[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            flight[1] -= 1
+
+    def _forget(self, key: str, flight: List[Any]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# ─── Health Checks ───
+
+DEFAULT_PING_INTERVAL = 30.0
+DEFAULT_PING_TIMEOUT = 10.0
+DEFAULT_PING_MISSES = 3
+PING_WINDOW = 20
+
+
+def _percentile(ordered: List[float], pct: int) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+class BackendHealth:
+    """Rolling ping latencies and consecutive misses for one backend.
+
+    Misses are counted per unit (the session, or each replica of a pool),
+    so one hung replica can be restarted without blaming the others.
+    """
+
+    def __init__(self, max_misses: int = DEFAULT_PING_MISSES):
+        self.max_misses = max_misses
+        self.latencies: Deque[float] = deque(maxlen=PING_WINDOW)
+        self.misses: Dict[int, int] = {}  # unit index → consecutive misses
+        self.total_misses = 0
+        self.last_ping: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return all(m < self.max_misses for m in self.misses.values())
+
+    def record(self, unit: int, latency: float) -> None:
+        self.latencies.append(latency)
+        self.misses[unit] = 0
+        self.last_ping = datetime.now(timezone.utc).isoformat()
+
+    def miss(self, unit: int) -> bool:
+        """Count a missed ping; True once the unit reaches ``max_misses``."""
+        self.misses[unit] = self.misses.get(unit, 0) + 1
+        self.total_misses += 1
+        self.last_ping = datetime.now(timezone.utc).isoformat()
+        return self.misses[unit] >= self.max_misses
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact view for get_tool_count."""
+        avg = sum(self.latencies) / len(self.latencies) if self.latencies else None
+        return {"healthy": self.healthy,
+                "avg_ms": round(avg * 1000, 1) if avg is not None else None}
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+        return {
+            **self.summary(),
+            "last_ms": ms(self.latencies[-1] if ordered else None),
+            "p95_ms": ms(_percentile(ordered, 95) if ordered else None),
+            "max_ms": ms(ordered[-1] if ordered else None),
+            "samples": len(ordered),
+            "consecutive_misses": max(self.misses.values(), default=0),
+            "total_misses": self.total_misses,
+            "last_ping": self.last_ping,
+        }
+
+
+# ─── Circuit Breakers ───
+
+# A breaker opens once BREAKER_FAILURE_RATE of the last BREAKER_WINDOW calls
+# failed (with at least BREAKER_MIN_CALLS seen), or after BREAKER_MAX_TIMEOUTS
+# deadline expiries in a row. It stays open BREAKER_OPEN_SECONDS, doubling
+# (capped) each time the half-open probe fails.
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 5
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_MAX_TIMEOUTS = 3
+BREAKER_OPEN_SECONDS = 30.0
+BREAKER_OPEN_MAX = 300.0
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one backend.
+
+    Closed: calls go through and their outcomes fill a rolling window.
+    Open: calls fail fast until the cool-down ends. Half-open: one probe call
+    goes through; success closes the breaker, failure opens it again for
+    twice as long. Only backend failures count (timeouts, transport errors,
+    crashes); a JSON-RPC error or a tool reporting ``isError`` means the
+    backend answered.
+    """
+
+    def __init__(self, failure_rate: float = BREAKER_FAILURE_RATE,
+                 window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 max_timeouts: int = BREAKER_MAX_TIMEOUTS,
+                 open_seconds: float = BREAKER_OPEN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.max_timeouts = max_timeouts
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = failed
+        self._timeout_streak = 0
+        self._opened_at: Optional[float] = None
+        self._open_for = open_seconds
+        self._probing = False
+        self.last_error: Optional[str] = None
+        self.trips = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["CircuitBreaker"]:
+        """Breaker for one server's config, or None if it has none.
+
+        ``circuit_breaker`` is ``true``/``false`` or an object overriding
+        ``failure_rate``, ``window``, ``min_calls``, ``max_timeouts`` and
+        ``open_seconds``. HTTP servers get one by default, stdio servers
+        (already covered by crash recovery and pings) only when asked.
+        """
+        setting = config.get("circuit_breaker", config.get("transport") == "http")
+        if not setting:
+            return None
+        options = setting if isinstance(setting, dict) else {}
+        return cls(float(options.get("failure_rate", BREAKER_FAILURE_RATE)),
+                   int(options.get("window", BREAKER_WINDOW)),
+                   int(options.get("min_calls", BREAKER_MIN_CALLS)),
+                   int(options.get("max_timeouts", BREAKER_MAX_TIMEOUTS)),
+                   float(options.get("open_seconds", BREAKER_OPEN_SECONDS)))
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self.retry_in() == 0 else "open"
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is let through (0 once half-open)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now; half-open admits one probe."""
+        state = self.state
+        if state == "closed" or (state == "half_open" and not self._probing):
+            self._probing = state == "half_open"
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, failure: Optional[str] = None, timeout: bool = False) -> None:
+        """Count a finished call: ``failure`` describes a backend failure, None a success."""
+        if failure is None:
+            self._timeout_streak = 0
+            if self._opened_at is not None and self._probing:
+                self._opened_at, self._open_for = None, self.open_seconds
+                self._outcomes.clear()
+            self._probing = False
+            self._outcomes.append(False)
+            return
+        self.last_error = failure
+        self._timeout_streak = self._timeout_streak + 1 if timeout else 0
+        self._outcomes.append(True)
+        if self._probing:
+            self._probing = False
+            self._trip(min(self._open_for * 2, BREAKER_OPEN_MAX))
+        elif self._opened_at is None and (
+                self._timeout_streak >= self.max_timeouts
+                or (len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate)):
+            self._trip(self.open_seconds)
+
+    def abandon(self) -> None:
+        """The call was cancelled before an outcome; free the probe slot."""
+        self._probing = False
+
+    def _trip(self, open_for: float) -> None:
+        self._opened_at, self._open_for = self._clock(), open_for
+        self.trips += 1
+
+    def message(self, server_name: str) -> str:
+        """Fail-fast error for a call refused while the breaker is open."""
+        failed = sum(self._outcomes)
+        if self.state == "half_open":
+            wait = "a probe call is in flight; retry shortly"
+        else:
+            wait = f"next probe in {self.retry_in():.1f}s"
+        return (f"Server '{server_name}' circuit open after {failed} of its last "
+                f"{len(self._outcomes)} calls failed (last error: {self.last_error}); "
+                f"failing fast, {wait}.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "retry_in_s": round(self.retry_in(), 1),
+                "failures": sum(self._outcomes), "calls": len(self._outcomes),
+                "trips": self.trips, "rejected": self.rejected,
+                "last_error": self.last_error}
+
+
+# ─── Retries ───
+
+# Transient failures (connection resets, 502/503/504, a stdio process that
+# died under the call) of idempotent tools are retried up to
+# DEFAULT_RETRY_ATTEMPTS times, sleeping a random 0..min(max, base × 2^n)
+# ("full jitter") between attempts.
+DEFAULT_RETRY_ATTEMPTS = 2
+DEFAULT_RETRY_BASE_DELAY = 0.1
+DEFAULT_RETRY_MAX_DELAY = 2.0
+# Across all backends, retries in any RETRY_BUDGET_WINDOW seconds may not
+# exceed RETRY_BUDGET_MIN plus RETRY_BUDGET_RATIO of the calls made.
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN = 10
+RETRY_BUDGET_WINDOW = 10.0
+
+
+class RetryPolicy:
+    """How many times one tool's transient failures are retried, and how long to back off."""
+
+    def __init__(self, attempts: int = DEFAULT_RETRY_ATTEMPTS,
+                 base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 max_delay: float = DEFAULT_RETRY_MAX_DELAY):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def for_tool(cls, server_cfg: Dict[str, Any], tool_name: str,
+                 idempotent: bool) -> Optional["RetryPolicy"]:
+        """Policy for one tool, or None if its calls must not be retried.
+
+        The server's ``retry`` (``false`` or overrides of ``attempts``,
+        ``base_delay``, ``max_delay``) applies to tools the backend annotates
+        read-only or idempotent. A ``retry_tools`` entry overrides it per
+        tool: ``false``, or ``true``/overrides, which also vouches that an
+        unannotated tool is safe to repeat.
+        """
+        setting = server_cfg.get("retry", True)
+        rule = (server_cfg.get("retry_tools") or {}).get(tool_name)
+        if setting is False or rule is False or (rule is None and not idempotent):
+            return None
+        options = {**(setting if isinstance(setting, dict) else {}),
+                   **(rule if isinstance(rule, dict) else {})}
+        policy = cls(int(options.get("attempts", DEFAULT_RETRY_ATTEMPTS)),
+                     float(options.get("base_delay", DEFAULT_RETRY_BASE_DELAY)),
+                     float(options.get("max_delay", DEFAULT_RETRY_MAX_DELAY)))
+        return policy if policy.attempts > 0 else None
+
+    def delay(self, attempt: int) -> float:
+        """Jittered back-off before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
 
-    def initialize(self) -> bool:
-        if self._initialized:
-            return True
-        init_response = self.call_rpc("initialize", {
-            "protocolVersion": "2024-11-05", "capabilities": {},
-            "clientInfo": {"name": "ToolMux", "version": VERSION}})
-        if "error" in init_response:
+
+class RetryBudget:
+    """Caps retries across all backends so they cannot amplify an outage.
+
+    Within any ``window`` seconds, at most ``min_retries`` plus ``ratio`` of
+    the calls made may be retried; past that, failures are returned as is.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_retries: int = RETRY_BUDGET_MIN,
+                 window: float = RETRY_BUDGET_WINDOW, clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._calls: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.spent = 0
+        self.denied = 0
+
+    @classmethod
+    def from_config(cls, setting: Any) -> "RetryBudget":
+        """Budget from the top-level ``retry_budget``; ``false`` allows no retries at all."""
+        if setting is False:
+            return cls(0.0, 0)
+        options = setting if isinstance(setting, dict) else {}
+        return cls(float(options.get("ratio", RETRY_BUDGET_RATIO)),
+                   int(options.get("min_retries", RETRY_BUDGET_MIN)),
+                   float(options.get("window", RETRY_BUDGET_WINDOW)))
+
+    def _trim(self, now: float) -> None:
+        for stamps in (self._calls, self._retries):
+            while stamps and stamps[0] <= now - self.window:
+                stamps.popleft()
+
+    def record_call(self) -> None:
+        now = self._clock()
+        self._trim(now)
+        self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False once it is used up."""
+        now = self._clock()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+            self.denied += 1
             return False
-        self.call_rpc("notifications/initialized")
-        self._initialized = True
+        self._retries.append(now)
+        self.spent += 1
         return True
 
-    def get_tools(self) -> List[Dict[str, Any]]:
-        if not self.initialize():
-            return []
-        response = self.call_rpc("tools/list")
-        if "error" in response:
-            return []
-        return response.get("result", {}).get("tools", [])
+    def stats(self) -> Dict[str, Any]:
+        self._trim(self._clock())
+        return {"ratio": self.ratio, "min_retries": self.min_retries, "window_s": self.window,
+                "calls_in_window": len(self._calls), "retries_in_window": len(self._retries),
+                "retries": self.spent, "denied": self.denied}
 
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        if not self.initialize():
-            return {"error": "Failed to initialize HTTP MCP connection"}
-        response = self.call_rpc("tools/call", {"name": tool_name, "arguments": arguments})
-        if "error" in response:
-            return {"error": response["error"]["message"]}
-        return response.get("result", {"error": "No result returned"})
+
+# ─── Call Deadlines ───
+
+# Deadline for a tools/call when neither the server nor the tool sets one
+# and too few calls have been seen to derive one.
+DEFAULT_CALL_TIMEOUT = 600.0
+# Adaptive deadlines: ADAPTIVE_TIMEOUT_FACTOR × the tool's p99 latency over
+# its last LATENCY_WINDOW calls, never below ADAPTIVE_TIMEOUT_FLOOR, once
+# ADAPTIVE_MIN_SAMPLES calls have completed.
+LATENCY_WINDOW = 100
+ADAPTIVE_MIN_SAMPLES = 20
+ADAPTIVE_TIMEOUT_FACTOR = 5.0
+ADAPTIVE_TIMEOUT_FLOOR = 30.0
+
+
+def adaptive_deadline(samples: Deque[float]) -> Optional[float]:
+    """Deadline derived from observed latencies, or None if there are too few."""
+    if len(samples) < ADAPTIVE_MIN_SAMPLES:
+        return None
+    p99 = _percentile(sorted(samples), 99)
+    return min(DEFAULT_CALL_TIMEOUT, max(ADAPTIVE_TIMEOUT_FLOOR, p99 * ADAPTIVE_TIMEOUT_FACTOR))
 
 
 # ─── BackendManager ───
 
+# Crashed stdio backends restart immediately the first time, then after
+# 0.5s, 1s, 2s, ... (capped) while they keep crashing. A process that ran
+# for RESTART_STABLE_AFTER seconds resets the streak.
+RESTART_BACKOFF_BASE = 0.5
+RESTART_BACKOFF_MAX = 30.0
+RESTART_STABLE_AFTER = 60.0
+
+
 class BackendManager:
-    """Manages connections to backend MCP servers (stdio and HTTP)."""
+    """Manages connections to backend MCP servers (stdio and HTTP).
+
+    All backend I/O runs on a dedicated event loop thread. FastMCP handlers
+    use ``call_tool_async``, which never blocks their own loop; ``call_tool``
+    and the other synchronous methods are thin wrappers for the CLI.
+
+    With ``lazy=True``, servers whose tools were preloaded from the build
+    cache are only started on their first call (unless marked ``eager``).
+    With an ``idle_timeout`` (seconds, overridable per server), backends with
+    no calls for that long are shut down and restarted on next use.
+
+    Stdio backends that crash are restarted automatically (``auto_restart``,
+    default on) with exponential backoff; with ``hot_spare`` an already
+    initialized standby process takes over at once.
+
+    Every tools/call has a deadline: the tool's entry in ``tool_timeouts``,
+    else the server's ``call_timeout``, else the manager-wide one, else one
+    derived from the tool's observed latency. On expiry or cancellation the
+    backend is sent ``notifications/cancelled`` and the admission slot is freed.
+
+    Identical concurrent calls to read-only tools share one backend
+    request (single-flight) and every caller gets its result.
+
+    With a ``result_cache``, calls to tools listed in a server's
+    ``cache_tools`` (or annotated read-only) are answered from the cache
+    while fresh, without touching the backend.
 
-    def __init__(self, servers_config: Dict[str, Dict[str, Any]]):
+    Backends with a circuit breaker (HTTP by default) fail fast while it is
+    open instead of waiting out a timeout on every call.
+
+    Transient failures of idempotent tools (connection resets, 502/503/504,
+    a stdio process that died under the call) are retried with jittered
+    back-off, within a ``retry_budget`` shared by all backends.
+
+    Running backends get an MCP ``ping`` every ``ping_interval`` seconds.
+    A stdio process that misses ``ping_misses`` pings in a row is treated
+    as crashed and goes through the same restart path.
+    """
+
+    def __init__(self, servers_config: Dict[str, Dict[str, Any]], lazy: bool = False,
+                 idle_timeout: Optional[float] = None,
+                 ping_interval: Optional[float] = DEFAULT_PING_INTERVAL,
+                 call_timeout: Optional[float] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 spill_store: Optional[SpillStore] = None,
+                 condenser: Optional[ResultCondenser] = None,
+                 http_sessions: Optional[HttpSessionCache] = None,
+                 retry_budget: Optional[RetryBudget] = None):
         self.servers = servers_config
+        self.lazy = lazy
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.call_timeout = call_timeout
+        self.result_cache = result_cache
+        self.spill_store = spill_store  # large results handed out by handle (see render_result)
+        self.condenser = condenser
+        self.http_sessions = http_sessions
         self.server_processes: Dict[str, Any] = {}
         self.tool_cache: List[Dict[str, Any]] = []
         self._described_tools: Set[str] = set()
@@ -437,58 +2614,129 @@ class BackendManager:
         self._lock = threading.Lock()
         self._bundle_fixes: Dict[str, Dict[str, Any]] = {}  # servers fixed via bundle fallback
         self._failed_servers: Dict[str, str] = {}  # name → error reason
+        self._ready: Dict[str, asyncio.Event] = {}  # name → set once init finished (ok or failed)
+        self._gates: Dict[str, AdmissionGate] = {
+            name: AdmissionGate.from_config(cfg) for name, cfg in servers_config.items()}
+        self._preloaded: Set[str] = set()  # servers whose tools came from the build cache
+        self._last_used: Dict[str, float] = {}  # name → loop time of last call or start
+        self._spares: Dict[str, StdioSession] = {}  # name → initialized standby (hot_spare)
+        self._crash_streak: Dict[str, int] = {}  # name → consecutive quick crashes
+        self._restarts: Dict[str, int] = {}  # name → automatic restarts so far
+        self._health: Dict[str, BackendHealth] = {}  # name → ping history
+        self._housekeeping: Set[asyncio.Task] = set()  # reaper / ping loops, cancelled on shutdown
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}  # (server, tool) → call durations
+        self._timeouts: Dict[str, int] = {}  # name → calls that hit their deadline
+        self._breakers: Dict[str, Optional[CircuitBreaker]] = {}  # name → breaker (None: disabled)
+        self.retry_budget = retry_budget or RetryBudget()  # shared by all backends
+        self._retries: Dict[str, Dict[str, int]] = {}  # name → retried / recovered / budget_denied
+        self._flights = SingleFlight()
+        self._coalesced: Dict[str, int] = {}  # name → calls that shared another call's request
+        self._http_pools = HttpPools()  # HTTP backends on one origin share connections
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the backend event loop thread on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True,
+                                 name="toolmux-backends").start()
+            return self._loop
+
+    def _submit(self, coro):
+        """Schedule a coroutine on the backend loop; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the backend loop and block until it finishes."""
+        future = self._submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def preload_tools(self, tools: List[Dict[str, Any]]) -> None:
+        """Seed the tool catalog (e.g. from the build cache) before any backend starts."""
+        with self._lock:
+            self.tool_cache.extend(tools)
+            self._preloaded.update(t["_server"] for t in tools)
+
+    def _is_deferred(self, server_name: str) -> bool:
+        """True if a lazy server can wait for its first call to start."""
+        return (self.lazy and server_name in self._preloaded
+                and not self.servers.get(server_name, {}).get("eager"))
 
     def initialize_all_async(self):
-        """Start parallel initialization in a background thread."""
-        t = threading.Thread(target=self._init_all, daemon=True)
-        t.start()
-
-    def _init_all(self):
-        """Initialize all backends in parallel using a thread pool."""
-        # Use the max configured timeout across all servers (default 120s)
-        max_timeout = max(
-            (cfg.get("timeout", 120000) / 1000 for cfg in self.servers.values()),
-            default=120
-        )
-        try:
-            with ThreadPoolExecutor(max_workers=min(10, len(self.servers) or 1)) as pool:
-                futures = {pool.submit(self._init_server, name): name
-                           for name in self.servers}
-                done_names: set = set()
-                for future in as_completed(futures, timeout=max_timeout):
-                    name = futures[future]
-                    done_names.add(name)
-                    try:
-                        tools = future.result()
-                        if tools:
-                            with self._lock:
-                                self.tool_cache.extend(tools)
-                        else:
-                            with self._lock:
-                                self._failed_servers[name] = "returned 0 tools"
-                    except Exception as e:
-                        with self._lock:
-                            self._failed_servers[name] = str(e) or "unknown error"
-                # Any futures that didn't complete in time
-                for future, name in futures.items():
-                    if name not in done_names:
-                        with self._lock:
-                            self._failed_servers[name] = f"timed out after {max_timeout}s"
-        except Exception:
-            pass
+        """Start parallel initialization of all backends in the background.
+
+        In lazy mode only eager servers and servers without cached tools start now.
+        """
+        names = [n for n in self.servers if not self._is_deferred(n)]
+        for name in names:
+            self._ready.setdefault(name, asyncio.Event())
+        self._submit(self._init_all(names))
+        if any(self._server_idle_timeout(n) for n in self.servers):
+            self._submit(self._reap_idle())
+        if any(self._server_ping_interval(n) for n in self.servers):
+            self._submit(self._ping_loop())
+
+    async def _init_all(self, names: Optional[List[str]] = None):
+        """Initialize backends concurrently on the backend loop."""
+        await asyncio.gather(*(self._init_server(name) for name in (names or [])))
         # Log failures to stderr (safe — won't interfere with stdio protocol)
         with self._lock:
             for name, reason in self._failed_servers.items():
                 print(f"⚠ ToolMux: {name} failed to init: {reason}", file=sys.stderr)
         self._init_complete.set()
 
-    def _init_server(self, server_name: str) -> List[Dict[str, Any]]:
-        """Initialize a single backend server and return its tools.
+    def _init_timeout(self, server_name: str) -> float:
+        """Init timeout in seconds: stdio ``timeout`` is in ms, HTTP ``timeout`` in seconds."""
+        cfg = self.servers.get(server_name, {})
+        if cfg.get("transport") == "http":
+            return float(cfg.get("timeout", 30))
+        return cfg.get("timeout", 120000) / 1000
+
+    async def _init_server(self, server_name: str) -> List[Dict[str, Any]]:
+        """Initialize one backend, publish its tools and signal its readiness.
+
+        The server's readiness event is set whether init succeeds or fails;
+        failures are recorded in ``_failed_servers`` so callers can fail fast.
+        """
+        ready = self._ready.setdefault(server_name, asyncio.Event())
+        ready.clear()
+        timeout = self._init_timeout(server_name)
+        tools: List[Dict[str, Any]] = []
+        try:
+            tools = await asyncio.wait_for(self._discover_tools(server_name), timeout)
+            with self._lock:
+                if tools:
+                    # Replace any cached or earlier tools for this server
+                    self.tool_cache = [t for t in self.tool_cache
+                                       if t.get("_server") != server_name] + tools
+                    self._last_used[server_name] = asyncio.get_running_loop().time()
+                else:
+                    self._failed_servers[server_name] = "returned 0 tools"
+            if tools and self._wants_spare(server_name):
+                asyncio.ensure_future(self._refill_spare(server_name))
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._failed_servers[server_name] = f"timed out after {timeout}s"
+        except Exception as e:
+            with self._lock:
+                self._failed_servers[server_name] = str(e) or "unknown error"
+        finally:
+            ready.set()
+        return tools
+
+    async def _discover_tools(self, server_name: str) -> List[Dict[str, Any]]:
+        """Start a backend and list its tools.
 
         If the server starts but returns 0 tools, retries with bundle config
         (which may have different args the server needs).
         """
-        tools = self._try_init_server(server_name)
+        tools = await self._try_init_server(server_name)
         if tools:
             return tools
         # Server returned 0 tools — check if bundle has different args
@@ -499,53 +2747,33 @@ class BackendManager:
         bundle_args = bundle.get("args", [])
         if bundle_args != current.get("args", []) or bundle["command"] != current.get("command"):
             # Kill the failed process and retry with bundle config
-            proc = self.server_processes.pop(server_name, None)
-            if proc and hasattr(proc, "terminate"):
-                try:
-                    proc.terminate()
-                except Exception:
-                    pass
+            await self._close_server(self.server_processes.pop(server_name, None))
             patched = dict(current)
             patched["command"] = bundle["command"]
             patched["args"] = bundle_args
             self.servers[server_name] = patched
             self._bundle_fixes[server_name] = patched
-            return self._try_init_server(server_name)
+            return await self._try_init_server(server_name)
         return []
 
-    def _try_init_server(self, server_name: str) -> List[Dict[str, Any]]:
+    async def _try_init_server(self, server_name: str) -> List[Dict[str, Any]]:
         """Single attempt to init a server and get its tools."""
-        server = self.start_server(server_name)
+        server = await self._start_server(server_name)
         if not server:
             return []
         tools: List[Dict[str, Any]] = []
         try:
             if isinstance(server, HttpMcpClient):
-                raw_tools = server.get_tools()
-                for tool in raw_tools:
-                    tool["_server"] = server_name
-                    tool["_transport"] = "http"
-                    tools.append(tool)
+                transport = "http"
+                raw_tools = await server.get_tools_async()
             else:
-                init_req = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
-                    "protocolVersion": "2024-11-05", "capabilities": {},
-                    "clientInfo": {"name": "ToolMux", "version": VERSION}}}
-                server.stdin.write(json.dumps(init_req) + "\n")
-                server.stdin.flush()
-                server.stdout.readline()
-                notif = {"jsonrpc": "2.0", "method": "notifications/initialized"}
-                server.stdin.write(json.dumps(notif) + "\n")
-                server.stdin.flush()
-                tools_req = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
-                server.stdin.write(json.dumps(tools_req) + "\n")
-                server.stdin.flush()
-                line = server.stdout.readline()
-                if line:
-                    resp = json.loads(line)
-                    for tool in resp.get("result", {}).get("tools", []):
-                        tool["_server"] = server_name
-                        tool["_transport"] = "stdio"
-                        tools.append(tool)
+                transport = "stdio"
+                await server.initialize()
+                raw_tools = await server.get_tools()
+            for tool in raw_tools:
+                tool["_server"] = server_name
+                tool["_transport"] = transport
+                tools.append(tool)
         except Exception:
             pass
         return tools
@@ -556,6 +2784,9 @@ class BackendManager:
         If the configured command fails, automatically checks mcp-registry
         bundle files for the correct launch config and retries.
         """
+        return self._run(self._start_server(server_name))
+
+    async def _start_server(self, server_name: str):
         if server_name in self.server_processes:
             return self.server_processes[server_name]
         config = self.servers[server_name]
@@ -565,43 +2796,70 @@ class BackendManager:
                     base_url=config["base_url"],
                     headers=config.get("headers"),
                     timeout=config.get("timeout", 30),
-                    sse_endpoint=config.get("sse_endpoint"))
+                    sse_endpoint=config.get("sse_endpoint"),
+                    pools=self._http_pools, pool_config=config,
+                    compression=BodyCompressor.from_config(config))
+                if self.http_sessions is not None:
+                    saved = self.http_sessions.get(server_name, config["base_url"])
+                    if saved:
+                        client.restore(saved)
+                    client.on_negotiated = functools.partial(
+                        self.http_sessions.put, server_name, config["base_url"])
                 self.server_processes[server_name] = client
                 return client
             except Exception as e:
                 return None
-        proc = self._start_stdio_server(server_name, config)
+        proc = await self._start_stdio_pool(server_name, config)
+        if not proc:
+            # Command failed — try bundle fallback
+            bundle = resolve_bundle(server_name)
+            if bundle and bundle["command"] != config.get("command"):
+                patched = dict(config)
+                patched["command"] = bundle["command"]
+                patched["args"] = bundle.get("args", [])
+                proc = await self._start_stdio_pool(server_name, patched)
+                if proc:
+                    self.servers[server_name] = patched
+                    self._bundle_fixes[server_name] = patched
         if proc:
-            return proc
-        # Command failed — try bundle fallback
-        bundle = resolve_bundle(server_name)
-        if bundle and bundle["command"] != config.get("command"):
-            patched = dict(config)
-            patched["command"] = bundle["command"]
-            patched["args"] = bundle.get("args", [])
-            proc = self._start_stdio_server(server_name, patched)
-            if proc:
-                self.servers[server_name] = patched
-                self._bundle_fixes[server_name] = patched
-                return proc
-        return None
+            self.server_processes[server_name] = proc
+        return proc
+
+    async def _start_stdio_pool(self, server_name: str, config: Dict[str, Any]):
+        """Start ``replicas`` copies of a stdio server (default 1).
 
-    def _start_stdio_server(self, server_name: str, config: Dict[str, Any]):
-        """Attempt to start a stdio subprocess for the given config."""
+        Returns a bare StdioSession for a single replica, a ReplicaPool for
+        several, or None if no replica could be started.
+        """
+        count = max(1, int(config.get("replicas", 1)))
+        sessions = await asyncio.gather(
+            *(self._start_stdio_server(server_name, config) for _ in range(count)))
+        sessions = [s for s in sessions if s]
+        if not sessions:
+            return None
+        if count == 1:
+            return sessions[0]
+        return ReplicaPool(server_name, sessions, config.get("sticky_tools"))
+
+    async def _start_stdio_server(self, server_name: str, config: Dict[str, Any]):
+        """Attempt to start one stdio subprocess for the given config."""
         cmd = config.get("command", "")
         if not shutil.which(cmd):
             return None
         env = os.environ.copy()
         env.update(config.get("env", {}))
         try:
-            proc = subprocess.Popen(
-                [cmd] + config.get("args", []),
-                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
-                text=True, env=env, cwd=config.get("cwd"))
-            self.server_processes[server_name] = proc
-            return proc
+            proc = await asyncio.create_subprocess_exec(
+                cmd, *config.get("args", []),
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL, env=env, cwd=config.get("cwd"),
+                limit=STDIO_READ_CHUNK)
         except Exception:
             return None
+        session = StdioSession(server_name, proc, int(
+            config.get("max_message_bytes", DEFAULT_MAX_MESSAGE_BYTES)))
+        session.on_exit = self._on_session_exit
+        return session
 
     def wait_for_tools(self, timeout: float = 15.0) -> List[Dict[str, Any]]:
         """Block until initialization completes and return all tools."""
@@ -617,35 +2875,147 @@ class BackendManager:
         with self._lock:
             return dict(self._failed_servers)
 
+    def get_server_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-server runtime stats (admission queue depth, wait times, ...)."""
+        stats = {name: {"load": gate.stats(), "running": name in self.server_processes,
+                        "restarts": self._restarts.get(name, 0),
+                        "timeouts": self._timeouts.get(name, 0),
+                        "coalesced": self._coalesced.get(name, 0)}
+                 for name, gate in self._gates.items()}
+        for name in self.servers:
+            if self._wants_spare(name):
+                spare = self._spares.get(name)
+                stats.setdefault(name, {})["hot_spare"] = spare is not None and spare.alive
+        for name, server in list(self.server_processes.items()):
+            if isinstance(server, ReplicaPool):
+                stats.setdefault(name, {})["replicas"] = server.stats()
+            elif isinstance(server, HttpMcpClient):
+                entry = stats.setdefault(name, {})
+                entry["http"] = {"endpoint": server.endpoint, "session": server.session_id is not None,
+                                 "protocol_version": server.protocol_version,
+                                 "tools_list": dict(server.tools_revalidation)}
+                if server._pool_key is not None:
+                    entry["http_pool"] = self._http_pools.stats(server._pool_key)
+                if server.compression is not None:
+                    entry["compression"] = server.compression.stats()
+        for name, health in list(self._health.items()):
+            stats.setdefault(name, {})["health"] = health.stats()
+        for name, counts in list(self._retries.items()):
+            stats.setdefault(name, {})["retries"] = dict(counts)
+        for name in list(self.servers):
+            breaker = self._breaker(name)
+            if breaker is not None:
+                stats.setdefault(name, {})["circuit"] = breaker.stats()
+        if self.result_cache is not None:
+            for name, counters in list(self.result_cache.counters.items()):
+                stats.setdefault(name, {})["result_cache"] = dict(counters)
+        if self.condenser is not None:
+            for name in {srv for srv, _ in list(self.condenser.counters)}:
+                stats.setdefault(name, {})["condensed"] = self.condenser.stats(name)
+        return stats
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Overall result cache stats, or None when result caching is off."""
+        return self.result_cache.stats() if self.result_cache is not None else None
+
+    def get_health(self) -> Dict[str, Dict[str, Any]]:
+        """Compact per-server ping health (healthy flag and average latency)."""
+        return {name: health.summary() for name, health in list(self._health.items())}
+
+    def wait_for_server(self, server_name: str, timeout: float = 15.0) -> bool:
+        """Block until one server has finished initializing. True if it came up.
+
+        A lazy server that has not started yet is started now.
+        """
+        if server_name not in self._ready:
+            if server_name not in self.servers:
+                return False
+            self._run(self._spawn(server_name))
+        try:
+            self._run(self._ready[server_name].wait(), timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        return server_name not in self.get_failed_servers()
+
+    async def _spawn(self, server_name: str) -> None:
+        """Start a lazy (or reaped) server in the background; callers await its readiness."""
+        if server_name in self._ready:
+            return
+        self._ready[server_name] = asyncio.Event()
+        asyncio.ensure_future(self._init_server(server_name))
+
+    async def _wait_ready(self, server_name: str) -> Optional[str]:
+        """Wait for one server's init; return an error message if it is unusable.
+
+        Servers that are not running yet (lazy or reaped) are started first.
+        """
+        if server_name not in self._ready and server_name in self.servers:
+            await self._spawn(server_name)
+        ready = self._ready.get(server_name)
+        if ready is not None and not ready.is_set():
+            timeout = self._init_timeout(server_name)
+            try:
+                await asyncio.wait_for(ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return f"Server '{server_name}' still initializing after {timeout}s"
+        reason = self._failed_servers.get(server_name)
+        if reason:
+            return f"Server '{server_name}' failed to initialize: {reason}"
+        return None
+
+    def _find_tool_server(self, name: str) -> Optional[str]:
+        with self._lock:
+            for tool in self.tool_cache:
+                if tool["name"] == name:
+                    return tool["_server"]
+        return None
+
+    async def _resolve_server(self, name: str) -> Optional[str]:
+        """Find the server that owns a tool, waiting only as servers come up.
+
+        Each time a pending server finishes init its tools are checked, so a
+        tool on a fast backend resolves without waiting for slow ones.
+        """
+        deadline = asyncio.get_running_loop().time() + 30
+        while True:
+            server = self._find_tool_server(name)
+            if server:
+                return server
+            pending = [ev for ev in self._ready.values() if not ev.is_set()]
+            remaining = deadline - asyncio.get_running_loop().time()
+            if not pending or remaining <= 0:
+                break
+            waiters = [asyncio.ensure_future(ev.wait()) for ev in pending]
+            try:
+                await asyncio.wait(waiters, timeout=remaining,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for w in waiters:
+                    w.cancel()
+        # In gateway mode, name IS the server name
+        return name if name in self.servers else None
+
     def retry_server(self, server_name: str) -> Dict[str, Any]:
         """Re-initialize a failed server and add its tools to the cache."""
         if server_name not in self.servers:
             return {"error": f"Server '{server_name}' not in config"}
-        # Kill existing process if any
-        proc = self.server_processes.pop(server_name, None)
-        if proc:
-            try:
-                if isinstance(proc, HttpMcpClient):
-                    proc.close()
-                else:
-                    proc.stdin.close()
-                    proc.terminate()
-            except Exception:
-                pass
+        return self._run(self._retry_server(server_name))
+
+    async def _retry_server(self, server_name: str) -> Dict[str, Any]:
+        # Kill existing process (and standby) if any
+        await self._close_server(self.server_processes.pop(server_name, None))
+        await self._close_server(self._spares.pop(server_name, None))
         # Remove old tools for this server from cache
         with self._lock:
             self.tool_cache = [t for t in self.tool_cache if t.get("_server") != server_name]
             self._failed_servers.pop(server_name, None)
+        self._breakers.pop(server_name, None)  # an explicit retry starts with a closed breaker
         # Re-init
-        tools = self._init_server(server_name)
+        tools = await self._init_server(server_name)
         if tools:
-            with self._lock:
-                self.tool_cache.extend(tools)
             return {"success": True, "server": server_name, "tools": len(tools)}
-        else:
-            with self._lock:
-                self._failed_servers[server_name] = "retry returned 0 tools"
-            return {"error": f"Retry failed — {server_name} returned 0 tools"}
+        reason = self.get_failed_servers().get(server_name, "returned 0 tools")
+        return {"error": f"Retry failed — {server_name}: {reason}"}
 
     def persist_fixes(self, config: Dict[str, Any], config_path: Path) -> None:
         """Write any bundle-resolved fixes back to mcp.json so they stick."""
@@ -655,55 +3025,514 @@ class BackendManager:
             config.setdefault("servers", {})[name] = patched
         _save_config(config, config_path)
 
-    def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Route a tool call to the correct backend server."""
-        # Wait for backends if still initializing (first call after no-cache start)
-        if not self._init_complete.is_set():
-            self._init_complete.wait(timeout=30)
-        target_server = None
-        for tool in self.tool_cache:
-            if tool["name"] == name:
-                target_server = tool["_server"]
-                break
+    def call_tool(self, name: str, arguments: Dict[str, Any],
+                  server: Optional[str] = None) -> Dict[str, Any]:
+        """Route a tool call to the correct backend server, blocking until it returns."""
+        return self._run(self._call_tool(name, arguments, server))
+
+    async def call_tool_async(self, name: str, arguments: Dict[str, Any],
+                              server: Optional[str] = None,
+                              progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Route a tool call to the correct backend server without blocking the caller's loop.
+
+        Pass ``server`` when the owning backend is already known (gateway mode)
+        to skip the tool lookup. ``progress`` is called on the backend loop with
+        each progress notification the backend sends for this call.
+        """
+        return await asyncio.wrap_future(self._submit(self._call_tool(name, arguments, server, progress)))
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any],
+                         server_name: Optional[str] = None,
+                         progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        target_server = server_name or await self._resolve_server(name)
         if not target_server:
-            # In gateway mode, name IS the server name
-            if name in self.servers:
-                target_server = name
-            else:
-                return {"content": [{"type": "text", "text": f"Tool '{name}' not found"}], "isError": True}
-        server = self.server_processes.get(target_server)
-        if not server:
-            return {"content": [{"type": "text", "text": f"Server '{target_server}' not available"}], "isError": True}
+            return {"content": [{"type": "text", "text": f"Tool '{name}' not found"}], "isError": True}
+        policy = self._cache_policy(target_server, name)
+        key = None
+        if policy:
+            key = ResultCache.key(target_server, name, arguments)
+            cached = await self.result_cache.get(target_server, key, persist=policy[1])
+            if cached is not None:
+                return cached
+        if not self._coalescible(target_server, name):
+            return await self._dispatch(target_server, name, arguments, policy, key, progress)
+        # Identical read-only calls already in flight share one backend request
+        # (progress goes to the caller that started it)
+        key = key or ResultCache.key(target_server, name, arguments)
+        result, shared = await self._flights.do(
+            key, lambda: self._dispatch(target_server, name, arguments, policy, key, progress))
+        if shared:
+            self._coalesced[target_server] = self._coalesced.get(target_server, 0) + 1
+        return result
+
+    async def _dispatch(self, target_server: str, name: str, arguments: Dict[str, Any],
+                        policy: Optional[Tuple[float, bool]], cache_key: Optional[str],
+                        progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Send one tools/call to its backend: readiness, admission, deadline, caching."""
+        # Only the target backend has to be ready — never the slowest one
+        error = await self._wait_ready(target_server)
+        if error:
+            return {"content": [{"type": "text", "text": error}], "isError": True}
+        breaker = self._breaker(target_server)
+        if breaker is not None and not breaker.allow():
+            # Known-bad backend: don't queue the call only to wait out its timeout
+            return {"content": [{"type": "text", "text": breaker.message(target_server)}],
+                    "isError": True}
+        deadline = self._call_deadline(target_server, name)
+        gate = self._gates.setdefault(target_server, AdmissionGate())
+        if not await gate.acquire():
+            if breaker is not None:
+                breaker.abandon()
+            return {"content": [{"type": "text", "text": (
+                f"Server '{target_server}' overloaded: {gate.queued} calls already queued "
+                f"(max_concurrency={gate.max_concurrency}, max_queue={gate.max_queue}). "
+                "Retry later.")}], "isError": True}
+        outcome: Optional[Tuple[Optional[str], bool]] = None  # (backend failure or None, timed out)
+        # A successful call that changes the backend's state makes its cached reads stale
+        writes = self.result_cache is not None and policy is None and self._writes(target_server, name)
+        issued: Optional[float] = None
         try:
-            if isinstance(server, HttpMcpClient):
-                return server.call_tool(name, arguments)
-            req = {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
-                   "params": {"name": name, "arguments": arguments}}
-            server.stdin.write(json.dumps(req) + "\n")
-            server.stdin.flush()
-            line = server.stdout.readline()
-            if line:
-                resp = json.loads(line)
-                return resp.get("result", {"error": "No result"})
+            loop = asyncio.get_running_loop()
+            retry = self._retry_policy(target_server, name)
+            self.retry_budget.record_call()
+            attempt = 0
+            failure: Optional[Dict[str, Any]] = None
+            while True:
+                server = self.server_processes.get(target_server)
+                if isinstance(server, StdioSession) and not server.alive:
+                    # Crashed while this call was queued (or before a retry) — wait for the replacement
+                    error = await self._wait_ready(target_server)
+                    if error:
+                        return {"content": [{"type": "text", "text": error}], "isError": True}
+                    server = self.server_processes.get(target_server)
+                if not server:
+                    return {"content": [{"type": "text", "text": f"Server '{target_server}' not available"}], "isError": True}
+                started = loop.time()
+                issued = issued or time.time()
+                try:
+                    if isinstance(server, HttpMcpClient):
+                        result = await server.call_tool_async(name, arguments, timeout=deadline,
+                                                              progress=progress)
+                    else:
+                        result = await server.call_tool(name, arguments, timeout=deadline,
+                                                        progress=progress)
+                except ConnectionError:
+                    if not await self._retry_wait(target_server, retry, attempt):
+                        raise
+                else:
+                    failure = _transport_failure(result)
+                    if not (failure and failure.get("retryable")
+                            and await self._retry_wait(target_server, retry, attempt)):
+                        break
+                attempt += 1
+            if attempt and "error" not in result:
+                self._retry_counts(target_server)["recovered"] += 1
+            if failure is not None:
+                result = {"error": result["error"]}  # the transport tag is internal
+            self._latencies.setdefault((target_server, name), deque(maxlen=LATENCY_WINDOW)).append(
+                loop.time() - started)
+            # Only transport failures count against the breaker: a JSON-RPC error such as
+            # -32602 means the backend answered, however unhappy it was with the call
+            outcome = (str(result["error"]) if failure is not None else None, False)
+            rules = self.condenser.rules(self.servers.get(target_server, {}), name) if self.condenser else None
+            if rules:
+                # Before caching, so cache hits and shared calls get the condensed text too
+                result = self.condenser.apply(target_server, name, result, rules)
+            if result.get("isError") or "error" in result:
+                return result
+            if policy:
+                await self.result_cache.put(target_server, cache_key, result, *policy, issued=issued)
+            elif writes:
+                self.result_cache.invalidate(target_server)
+            return result
+        except asyncio.TimeoutError:
+            self._timeouts[target_server] = self._timeouts.get(target_server, 0) + 1
+            outcome = (f"timed out after {deadline:g}s", True)
+            return {"content": [{"type": "text", "text": (
+                f"Error: '{name}' on '{target_server}' did not finish within its {deadline:g}s "
+                "deadline; the call was cancelled on the backend. Raise 'call_timeout' or "
+                "'tool_timeouts' for this server if it legitimately needs longer.")}],
+                "isError": True}
+        except ConnectionError as e:
+            outcome = (str(e) or type(e).__name__, False)
+            text = f"Error: {e}"
+            if self._auto_restart(target_server):
+                text += (f". '{target_server}' crashed during this call and is being restarted; "
+                         "retry if the call is safe to repeat.")
+            return {"content": [{"type": "text", "text": text}], "isError": True}
         except Exception as e:
+            outcome = (str(e) or type(e).__name__, False)
             return {"content": [{"type": "text", "text": f"Error: {e}"}], "isError": True}
-        return {"content": [{"type": "text", "text": "Tool execution failed"}], "isError": True}
+        finally:
+            self._last_used[target_server] = asyncio.get_running_loop().time()
+            gate.release()
+            if breaker is not None:
+                if outcome is None:
+                    breaker.abandon()  # cancelled, or never reached the backend
+                else:
+                    breaker.record(*outcome)
+
+    def _retry_policy(self, server_name: str, tool_name: str) -> Optional[RetryPolicy]:
+        return RetryPolicy.for_tool(self.servers.get(server_name, {}), tool_name,
+                                    self._idempotent(server_name, tool_name))
+
+    def _retry_counts(self, server_name: str) -> Dict[str, int]:
+        return self._retries.setdefault(server_name, {"retried": 0, "recovered": 0, "budget_denied": 0})
+
+    async def _retry_wait(self, server_name: str, policy: Optional[RetryPolicy], attempt: int) -> bool:
+        """Back off before retry number ``attempt``; False if the policy or the budget says no."""
+        if policy is None or attempt >= policy.attempts:
+            return False
+        counts = self._retry_counts(server_name)
+        if not self.retry_budget.try_spend():
+            counts["budget_denied"] += 1
+            return False
+        counts["retried"] += 1
+        await asyncio.sleep(policy.delay(attempt))
+        return True
+
+    def _breaker(self, server_name: str) -> Optional[CircuitBreaker]:
+        """The server's circuit breaker (created on first use), or None if it has none."""
+        if server_name not in self._breakers:
+            self._breakers[server_name] = CircuitBreaker.from_config(self.servers.get(server_name, {}))
+        return self._breakers[server_name]
+
+    def _call_deadline(self, server_name: str, tool_name: str) -> Optional[float]:
+        """Seconds a tools/call may take; None means no deadline.
+
+        Explicit settings win (``tool_timeouts``, then ``call_timeout`` on the
+        server, then the manager-wide ``call_timeout``); otherwise the deadline
+        adapts to the tool's observed latency.
+        """
+        cfg = self.servers.get(server_name, {})
+        per_tool = cfg.get("tool_timeouts") or {}
+        if tool_name in per_tool:
+            return per_tool[tool_name]
+        if "call_timeout" in cfg:
+            return cfg["call_timeout"]
+        if self.call_timeout is not None:
+            return self.call_timeout
+        samples = self._latencies.get((server_name, tool_name))
+        adaptive = adaptive_deadline(samples) if samples else None
+        return adaptive if adaptive is not None else DEFAULT_CALL_TIMEOUT
+
+    def _hints(self, server_name: str, tool_name: str) -> Dict[str, Any]:
+        """The MCP annotations the backend declared for a tool."""
+        with self._lock:
+            return next((t.get("annotations") or {} for t in self.tool_cache
+                         if t["name"] == tool_name and t["_server"] == server_name), {})
+
+    def _read_only(self, server_name: str, tool_name: str) -> bool:
+        """True if the backend annotates the tool as free of side effects."""
+        hints = self._hints(server_name, tool_name)
+        return bool(hints.get("readOnlyHint") or (
+            hints.get("idempotentHint") and hints.get("destructiveHint") is False))
+
+    def _writes(self, server_name: str, tool_name: str) -> bool:
+        """True if the tool is listed in ``invalidate_on`` or annotated as changing state."""
+        if tool_name in (self.servers.get(server_name, {}).get("invalidate_on") or ()):
+            return True
+        hints = self._hints(server_name, tool_name)
+        return not hints.get("readOnlyHint") and (
+            hints.get("readOnlyHint") is False or bool(hints.get("destructiveHint")))
+
+    def _idempotent(self, server_name: str, tool_name: str) -> bool:
+        """True if repeating a call is harmless: read-only or annotated idempotent."""
+        hints = self._hints(server_name, tool_name)
+        return bool(hints.get("readOnlyHint") or hints.get("idempotentHint"))
+
+    def _coalescible(self, server_name: str, tool_name: str) -> bool:
+        """Whether identical concurrent calls to this tool may share one request.
+
+        Read-only tools (by annotation, ``cache_tools`` or ``coalesce_tools``)
+        qualify unless the server sets ``coalesce: false``.
+        """
+        cfg = self.servers.get(server_name, {})
+        if not cfg.get("coalesce", True):
+            return False
+        listed = cfg.get("coalesce_tools") or []
+        if "*" in listed or tool_name in listed:
+            return True
+        rule = (cfg.get("cache_tools") or {}).get(tool_name)
+        if rule is not None:
+            return rule is not False
+        return self._read_only(server_name, tool_name)
+
+    def _cache_policy(self, server_name: str, tool_name: str) -> Optional[Tuple[float, bool]]:
+        """``(ttl, persist)`` if this tool's results may be cached, else None.
+
+        A ``cache_tools`` entry decides: a TTL in seconds, ``true`` for the
+        default TTL, ``{"ttl": ..., "persist": true}`` for the disk tier, or
+        ``false``. Otherwise tools annotated ``readOnlyHint`` (or
+        ``idempotentHint`` and explicitly non-destructive) use the default
+        TTL, unless the server sets ``cache_annotated: false``.
+        """
+        if self.result_cache is None:
+            return None
+        cfg = self.servers.get(server_name, {})
+        rule = (cfg.get("cache_tools") or {}).get(tool_name)
+        if rule is False:
+            return None
+        if rule is True:
+            return self.result_cache.ttl, False
+        if isinstance(rule, dict):
+            return float(rule.get("ttl", self.result_cache.ttl)), bool(rule.get("persist", False))
+        if rule is not None:
+            return float(rule), False
+        if cfg.get("cache_annotated", True) and self._read_only(server_name, tool_name):
+            return self.result_cache.ttl, False
+        return None
+
+    def _server_idle_timeout(self, server_name: str) -> Optional[float]:
+        """Idle shutdown delay in seconds, or None if the server is never reaped."""
+        cfg = self.servers.get(server_name, {})
+        if cfg.get("eager"):
+            return None
+        return cfg.get("idle_timeout", self.idle_timeout)
+
+    async def _reap_idle(self) -> None:
+        """Shut down backends that have had no calls for their idle timeout."""
+        self._housekeeping.add(asyncio.current_task())
+        timeouts = [t for t in map(self._server_idle_timeout, self.servers) if t]
+        interval = max(0.1, min(30.0, min(timeouts) / 4))
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            now = loop.time()
+            for name in list(self.server_processes):
+                timeout = self._server_idle_timeout(name)
+                gate = self._gates.get(name)
+                if (not timeout or (gate and (gate.active or gate.queued))
+                        or now - self._last_used.get(name, now) < timeout):
+                    continue
+                ready = self._ready.get(name)
+                if ready is None or not ready.is_set():
+                    continue  # still starting
+                del self._ready[name]
+                self._last_used.pop(name, None)
+                await self._close_server(self.server_processes.pop(name, None))
+                await self._close_server(self._spares.pop(name, None))
+
+    # ── Crash recovery ──
+
+    def _auto_restart(self, server_name: str) -> bool:
+        cfg = self.servers.get(server_name, {})
+        return cfg.get("transport") != "http" and cfg.get("auto_restart", True)
+
+    def _wants_spare(self, server_name: str) -> bool:
+        return self._auto_restart(server_name) and bool(
+            self.servers.get(server_name, {}).get("hot_spare"))
+
+    def _owns(self, server_name: str, session: StdioSession) -> bool:
+        """True if ``session`` is (one of) the live backend(s) registered for the server."""
+        current = self.server_processes.get(server_name)
+        return current is session or (
+            isinstance(current, ReplicaPool) and session in current.replicas)
+
+    def _restart_delay(self, server_name: str, lived: Optional[float] = None) -> float:
+        """Count a crash and return how long to wait before the next start."""
+        streak = self._crash_streak.get(server_name, 0) + 1
+        if lived is not None and lived >= RESTART_STABLE_AFTER:
+            streak = 1
+        self._crash_streak[server_name] = streak
+        if streak == 1:
+            return 0.0
+        return min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * 2 ** (streak - 2))
+
+    def _on_session_exit(self, session: StdioSession) -> None:
+        """StdioSession hook for a process that died on its own; runs on the backend loop."""
+        name = session.server_name
+        lived = asyncio.get_running_loop().time() - session.started_at
+        if self._spares.get(name) is session:
+            del self._spares[name]
+            asyncio.ensure_future(self._refill_spare(name, self._restart_delay(name, lived)))
+            return
+        ready = self._ready.get(name)
+        if (not self._owns(name, session) or not self._auto_restart(name)
+                or ready is None or not ready.is_set() or name in self._failed_servers):
+            return  # not started yet, being replaced already, or not ours to restart
+        if not isinstance(self.server_processes[name], ReplicaPool):
+            ready.clear()  # new and queued calls wait for the replacement
+        print(f"⚠ ToolMux: {session.exit_reason}; restarting", file=sys.stderr)
+        asyncio.ensure_future(self._recover(name, session, self._restart_delay(name, lived)))
+
+    async def _start_warm(self, server_name: str) -> Optional[StdioSession]:
+        """Start one stdio session and complete the initialize handshake."""
+        session = await self._start_stdio_server(server_name, self.servers[server_name])
+        if session is None:
+            return None
+        try:
+            response = await asyncio.wait_for(session.initialize(),
+                                              self._init_timeout(server_name))
+            if "error" in response:
+                raise ConnectionError(response["error"].get("message", "initialize failed"))
+        except Exception:
+            await session.close()
+            return None
+        return session
+
+    async def _refill_spare(self, server_name: str, delay: float = 0.0) -> None:
+        """Keep one initialized standby process for a running ``hot_spare`` server."""
+        if delay:
+            await asyncio.sleep(delay)
+        current = self._spares.get(server_name)
+        if (current is not None and current.alive) or server_name not in self.server_processes:
+            return
+        spare = await self._start_warm(server_name)
+        if spare is None:
+            return
+        current = self._spares.get(server_name)
+        if (current is not None and current.alive) or server_name not in self.server_processes:
+            await spare.close()
+            return
+        self._spares[server_name] = spare
+
+    async def _recover(self, server_name: str, dead: StdioSession, delay: float) -> None:
+        """Replace a crashed session with the hot spare, or a fresh one after ``delay``."""
+        replacement = self._spares.pop(server_name, None)
+        if replacement is not None and not replacement.alive:
+            replacement = None
+        while replacement is None:
+            await asyncio.sleep(delay)
+            if not self._owns(server_name, dead):
+                return  # retried, reaped or shut down in the meantime
+            replacement = await self._start_warm(server_name)
+            if replacement is None:
+                # Let waiting calls fail fast; keep trying in the background
+                with self._lock:
+                    self._failed_servers[server_name] = (
+                        f"{dead.exit_reason}; restart failed, retrying")
+                ready = self._ready.get(server_name)
+                if ready is not None:
+                    ready.set()
+                delay = self._restart_delay(server_name)
+        if not self._owns(server_name, dead):
+            await replacement.close()
+            return
+        current = self.server_processes[server_name]
+        if isinstance(current, ReplicaPool):
+            current.replace(dead, replacement)
+            unit = current.replicas.index(replacement)
+        else:
+            self.server_processes[server_name] = replacement
+            unit = 0
+        if server_name in self._health:
+            self._health[server_name].misses.pop(unit, None)
+        self._restarts[server_name] = self._restarts.get(server_name, 0) + 1
+        self._last_used[server_name] = asyncio.get_running_loop().time()
+        with self._lock:
+            self._failed_servers.pop(server_name, None)
+        ready = self._ready.get(server_name)
+        if ready is not None:
+            ready.set()
+        if self._wants_spare(server_name):
+            asyncio.ensure_future(self._refill_spare(server_name))
+
+    # ── Health checks ──
+
+    def _server_ping_interval(self, server_name: str) -> Optional[float]:
+        return self.servers.get(server_name, {}).get("ping_interval", self.ping_interval)
+
+    async def _ping_loop(self) -> None:
+        """Ping every running backend on its own interval."""
+        self._housekeeping.add(asyncio.current_task())
+        intervals = [i for i in map(self._server_ping_interval, self.servers) if i]
+        tick = max(0.05, min(intervals) / 2)
+        loop = asyncio.get_running_loop()
+        last: Dict[str, float] = {}
+        while True:
+            await asyncio.sleep(tick)
+            now = loop.time()
+            due = []
+            for name in list(self.server_processes):
+                interval = self._server_ping_interval(name)
+                ready = self._ready.get(name)
+                if (not interval or ready is None or not ready.is_set()
+                        or name in self._failed_servers or now - last.get(name, 0) < interval):
+                    continue
+                last[name] = now
+                due.append(name)
+            if due:
+                await asyncio.gather(*(self._ping_server(n) for n in due))
+
+    async def _ping_server(self, server_name: str) -> None:
+        server = self.server_processes.get(server_name)
+        if server is None:
+            return
+        cfg = self.servers.get(server_name, {})
+        health = self._health.get(server_name)
+        if health is None:
+            health = self._health[server_name] = BackendHealth(
+                int(cfg.get("ping_misses", DEFAULT_PING_MISSES)))
+        units = server.replicas if isinstance(server, ReplicaPool) else [server]
+        timeout = float(cfg.get("ping_timeout", DEFAULT_PING_TIMEOUT))
+        await asyncio.gather(*(self._ping_unit(server_name, health, i, unit, timeout)
+                               for i, unit in enumerate(units)))
+
+    async def _ping_unit(self, server_name: str, health: BackendHealth, index: int,
+                         unit: Any, timeout: float) -> None:
+        """Ping one session or HTTP client; a stdio unit that keeps missing is aborted."""
+        if isinstance(unit, StdioSession) and not unit.alive:
+            return  # crash recovery already owns it
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            if isinstance(unit, HttpMcpClient):
+                response = await asyncio.wait_for(unit.call_rpc_async("ping"), timeout)
+                # A JSON-RPC error from the server still proves it is alive;
+                # only transport failures (tagged by the client) count as misses
+                error = response.get("error") or {}
+                ok = (error.get("data") or {}).get("transport") != "http"
+            else:
+                await asyncio.wait_for(unit.request("ping"), timeout)
+                ok = True
+        except Exception:
+            ok = False
+        if ok:
+            health.record(index, loop.time() - start)
+            return
+        if health.miss(index) and isinstance(unit, StdioSession) and self._auto_restart(server_name):
+            unit.abort(f"{server_name} stopped responding "
+                       f"({health.misses[index]} pings missed)")
+
+    async def _close_server(self, server) -> None:
+        """Close one backend connection (stdio session or HTTP client)."""
+        if server is None:
+            return
+        try:
+            if isinstance(server, HttpMcpClient):
+                await server.aclose()
+            else:
+                await server.close()
+        except Exception:
+            pass
+
+    async def _close_all(self) -> None:
+        for task in self._housekeeping:
+            task.cancel()
+        await asyncio.gather(*self._housekeeping, return_exceptions=True)
+        self._housekeeping.clear()
+        servers = list(self.server_processes.values()) + list(self._spares.values())
+        self.server_processes.clear()
+        self._spares.clear()
+        await asyncio.gather(*(self._close_server(s) for s in servers))
+        if self.http_sessions is not None:
+            await asyncio.to_thread(self.http_sessions.flush)
 
     def shutdown(self):
         """Terminate all backend server processes and close HTTP connections."""
-        for server in self.server_processes.values():
-            try:
-                if isinstance(server, HttpMcpClient):
-                    server.close()
-                else:
-                    try:
-                        server.stdin.close()
-                    except Exception:
-                        pass
-                    server.terminate()
-            except Exception:
-                pass
-        self.server_processes.clear()
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            self.server_processes.clear()
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_all(), loop).result(timeout=15)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self.spill_store is not None:
+            self.spill_store.close()
 
 
 # ─── Native Management Tool ───
@@ -733,6 +3562,7 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
 
         if action == "list":
             failed = backend.get_failed_servers() if backend else {}
+            stats = backend.get_server_stats() if backend else {}
             entries = []
             for sname, cfg in servers.items():
                 t = cfg.get("transport", "stdio")
@@ -744,19 +3574,27 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
                     entry["error"] = failed[sname]
                 else:
                     entry["status"] = "ok"
+                entry.update(stats.get(sname, {}))
                 entries.append(entry)
             result: Dict[str, Any] = {"servers": entries, "total": len(entries),
                                       "config_path": str(config_path)}
             if failed:
                 result["failed_count"] = len(failed)
                 result["failed_servers"] = failed
-            return json.dumps(result, indent=2)
+            cache_stats = backend.get_cache_stats() if backend else None
+            if cache_stats:
+                result["result_cache"] = cache_stats
+            if backend and backend.spill_store is not None:
+                result["large_results"] = backend.spill_store.stats()
+            if backend:
+                result["retry_budget"] = backend.retry_budget.stats()
+            return json_dumps(result, indent=2)
 
         elif action == "add":
             if not name:
-                return json.dumps({"error": "Required: name"})
+                return json_dumps({"error": "Required: name"})
             if name in servers:
-                return json.dumps({"error": f"Server '{name}' already exists. Remove it first."})
+                return json_dumps({"error": f"Server '{name}' already exists. Remove it first."})
             # If no command/base_url provided, try bundle resolution
             if not command and not base_url:
                 bundle = resolve_bundle(name)
@@ -764,7 +3602,7 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
                     command = bundle["command"]
                     args = args or bundle["args"]
                 else:
-                    return json.dumps({"error": "Required: name + command (stdio) or name + base_url (http). "
+                    return json_dumps({"error": "Required: name + command (stdio) or name + base_url (http). "
                                                 f"No bundle found for '{name}'."})
             if transport == "http" or base_url:
                 entry: Dict[str, Any] = {"transport": "http", "base_url": base_url or "", "timeout": 30}
@@ -774,18 +3612,18 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
                 entry["description"] = description
             config.setdefault("servers", {})[name] = entry
             _save_config(config, config_path)
-            return json.dumps({"success": True, "message": f"Added '{name}'",
+            return json_dumps({"success": True, "message": f"Added '{name}'",
                                "note": "Restart ToolMux to load the new server"})
 
         elif action == "remove":
             if not name:
-                return json.dumps({"error": "Required: name"})
+                return json_dumps({"error": "Required: name"})
             if name not in servers:
-                return json.dumps({"error": f"Server '{name}' not found",
+                return json_dumps({"error": f"Server '{name}' not found",
                                    "available": list(servers.keys())})
             del config["servers"][name]
             _save_config(config, config_path)
-            return json.dumps({"success": True, "message": f"Removed '{name}'",
+            return json_dumps({"success": True, "message": f"Removed '{name}'",
                                "note": "Restart ToolMux to apply changes"})
 
         elif action == "validate":
@@ -805,14 +3643,14 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
                             detail += (f" (bundle has '{bundle['command']}' "
                                        f"{' '.join(bundle['args'])} — fixable)")
                     results.append({"name": sname, "valid": found, "detail": detail})
-            return json.dumps({"results": results,
+            return json_dumps({"results": results,
                                "total": len(results),
                                "errors": sum(1 for r in results if not r["valid"])}, indent=2)
 
         elif action == "test":
             targets = {name: servers[name]} if name and name in servers else servers
             if name and name not in servers:
-                return json.dumps({"error": f"Server '{name}' not found",
+                return json_dumps({"error": f"Server '{name}' not found",
                                    "available": list(servers.keys())})
             bm = BackendManager(targets)
             bm.initialize_all_async()
@@ -825,17 +3663,17 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
                 count = by_server.get(sname, 0)
                 results.append({"name": sname, "tools": count, "ok": count > 0})
             bm.shutdown()
-            return json.dumps({"results": results, "total_tools": len(tools)}, indent=2)
+            return json_dumps({"results": results, "total_tools": len(tools)}, indent=2)
 
         elif action == "retry":
             if not name:
-                return json.dumps({"error": "Required: name"})
+                return json_dumps({"error": "Required: name"})
             if not backend:
-                return json.dumps({"error": "Retry not available in this mode (proxy/search/code use FastMCP native proxy)"})
+                return json_dumps({"error": "Retry not available in this mode (proxy/search/code use FastMCP native proxy)"})
             result = backend.retry_server(name)
-            return json.dumps(result, indent=2)
+            return json_dumps(result, indent=2)
 
-        return json.dumps({"error": f"Unknown action '{action}'",
+        return json_dumps({"error": f"Unknown action '{action}'",
                            "valid_actions": ["list", "add", "remove", "validate", "test", "retry"]})
 
     @mcp.tool()
@@ -857,22 +3695,22 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
         if action == "status":
             cache_file = config_path.parent / ".toolmux_cache.json"
             if not cache_file.exists():
-                return json.dumps({"cached": False, "message": "No cache file. Use optimize_descriptions(action='generate') to start."})
+                return json_dumps({"cached": False, "message": "No cache file. Use optimize_descriptions(action='generate') to start."})
             try:
-                cache = json.loads(cache_file.read_text())
+                cache = json_loads(cache_file.read_text())
                 total = sum(len(s.get("descriptions", {})) for s in cache.get("servers", {}).values())
-                return json.dumps({
+                return json_dumps({
                     "cached": True, "generated_at": cache.get("generated_at"),
                     "model": cache.get("model"), "total_descriptions": total,
                     "servers": {s: {"tool_count": d.get("tool_count"), "descriptions": len(d.get("descriptions", {}))}
                                 for s, d in cache.get("servers", {}).items()}})
             except Exception as e:
-                return json.dumps({"cached": False, "error": str(e)})
+                return json_dumps({"cached": False, "error": str(e)})
 
         elif action == "generate":
             tools = config.get("_backend_tools", [])
             if not tools:
-                return json.dumps({"error": "No backend tools loaded. ToolMux must be running with backends initialized."})
+                return json_dumps({"error": "No backend tools loaded. ToolMux must be running with backends initialized."})
             server_tools: Dict[str, List[Dict[str, str]]] = {}
             for t in tools:
                 s = t.get("_server", "unknown")
@@ -895,16 +3733,16 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
                         "description": t["description"][:200],
                         "required": t["required"],
                     } for t in stools]}
-            return json.dumps(result, indent=2)
+            return json_dumps(result, indent=2)
 
         elif action == "save":
             if not server or not descriptions:
-                return json.dumps({"error": "Required: server and descriptions"})
+                return json_dumps({"error": "Required: server and descriptions"})
             # Load or create cache
             cache_file = config_path.parent / ".toolmux_cache.json"
             if cache_file.exists():
                 try:
-                    cache = json.loads(cache_file.read_text())
+                    cache = json_loads(cache_file.read_text())
                 except Exception:
                     cache = {}
             else:
@@ -918,20 +3756,448 @@ def register_manage_tool(mcp: FastMCP, config_path: Path, config: Dict[str, Any]
             tools = config.get("_backend_tools", [])
             count = sum(1 for t in tools if t.get("_server") == server)
             cache["servers"][server] = {
+                **cache["servers"].get(server, {}),
                 "tool_count": count,
                 "descriptions": descriptions,
             }
-            cache_file.write_text(json.dumps(cache, indent=2))
-            return json.dumps({"success": True,
+            cache_file.write_text(json_dumps(cache, indent=2))
+            return json_dumps({"success": True,
                                "message": f"Saved {len(descriptions)} descriptions for '{server}'",
                                "note": "Restart ToolMux to use new cache"})
 
-        return json.dumps({"error": f"Unknown action '{action}'",
+        return json_dumps({"error": f"Unknown action '{action}'",
                            "valid_actions": ["generate", "save", "status"]})
 
 
+# ─── Workflows ───
+
+# "${ref}" in workflow step arguments. A string that is exactly one reference
+# takes the referenced value as-is; references inside longer strings are
+# interpolated as text.
+_WORKFLOW_REF = re.compile(r"\$\{([^{}]+)\}")
+_WORKFLOW_PATH = re.compile(r"[^.\[\]]+|\[(\d+)\]")
+_WORKFLOW_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_-]{0,63}$")
+# JSON Schema type of a workflow param → annotation FastMCP validates it with
+_WORKFLOW_PARAM_TYPES: Dict[str, Any] = {
+    "string": str, "integer": int, "number": float, "boolean": bool,
+    "array": list, "object": dict, "any": Any}
+
+
+def _parse_ref(ref: str) -> List[Any]:
+    """Split ``step.key[0].sub`` into ``["step", "key", 0, "sub"]``."""
+    return [int(m.group(1)) if m.group(1) is not None else m.group(0)
+            for m in _WORKFLOW_PATH.finditer(ref.strip())]
+
+
+def _refs(value: Any) -> List[str]:
+    """Every ``${...}`` reference inside a JSON-like value."""
+    if isinstance(value, str):
+        return _WORKFLOW_REF.findall(value)
+    if isinstance(value, dict):
+        return [r for v in value.values() for r in _refs(v)]
+    if isinstance(value, list):
+        return [r for v in value for r in _refs(v)]
+    return []
+
+
+def workflow_dependencies(step: Dict[str, Any]) -> Set[str]:
+    """Step ids a step waits for: its ``after`` list plus every step its arguments reference."""
+    deps = set(step.get("after") or [])
+    for ref in _refs(step.get("args", {})):
+        parts = _parse_ref(ref)
+        if parts and parts[0] != "params":
+            deps.add(parts[0])
+    return deps
+
+
+def validate_workflow(name: str, definition: Any) -> List[str]:
+    """Problems with a workflow definition ([] if it can run)."""
+    if not _WORKFLOW_NAME.match(name or ""):
+        return [f"invalid workflow name {name!r} (letters, digits, '_' and '-')"]
+    if not isinstance(definition, dict):
+        return ["workflow must be an object"]
+    steps = definition.get("steps")
+    if not isinstance(steps, list) or not steps:
+        return ["'steps' must be a non-empty list"]
+    params = definition.get("params") or {}
+    if not isinstance(params, dict) or not all(isinstance(spec, dict) for spec in params.values()):
+        return ["'params' must map each name to an object"]
+    errors: List[str] = []
+    for pname, spec in params.items():
+        if not pname.isidentifier() or keyword.iskeyword(pname):
+            errors.append(f"param {pname!r} must be a valid identifier")
+        if spec.get("type", "any") not in _WORKFLOW_PARAM_TYPES:
+            errors.append(f"param {pname!r} has unknown type {spec['type']!r} "
+                          f"(use one of {', '.join(_WORKFLOW_PARAM_TYPES)})")
+    ids: List[str] = []
+    for i, step in enumerate(steps):
+        if not isinstance(step, dict) or not isinstance(step.get("tool"), str):
+            errors.append(f"step {i} needs a 'tool'")
+            continue
+        step_id = step.get("id", f"step{i + 1}")
+        if step_id in ids or step_id == "params":
+            errors.append(f"duplicate or reserved step id {step_id!r}")
+        ids.append(step_id)
+        if not isinstance(step.get("args", {}), dict):
+            errors.append(f"step {step_id!r}: 'args' must be an object")
+    if errors:
+        return errors
+    graph = {sid: workflow_dependencies(step) for sid, step in zip(ids, steps)}
+    for sid, deps in graph.items():
+        for dep in sorted(deps - set(ids)):
+            errors.append(f"step {sid!r} references unknown step {dep!r}")
+    if errors:
+        return errors
+    # Kahn's algorithm: anything left over is part of a cycle
+    remaining = dict(graph)
+    while remaining:
+        ready = [sid for sid, deps in remaining.items() if not deps & remaining.keys()]
+        if not ready:
+            return [f"dependency cycle between steps {sorted(remaining)}"]
+        for sid in ready:
+            del remaining[sid]
+    return []
+
+
+def _lookup(scope: Dict[str, Any], ref: str) -> Any:
+    value: Any = scope
+    for part in _parse_ref(ref):
+        try:
+            value = value[part]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"reference ${{{ref}}} not found") from None
+    return value
+
+
+def _substitute(value: Any, scope: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        whole = _WORKFLOW_REF.fullmatch(value)
+        if whole:
+            return _lookup(scope, whole.group(1))
+
+        def text(match: "re.Match[str]") -> str:
+            found = _lookup(scope, match.group(1))
+            return found if isinstance(found, str) else json_dumps(found)
+        return _WORKFLOW_REF.sub(text, value)
+    if isinstance(value, dict):
+        return {k: _substitute(v, scope) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_substitute(v, scope) for v in value]
+    return value
+
+
+def _step_output(result: Dict[str, Any]) -> Any:
+    """A step's value for later references: its text, parsed as JSON when it is JSON."""
+    text = _extract_text(result)
+    try:
+        return json_loads(text)
+    except ValueError:
+        return text
+
+
+async def run_workflow(definition: Dict[str, Any], params: Dict[str, Any],
+                       call: Callable[[str, Dict[str, Any], Optional[str]], Awaitable[Dict[str, Any]]]
+                       ) -> Dict[str, Any]:
+    """Run a validated workflow, starting each step as soon as its dependencies finish.
+
+    ``call(tool, args, server)`` performs one tool call. The first failing
+    step cancels the rest. Returns ``output`` (the ``output`` template, or
+    the value of the final steps) and a per-step summary.
+    """
+    steps = {step.get("id", f"step{i + 1}"): step for i, step in enumerate(definition["steps"])}
+    deps = {sid: workflow_dependencies(step) for sid, step in steps.items()}
+    scope: Dict[str, Any] = {"params": params}
+    summary: Dict[str, Dict[str, Any]] = {}
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def run_step(sid: str) -> Any:
+        step = steps[sid]
+        step_started = loop.time()
+        try:
+            args = _substitute(step.get("args", {}), scope)
+            result = await call(step["tool"], args, step.get("server"))
+            if result.get("isError") or "error" in result:
+                raise RuntimeError(_extract_text(result) or str(result.get("error")))
+            return _step_output(result)
+        finally:
+            summary.setdefault(sid, {})["elapsed_ms"] = round((loop.time() - step_started) * 1000, 1)
+
+    running: Dict[asyncio.Task, str] = {}
+    error: Optional[str] = None
+    while error is None and (len(scope) - 1 < len(steps)):
+        for sid in steps:
+            if sid not in scope and sid not in running.values() and deps[sid] <= scope.keys():
+                running[asyncio.ensure_future(run_step(sid))] = sid
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            sid = running.pop(task)
+            if task.exception() is not None:
+                error = error or f"step {sid!r} ({steps[sid]['tool']}) failed: {task.exception()}"
+                summary[sid]["ok"] = False
+            else:
+                scope[sid] = task.result()
+                summary[sid]["ok"] = True
+    for task, sid in running.items():
+        task.cancel()
+        summary.setdefault(sid, {})["ok"] = False
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+
+    report: Dict[str, Any] = {"steps": {sid: summary[sid] for sid in steps if sid in summary},
+                              "elapsed_ms": round((loop.time() - started) * 1000, 1)}
+    if error:
+        report["error"] = error
+        return report
+    if "output" in definition:
+        report["output"] = _substitute(definition["output"], scope)
+    else:
+        needed = set().union(*deps.values())
+        finals = [sid for sid in steps if sid not in needed]
+        report["output"] = scope[finals[0]] if len(finals) == 1 else {sid: scope[sid] for sid in finals}
+    return report
+
+
+def _workflow_description(name: str, definition: Dict[str, Any]) -> str:
+    params = definition.get("params") or {}
+    lines = [definition.get("description") or f"Saved workflow '{name}'."]
+    lines.append("Steps: " + " → ".join(step["tool"] for step in definition["steps"]))
+    if params:
+        lines.append("Arguments: " + ", ".join(
+            f"{p} ({spec.get('type', 'any')}{', optional' if 'default' in spec else ''})"
+            + (f": {spec['description']}" if spec.get("description") else "")
+            for p, spec in params.items()))
+    return "\n".join(lines)
+
+
+def _workflow_tool(name: str, definition: Dict[str, Any],
+                   run: Callable[[Dict[str, Any]], Awaitable[str]]) -> Tool:
+    """A native tool whose parameters are the workflow's ``params``, typed and validated."""
+    params = definition.get("params") or {}
+    types = {pname: _WORKFLOW_PARAM_TYPES[spec.get("type", "any")] for pname, spec in params.items()}
+
+    async def handler(**arguments: Any) -> str:
+        return await run(arguments)
+    # FastMCP reads the parameters from the signature and their types from the annotations
+    handler.__name__ = name
+    handler.__signature__ = inspect.Signature([
+        inspect.Parameter(pname, inspect.Parameter.KEYWORD_ONLY, annotation=types[pname],
+                          default=spec.get("default", inspect.Parameter.empty))
+        for pname, spec in params.items()], return_annotation=str)
+    handler.__annotations__ = {**types, "return": str}
+    description = _workflow_description(name, definition)
+    handler.__doc__ = description
+    tool = Tool.from_function(handler, name=name, description=description)
+    for pname, spec in params.items():
+        if spec.get("description"):
+            tool.parameters["properties"][pname]["description"] = spec["description"]
+    return tool
+
+
+def _workflow_params(definition: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments merged over declared defaults; raises ValueError if a required one is missing."""
+    params = dict(arguments)
+    for pname, spec in (definition.get("params") or {}).items():
+        if pname not in params:
+            if "default" not in spec:
+                raise ValueError(f"missing argument {pname!r}")
+            params[pname] = spec["default"]
+    return params
+
+
+def register_workflow_tools(mcp: FastMCP, backend: BackendManager, config: Dict[str, Any],
+                            config_path: Path):
+    """Expose each workflow in mcp.json as a native tool, plus manage_workflows."""
+    workflows: Dict[str, Dict[str, Any]] = config.setdefault("workflows", {})
+    reserved = (set(backend.servers) | {t["name"] for t in backend.get_all_tools()}
+                | {"catalog_tools", "get_tool_schema", "get_tool_count", "list_all_tools", "invoke",
+                   "invoke_batch", "read_result", "manage_servers", "optimize_descriptions",
+                   "manage_workflows"})
+    hidden: Set[str] = set()  # removed at runtime; re-enabled if saved again
+
+    def clashes(wf_name: str) -> bool:
+        # Lazy or uncached start-up discovers backend tools after registration
+        return wf_name in reserved or any(t["name"] == wf_name for t in backend.get_all_tools())
+
+    async def call(tool: str, args: Dict[str, Any], server: Optional[str]) -> Dict[str, Any]:
+        return await backend.call_tool_async(tool, args, server=server)
+
+    async def execute(wf_name: str, arguments: Dict[str, Any]) -> str:
+        definition = workflows.get(wf_name)
+        if definition is None:
+            return json_dumps({"error": f"Workflow '{wf_name}' not found"})
+        if clashes(wf_name):
+            if wf_name not in hidden:
+                print(f"⚠ ToolMux: disabling workflow {wf_name}: name clashes with a backend tool "
+                      "discovered after start-up", file=sys.stderr)
+                hidden.add(wf_name)
+                mcp.disable(names={wf_name}, components={"tool"})
+            return json_dumps({"error": f"Workflow '{wf_name}' clashes with a backend tool; rename it"})
+        errors = validate_workflow(wf_name, definition)
+        if errors:
+            return json_dumps({"error": "Invalid workflow", "problems": errors})
+        try:
+            params = _workflow_params(definition, arguments)
+        except ValueError as e:
+            return json_dumps({"error": str(e)})
+        return json_dumps(await run_workflow(definition, params, call), indent=2)
+
+    def add(wf_name: str) -> None:
+        mcp.add_tool(_workflow_tool(wf_name, workflows[wf_name],
+                                    functools.partial(execute, wf_name)))
+        if wf_name in hidden:
+            hidden.discard(wf_name)
+            mcp.enable(names={wf_name}, components={"tool"})
+
+    for wf_name, definition in list(workflows.items()):
+        errors = validate_workflow(wf_name, definition)
+        if clashes(wf_name):
+            errors.append("name clashes with a server or native tool")
+        if errors:
+            print(f"⚠ ToolMux: skipping workflow {wf_name}: {'; '.join(errors)}", file=sys.stderr)
+            continue
+        add(wf_name)
+
+    @mcp.tool()
+    async def manage_workflows(action: str, name: Optional[str] = None,
+                               definition: Optional[Dict[str, Any]] = None,
+                               arguments: Optional[Dict[str, Any]] = None) -> str:
+        """Saved multi-step workflows that run server-side in one call. Actions: list, show, save, remove, run.
+
+        A workflow is {"description": ..., "params": {name: {type, description, default}},
+        "steps": [{"id": ..., "tool": ..., "server": optional, "args": {...}, "after": [ids]}],
+        "output": optional template}. Step args may reference ${params.x} or an earlier
+        step's result, e.g. ${search.items[0].path}; independent steps run in parallel.
+
+        Examples:
+          manage_workflows(action="list")
+          manage_workflows(action="save", name="readme", definition={"steps": [
+              {"id": "r", "tool": "read_file", "args": {"path": "${params.path}"}}]})
+          manage_workflows(action="run", name="readme", arguments={"path": "README.md"})
+        """
+        if action == "list":
+            return json_dumps({"workflows": [
+                {"name": n, "description": d.get("description", ""), "steps": len(d.get("steps", []))}
+                for n, d in workflows.items()]}, indent=2)
+        if not name:
+            return json_dumps({"error": f"'name' is required for action '{action}'"})
+        if action == "show":
+            if name not in workflows:
+                return json_dumps({"error": f"Workflow '{name}' not found"})
+            return json_dumps({"name": name, **workflows[name]}, indent=2)
+        if action == "run":
+            return await execute(name, arguments or {})
+        if action == "save":
+            errors = validate_workflow(name, definition)
+            if clashes(name):
+                errors.append("name clashes with a server or native tool")
+            if errors:
+                return json_dumps({"error": "Invalid workflow", "problems": errors})
+            workflows[name] = definition
+            _save_workflows(config_path, workflows)
+            add(name)
+            return json_dumps({"status": "saved", "name": name, "tool": name})
+        if action == "remove":
+            if workflows.pop(name, None) is None:
+                return json_dumps({"error": f"Workflow '{name}' not found"})
+            _save_workflows(config_path, workflows)
+            hidden.add(name)
+            mcp.disable(names={name}, components={"tool"})
+            return json_dumps({"status": "removed", "name": name})
+        return json_dumps({"error": f"Unknown action '{action}'. Use: list, show, save, remove, run"})
+
+
+def _save_workflows(config_path: Path, workflows: Dict[str, Dict[str, Any]]) -> None:
+    """Write the workflows section back to mcp.json, leaving the rest of the file as it is on disk."""
+    try:
+        with open(config_path) as f:
+            on_disk = json.load(f)
+    except (OSError, ValueError):
+        on_disk = {}
+    on_disk["workflows"] = workflows
+    _save_config(on_disk, config_path)
+
+
 # ─── Mode Registration Functions ───
 
+MAX_BATCH_CALLS = 64
+
+
+async def run_batch(calls: List[Dict[str, Any]],
+                    invoke_one: Callable[[Dict[str, Any]], Awaitable[Tuple[str, bool]]]) -> str:
+    """Run invoke_batch calls concurrently and report them in input order.
+
+    ``invoke_one`` returns ``(text, ok)`` for one validated call. Each entry
+    carries its own result or error and elapsed time; one failing call never
+    fails the batch.
+    """
+    if not isinstance(calls, list) or not calls:
+        return json_dumps({"error": "'calls' must be a non-empty list of {name, args} objects"})
+    if len(calls) > MAX_BATCH_CALLS:
+        return json_dumps({"error": f"Too many calls in one batch: {len(calls)} (max {MAX_BATCH_CALLS})"})
+    loop = asyncio.get_running_loop()
+    batch_started = loop.time()
+
+    async def timed(index: int, call: Any) -> Dict[str, Any]:
+        name = call.get("name") if isinstance(call, dict) else None
+        entry: Dict[str, Any] = {"index": index, "name": name}
+        started = loop.time()
+        if not isinstance(name, str) or not name:
+            entry.update(ok=False, error="Each call needs a 'name'")
+        elif not isinstance(call.get("args") or {}, dict):
+            entry.update(ok=False, error="'args' must be an object")
+        elif name == "invoke_batch":
+            entry.update(ok=False, error="invoke_batch cannot be nested")
+        else:
+            try:
+                text, ok = await invoke_one(call)
+                entry["ok"] = ok
+                entry["result" if ok else "error"] = text
+            except Exception as e:
+                entry.update(ok=False, error=f"Error: {e}")
+        entry["elapsed_ms"] = round((loop.time() - started) * 1000, 1)
+        return entry
+
+    results = await asyncio.gather(*(timed(i, c) for i, c in enumerate(calls)))
+    failed = sum(1 for r in results if not r["ok"])
+    return json_dumps({"results": results, "succeeded": len(results) - failed, "failed": failed,
+                       "elapsed_ms": round((loop.time() - batch_started) * 1000, 1)}, indent=2)
+
+
+def register_batch_tool(mcp: FastMCP, backend: BackendManager):
+    """Register invoke_batch for the modes that route through BackendManager."""
+
+    @mcp.tool()
+    async def invoke_batch(calls: List[Dict[str, Any]], ctx: Context = None) -> str:
+        """Run several backend tool calls concurrently in one round trip.
+
+        calls: [{"name": "tool_name", "args": {...}}, ...]; add "server" to pick
+        the backend when a tool name exists on several. Results come back in
+        the same order, each with ok, result or error, and elapsed_ms.
+        """
+        async def invoke_one(call: Dict[str, Any]) -> Tuple[str, bool]:
+            name = call["name"]
+            result = await backend.call_tool_async(name, call.get("args") or {},
+                                                   server=call.get("server"))
+            ok = not (isinstance(result, dict) and result.get("isError"))
+            return render_result(name, result, backend, ctx), ok
+        return await run_batch(calls, invoke_one)
+
+
+def register_read_result_tool(mcp: FastMCP, backend: BackendManager):
+    """Register read_result when large results are handed out by handle."""
+    store = backend.spill_store
+    if store is None:
+        return
+
+    @mcp.tool()
+    def read_result(handle: str, offset: int = 0, length: int = DEFAULT_PAGE_BYTES) -> str:
+        """Read part of a large tool result that was returned as a handle.
+
+        offset and length are in bytes; each page says where the next one starts.
+        """
+        return store.read(handle, offset, length)
+
 def register_meta_tools(mcp: FastMCP, backend: BackendManager,
                         cached_descriptions: Optional[Dict[str, Dict[str, str]]] = None):
     """Register 4 meta-tools for meta mode."""
@@ -953,27 +4219,27 @@ def register_meta_tools(mcp: FastMCP, backend: BackendManager,
             params = list(schema.get("properties", {}).keys())
             catalog.append({"name": name, "server": server,
                             "description": desc, "parameters": params})
-        return json.dumps(catalog, indent=2)
+        return json_dumps(catalog, indent=2)
 
     @mcp.tool()
     def get_tool_schema(name: str) -> str:
         """Get full description and inputSchema for a specific tool."""
         for tool in backend.get_all_tools():
             if tool["name"] == name:
-                return json.dumps({
+                return json_dumps({
                     "name": name, "server": tool["_server"],
                     "description": tool.get("description", ""),
                     "input_schema": tool.get("inputSchema", {})}, indent=2)
-        return json.dumps({"error": f"Tool '{name}' not found"})
+        return json_dumps({"error": f"Tool '{name}' not found"})
 
     @mcp.tool()
-    def invoke(name: str, args: Optional[Dict[str, Any]] = None) -> str:
+    async def invoke(name: str, args: Optional[Dict[str, Any]] = None, ctx: Context = None) -> str:
         """Execute a backend tool by name."""
-        result = backend.call_tool(name, args or {})
-        text = enrich_result(name, result, backend._described_tools, backend.tool_cache)
-        if isinstance(result, dict) and result.get("isError"):
-            text = enrich_error_result(name, result, backend.tool_cache)
-        return text
+        result = await backend.call_tool_async(name, args or {}, progress=_progress_relay(ctx))
+        return render_result(name, result, backend, ctx)
+
+    register_batch_tool(mcp, backend)
+    register_read_result_tool(mcp, backend)
 
     @mcp.tool()
     def get_tool_count() -> str:
@@ -987,7 +4253,10 @@ def register_meta_tools(mcp: FastMCP, backend: BackendManager,
         failed = backend.get_failed_servers()
         if failed:
             result["failed_servers"] = failed
-        return json.dumps(result, indent=2)
+        health = backend.get_health()
+        if health:
+            result["health"] = health
+        return json_dumps(result, indent=2)
 
     @mcp.tool()
     def list_all_tools(server: Optional[str] = None) -> str:
@@ -1004,7 +4273,7 @@ def register_meta_tools(mcp: FastMCP, backend: BackendManager,
             else:
                 desc = condense_description(t.get("description", ""), max_len=80)
             by_server.setdefault(s, []).append({"name": name, "description": desc})
-        return json.dumps({"total_tools": sum(len(v) for v in by_server.values()),
+        return json_dumps({"total_tools": sum(len(v) for v in by_server.values()),
                            "servers": {s: {"tool_count": len(tl), "tools": tl}
                                        for s, tl in by_server.items()}}, indent=2)
 
@@ -1020,11 +4289,11 @@ def register_proxy_tools(mcp: FastMCP, backend: BackendManager,
         """Get full description and inputSchema for a specific tool."""
         for tool in backend.get_all_tools():
             if tool["name"] == name:
-                return json.dumps({
+                return json_dumps({
                     "name": name, "server": tool["_server"],
                     "description": tool.get("description", ""),
                     "input_schema": tool.get("inputSchema", {})}, indent=2)
-        return json.dumps({"error": f"Tool '{name}' not found"})
+        return json_dumps({"error": f"Tool '{name}' not found"})
 
     @mcp.tool()
     def list_all_tools(server: Optional[str] = None) -> str:
@@ -1041,7 +4310,7 @@ def register_proxy_tools(mcp: FastMCP, backend: BackendManager,
             else:
                 desc = condense_description(t.get("description", ""), max_len=80)
             by_server.setdefault(s, []).append({"name": name, "description": desc})
-        return json.dumps({"total_tools": sum(len(v) for v in by_server.values()),
+        return json_dumps({"total_tools": sum(len(v) for v in by_server.values()),
                            "servers": {s: {"tool_count": len(tl), "tools": tl}
                                        for s, tl in by_server.items()}}, indent=2)
 
@@ -1053,7 +4322,10 @@ def register_proxy_tools(mcp: FastMCP, backend: BackendManager,
         for t in all_tools:
             s = t["_server"]
             by_server[s] = by_server.get(s, 0) + 1
-        return json.dumps({"total_tools": len(all_tools), "by_server": by_server}, indent=2)
+        return json_dumps({"total_tools": len(all_tools), "by_server": by_server}, indent=2)
+
+    register_batch_tool(mcp, backend)
+    register_read_result_tool(mcp, backend)
 
     for tool in tools:
         tool_name = tool["name"]
@@ -1064,18 +4336,16 @@ def register_proxy_tools(mcp: FastMCP, backend: BackendManager,
             desc = condense_description(tool.get("description", ""))
         schema = condense_schema(tool.get("inputSchema", {}))
 
-        def make_handler(tn: str, tool_desc: str):
-            async def handler(arguments: Optional[Dict[str, Any]] = None) -> str:
-                result = backend.call_tool(tn, arguments or {})
-                text = enrich_result(tn, result, backend._described_tools, backend.tool_cache)
-                if isinstance(result, dict) and result.get("isError"):
-                    text = enrich_error_result(tn, result, backend.tool_cache)
-                return text
+        def make_handler(tn: str, tool_desc: str, srv: str):
+            async def handler(arguments: Optional[Dict[str, Any]] = None, ctx: Context = None) -> str:
+                result = await backend.call_tool_async(tn, arguments or {}, server=srv,
+                                                       progress=_progress_relay(ctx))
+                return render_result(tn, result, backend, ctx)
             handler.__name__ = tn
             handler.__doc__ = tool_desc
             return handler
 
-        fn = make_handler(tool_name, desc)
+        fn = make_handler(tool_name, desc, server)
         mcp.add_tool(Tool.from_function(fn, name=tool_name, description=desc))
 
 
@@ -1091,6 +4361,10 @@ def _build_proxy_mcp_config(servers: Dict[str, Dict[str, Any]]) -> Dict[str, Any
         entry: Dict[str, Any] = {}
         if cfg.get("transport") == "http" or "base_url" in cfg or "url" in cfg:
             entry["url"] = cfg.get("base_url") or cfg.get("url", "")
+            if entry["url"].startswith("unix://"):
+                print(f"⚠ ToolMux: {name}: Unix socket backends need gateway or meta mode; "
+                      "skipped in proxy mode", file=sys.stderr)
+                continue
             entry["transport"] = "streamable-http"
         else:
             cmd = cfg.get("command", name)
@@ -1163,7 +4437,7 @@ def run_proxy_native(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
                 continue
             by_server.setdefault(s, []).append({
                 "name": name, "description": t.description or ""})
-        return json.dumps({"total_tools": sum(len(v) for v in by_server.values()),
+        return json_dumps({"total_tools": sum(len(v) for v in by_server.values()),
                            "servers": {s: {"tool_count": len(tl), "tools": tl}
                                        for s, tl in by_server.items()}}, indent=2)
 
@@ -1173,9 +4447,9 @@ def run_proxy_native(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
         raw_tools = list(await proxy._list_tools())
         for t in raw_tools:
             if t.name == name:
-                return json.dumps({"name": name, "description": t.description or "",
+                return json_dumps({"name": name, "description": t.description or "",
                                    "input_schema": t.parameters}, indent=2)
-        return json.dumps({"error": f"Tool '{name}' not found"})
+        return json_dumps({"error": f"Tool '{name}' not found"})
 
     @proxy.tool()
     async def get_tool_count() -> str:
@@ -1192,7 +4466,20 @@ def run_proxy_native(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
         result: Dict[str, Any] = {"total_tools": len(raw_tools), "by_server": by_server}
         if failed_servers:
             result["failed_servers"] = failed_servers
-        return json.dumps(result, indent=2)
+        return json_dumps(result, indent=2)
+
+    @proxy.tool()
+    async def invoke_batch(calls: List[Dict[str, Any]]) -> str:
+        """Run several tool calls concurrently in one round trip.
+
+        calls: [{"name": "tool_name", "args": {...}}, ...]. Results come back
+        in the same order, each with ok, result or error, and elapsed_ms.
+        """
+        async def invoke_one(call: Dict[str, Any]) -> Tuple[str, bool]:
+            result = await proxy.call_tool(call["name"], call.get("args") or {})
+            text = "\n".join(c.text for c in result.content if getattr(c, "text", None) is not None)
+            return text, not result.is_error  # backend error results are passed through, not raised
+        return await run_batch(calls, invoke_one)
 
     # Add manage_servers tool
     register_manage_tool(proxy, config_path, config)
@@ -1252,7 +4539,7 @@ def run_search_mode(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
                 continue
             by_server.setdefault(s, []).append({
                 "name": tool_name, "description": t.description or ""})
-        return json.dumps({"total_tools": sum(len(v) for v in by_server.values()),
+        return json_dumps({"total_tools": sum(len(v) for v in by_server.values()),
                            "servers": {s: {"tool_count": len(tl), "tools": tl}
                                        for s, tl in by_server.items()}}, indent=2)
 
@@ -1262,9 +4549,9 @@ def run_search_mode(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
         raw_tools = list(await proxy._list_tools())
         for t in raw_tools:
             if t.name == name:
-                return json.dumps({"name": name, "description": t.description or "",
+                return json_dumps({"name": name, "description": t.description or "",
                                    "input_schema": t.parameters}, indent=2)
-        return json.dumps({"error": f"Tool '{name}' not found"})
+        return json_dumps({"error": f"Tool '{name}' not found"})
 
     @proxy.tool()
     async def get_tool_count() -> str:
@@ -1281,7 +4568,7 @@ def run_search_mode(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
         result: Dict[str, Any] = {"total_tools": len(raw_tools), "by_server": by_server}
         if failed_servers:
             result["failed_servers"] = failed_servers
-        return json.dumps(result, indent=2)
+        return json_dumps(result, indent=2)
 
     register_manage_tool(proxy, config_path, config)
 
@@ -1341,7 +4628,7 @@ def run_code_mode(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
                 continue
             by_server.setdefault(s, []).append({
                 "name": tool_name, "description": t.description or ""})
-        return json.dumps({"total_tools": sum(len(v) for v in by_server.values()),
+        return json_dumps({"total_tools": sum(len(v) for v in by_server.values()),
                            "servers": {s: {"tool_count": len(tl), "tools": tl}
                                        for s, tl in by_server.items()}}, indent=2)
 
@@ -1360,7 +4647,7 @@ def run_code_mode(servers: Dict[str, Dict[str, Any]], config: Dict[str, Any],
         result: Dict[str, Any] = {"total_tools": len(raw_tools), "by_server": by_server}
         if failed_servers:
             result["failed_servers"] = failed_servers
-        return json.dumps(result, indent=2)
+        return json_dumps(result, indent=2)
 
     register_manage_tool(proxy, config_path, config)
 
@@ -1396,11 +4683,11 @@ def register_gateway_tools(mcp: FastMCP, backend: BackendManager,
         """Get full description and inputSchema for a specific tool."""
         for tool in backend.get_all_tools():
             if tool["name"] == name:
-                return json.dumps({
+                return json_dumps({
                     "name": name, "server": tool["_server"],
                     "description": tool.get("description", ""),
                     "input_schema": tool.get("inputSchema", {})}, indent=2)
-        return json.dumps({"error": f"Tool '{name}' not found"})
+        return json_dumps({"error": f"Tool '{name}' not found"})
 
     @mcp.tool()
     def get_tool_count() -> str:
@@ -1414,7 +4701,10 @@ def register_gateway_tools(mcp: FastMCP, backend: BackendManager,
         failed = backend.get_failed_servers()
         if failed:
             result["failed_servers"] = failed
-        return json.dumps(result, indent=2)
+        health = backend.get_health()
+        if health:
+            result["health"] = health
+        return json_dumps(result, indent=2)
 
     @mcp.tool()
     def list_all_tools(server: Optional[str] = None) -> str:
@@ -1431,10 +4721,13 @@ def register_gateway_tools(mcp: FastMCP, backend: BackendManager,
             else:
                 desc = condense_description(t.get("description", ""), max_len=80)
             by_server.setdefault(s, []).append({"name": name, "description": desc})
-        return json.dumps({"total_tools": sum(len(v) for v in by_server.values()),
+        return json_dumps({"total_tools": sum(len(v) for v in by_server.values()),
                            "servers": {s: {"tool_count": len(tl), "tools": tl}
                                        for s, tl in by_server.items()}}, indent=2)
 
+    register_batch_tool(mcp, backend)
+    register_read_result_tool(mcp, backend)
+
     # Register one server-tool per backend server
     for server_name, srv_tools in server_tools_map.items():
         cached = cached_descriptions.get(server_name) if cached_descriptions else None
@@ -1442,7 +4735,7 @@ def register_gateway_tools(mcp: FastMCP, backend: BackendManager,
 
         def make_server_handler(sname: str, stool_list: List[Dict[str, Any]]):
             async def handler(tool: Optional[str] = None,
-                              arguments: Optional[Dict[str, Any]] = None) -> str:
+                              arguments: Optional[Dict[str, Any]] = None, ctx: Context = None) -> str:
                 if not tool:
                     # List available sub-tools for self-correction
                     info = []
@@ -1455,11 +4748,9 @@ def register_gateway_tools(mcp: FastMCP, backend: BackendManager,
                         else:
                             info.append(f"  - {n}: {d}")
                     return f"Missing 'tool' argument. Available sub-tools:\n" + "\n".join(info)
-                result = backend.call_tool(tool, arguments or {})
-                text = enrich_result(tool, result, backend._described_tools, backend.tool_cache)
-                if isinstance(result, dict) and result.get("isError"):
-                    text = enrich_error_result(tool, result, backend.tool_cache)
-                return text
+                result = await backend.call_tool_async(tool, arguments or {}, server=sname,
+                                                       progress=_progress_relay(ctx))
+                return render_result(tool, result, backend, ctx)
             handler.__name__ = sname
             handler.__doc__ = desc
             return handler
@@ -1484,8 +4775,8 @@ def load_build_cache(
     if not cache_file.exists():
         return None
     try:
-        cache = json.loads(cache_file.read_text())
-    except (json.JSONDecodeError, OSError) as e:
+        cache = json_loads(cache_file.read_text())
+    except (ValueError, OSError) as e:
         print(f"Warning: invalid build cache: {e}", file=sys.stderr)
         return None
     # Validate config hash
@@ -1507,13 +4798,49 @@ def load_build_cache(
     return result
 
 
+def _cache_tool_specs(tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Full name/description/inputSchema (and annotations) per tool, so lazy mode can serve the catalog from cache."""
+    return [{"name": t["name"], "description": t.get("description", ""),
+             "inputSchema": t.get("inputSchema", {}),
+             **({"annotations": t["annotations"]} if t.get("annotations") else {})}
+            for t in tools]
+
+
+def _cached_tools(cache_data: Dict[str, Any],
+                  servers: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rebuild backend tool dicts from cached tool specs ([] if the cache predates them)."""
+    tools: List[Dict[str, Any]] = []
+    for server_name, server_data in cache_data.get("servers", {}).items():
+        if server_name not in servers or "tools" not in server_data:
+            return []
+        transport = servers[server_name].get("transport", "stdio")
+        for spec in server_data["tools"]:
+            tools.append(dict(spec, _server=server_name, _transport=transport))
+    return tools
+
+
+def _store_cache_tool_specs(config_path: Path, tools: List[Dict[str, Any]]) -> None:
+    """Add tool specs to an existing cache file, keeping its descriptions."""
+    cache_file = config_path.parent / ".toolmux_cache.json"
+    try:
+        cache_data = json_loads(cache_file.read_text())
+        server_tools_map: Dict[str, List[Dict[str, Any]]] = {}
+        for tool in tools:
+            server_tools_map.setdefault(tool["_server"], []).append(tool)
+        for server_name, server_data in cache_data.get("servers", {}).items():
+            server_data["tools"] = _cache_tool_specs(server_tools_map.get(server_name, []))
+        cache_file.write_text(json_dumps(cache_data, indent=2))
+    except (ValueError, OSError):
+        pass  # Non-fatal — lazy mode just stays off until the cache has specs
+
+
 def _get_cache_model(config_path: Path) -> Optional[str]:
     """Read the model field from the cache file, or None if no cache."""
     cache_file = config_path.parent / ".toolmux_cache.json"
     if not cache_file.exists():
         return None
     try:
-        return json.loads(cache_file.read_text()).get("model")
+        return json_loads(cache_file.read_text()).get("model")
     except Exception:
         return None
 
@@ -1535,10 +4862,11 @@ def _auto_generate_cache(config_path: Path, tools: List[Dict[str, Any]]) -> None
             "tool_count": len(srv_tools),
             "descriptions": {t["name"]: condense_description(t.get("description", ""), max_len=60)
                              for t in srv_tools},
+            "tools": _cache_tool_specs(srv_tools),
         }
     cache_file = config_path.parent / ".toolmux_cache.json"
     try:
-        cache_file.write_text(json.dumps(cache_data, indent=2))
+        cache_file.write_text(json_dumps(cache_data, indent=2))
     except OSError:
         pass  # Non-fatal — algorithmic fallback still works without cache file
 
@@ -1569,10 +4897,11 @@ def generate_build_cache(config: Dict[str, Any], config_path: Path) -> None:
         cache_data["servers"][server_name] = {
             "tool_count": len(srv_tools),
             "descriptions": descriptions,
+            "tools": _cache_tool_specs(srv_tools),
         }
 
     cache_file = config_path.parent / ".toolmux_cache.json"
-    cache_file.write_text(json.dumps(cache_data, indent=2))
+    cache_file.write_text(json_dumps(cache_data, indent=2))
     print(f"Build cache written to {cache_file} ({len(tools)} tools, algorithmic descriptions)")
     print(f"Use optimize_descriptions(action='generate') via an agent for LLM-quality descriptions")
     backend.shutdown()
@@ -1581,10 +4910,9 @@ def generate_build_cache(config: Dict[str, Any], config_path: Path) -> None:
 def save_build_cache(config_path: Path, descriptions: Dict[str, Dict[str, str]],
                      tools: List[Dict[str, Any]]) -> str:
     """Save agent-generated descriptions to the build cache file."""
-    server_tools_map: Dict[str, int] = {}
+    server_tools_map: Dict[str, List[Dict[str, Any]]] = {}
     for tool in tools:
-        s = tool["_server"]
-        server_tools_map[s] = server_tools_map.get(s, 0) + 1
+        server_tools_map.setdefault(tool["_server"], []).append(tool)
 
     cache_data = {
         "version": "1.0",
@@ -1593,14 +4921,15 @@ def save_build_cache(config_path: Path, descriptions: Dict[str, Dict[str, str]],
         "model": "agent-generated",
         "servers": {},
     }
-    for server_name, count in server_tools_map.items():
+    for server_name, srv_tools in server_tools_map.items():
         cache_data["servers"][server_name] = {
-            "tool_count": count,
+            "tool_count": len(srv_tools),
             "descriptions": descriptions.get(server_name, {}),
+            "tools": _cache_tool_specs(srv_tools),
         }
 
     cache_file = config_path.parent / ".toolmux_cache.json"
-    cache_file.write_text(json.dumps(cache_data, indent=2))
+    cache_file.write_text(json_dumps(cache_data, indent=2))
     total = sum(len(d) for d in descriptions.values())
     return f"Cache saved to {cache_file} ({total} descriptions)"
 
@@ -1750,7 +5079,7 @@ def _read_generic_bundle(path: Path) -> Optional[Dict[str, Any]]:
     if not path.exists():
         return None
     try:
-        bundle = json.loads(path.read_text())
+        bundle = json_loads(path.read_text())
         run_config = bundle.get("genericBundle", {}).get("run", {})
         executable = run_config.get("executable")
         if executable:
@@ -1766,7 +5095,7 @@ def _read_mcp_config_server(path: Path, server_name: str) -> Optional[Dict[str,
     if not path.exists():
         return None
     try:
-        data = json.loads(path.read_text())
+        data = json_loads(path.read_text())
         servers = data.get("mcpServers", {})
         entry = servers.get(server_name)
         if not entry:
@@ -1877,6 +5206,9 @@ def _handle_manage(args, config: Dict[str, Any], config_path: Path,
                 if not url:
                     print(f"  ❌ {name}: missing base_url for HTTP transport")
                     errors += 1
+                elif url.startswith("unix://") and not Path(url[len("unix://"):]).is_socket():
+                    print(f"  ❌ {name}: no Unix socket at {url[len('unix://'):]}")
+                    errors += 1
                 else:
                     print(f"  ✅ {name}: HTTP → {url}")
             else:
@@ -1963,6 +5295,8 @@ def main():
                         help="List configured servers and exit")
     parser.add_argument("--build-cache", action="store_true",
                         help="Generate LLM build cache for descriptions and exit")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Serve the catalog from the build cache and start backends on first use")
     parser.add_argument("--manage", nargs="?", const="list",
                         choices=["list", "add", "remove", "validate", "test"],
                         help="Manage servers: list, add, remove, validate, or test")
@@ -2017,7 +5351,19 @@ def main():
         run_code_mode(servers, config, config_path)
         return
 
-    backend = BackendManager(servers)
+    cache_cfg = config.get("result_cache")
+    result_cache = (ResultCache.from_config(cache_cfg if isinstance(cache_cfg, dict) else {},
+                                            config_path.parent / ".toolmux_results")
+                    if cache_cfg else None)
+    spill_store = SpillStore.from_config(config.get("large_results"))
+    backend = BackendManager(servers, lazy=args.lazy or config.get("lazy", False),
+                             idle_timeout=config.get("idle_timeout"),
+                             ping_interval=config.get("ping_interval", DEFAULT_PING_INTERVAL),
+                             call_timeout=config.get("call_timeout"),
+                             result_cache=result_cache, spill_store=spill_store,
+                             condenser=ResultCondenser.from_config(config),
+                             http_sessions=HttpSessionCache(config_path.parent / ".toolmux_http.json"),
+                             retry_budget=RetryBudget.from_config(config.get("retry_budget")))
 
     # Determine instructions for FastMCP constructor
     cache_model = _get_cache_model(config_path)
@@ -2034,22 +5380,26 @@ def main():
     # This allows mcp.run() to start immediately and respond to initialize.
     cached_descriptions = None
     tools = []
+    cached_specs: List[Dict[str, Any]] = []
     cache_file = config_path.parent / ".toolmux_cache.json"
     if cache_file.exists():
         try:
-            cache_data = json.loads(cache_file.read_text())
+            cache_data = json_loads(cache_file.read_text())
             current_hash = compute_config_hash(config_path)
             if cache_data.get("config_hash") == current_hash:
-                # Build synthetic tool list from cache for registration
-                for server_name, server_data in cache_data.get("servers", {}).items():
-                    for tool_name, desc in server_data.get("descriptions", {}).items():
-                        tools.append({
-                            "name": tool_name,
-                            "_server": server_name,
-                            "_transport": "stdio",
-                            "description": desc,
-                            "inputSchema": {"type": "object", "properties": {}},
-                        })
+                cached_specs = _cached_tools(cache_data, servers)
+                tools = list(cached_specs)
+                if not cached_specs:
+                    # Older caches have no tool specs — build a synthetic tool list for registration
+                    for server_name, server_data in cache_data.get("servers", {}).items():
+                        for tool_name, desc in server_data.get("descriptions", {}).items():
+                            tools.append({
+                                "name": tool_name,
+                                "_server": server_name,
+                                "_transport": "stdio",
+                                "description": desc,
+                                "inputSchema": {"type": "object", "properties": {}},
+                            })
                 cached_descriptions = {}
                 for server_name, server_data in cache_data.get("servers", {}).items():
                     cached_descriptions[server_name] = server_data.get("descriptions", {})
@@ -2081,9 +5431,25 @@ def main():
                 except Exception:
                     pass
         threading.Thread(target=_deferred_cache_gen, daemon=True).start()
+    elif cached_specs:
+        # Cache has full tool specs, so the catalog needs no backend. In lazy
+        # mode only eager servers start now; the rest start on first call.
+        if backend.lazy:
+            backend.preload_tools(cached_specs)
+        backend.initialize_all_async()
     else:
         # Cache loaded — start backends in background for actual tool calls
         backend.initialize_all_async()
+        if backend.lazy:
+            print("ToolMux: lazy mode needs tool schemas in the build cache; "
+                  "starting all backends this time", file=sys.stderr)
+        # Older caches lack tool specs — add them so the next start can be lazy
+        def _deferred_spec_store():
+            backend._init_complete.wait(timeout=60)
+            real_tools = backend.get_all_tools()
+            if real_tools:
+                _store_cache_tool_specs(config_path, real_tools)
+        threading.Thread(target=_deferred_spec_store, daemon=True).start()
 
     # Stash tools in config for build_cache tool access
     config["_backend_tools"] = tools
@@ -2098,6 +5464,7 @@ def main():
 
     # Register manage_servers in all modes (pass backend for retry support)
     register_manage_tool(mcp, config_path, config, backend=backend)
+    register_workflow_tools(mcp, backend, config, config_path)
 
     try:
         mcp.run(show_banner=False)